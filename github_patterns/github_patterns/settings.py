@@ -89,6 +89,38 @@ DATABASES = {
     }
 }
 
+# Number of worker threads running data loads in the background
+
+DATA_LOAD_WORKERS = env.int('DATA_LOAD_WORKERS', default=2)
+
+# Maximum size of the in-memory pattern mining results cache in bytes
+
+MINING_RESULT_CACHE_MAX_SIZE = env.int('MINING_RESULT_CACHE_MAX_SIZE', default=64 * 1024 * 1024)
+
+# Directory and maximum size in bytes of the on-disk transaction matrix cache
+
+TRANSACTION_CACHE_DIR = env('TRANSACTION_CACHE_DIR', default='.cache/transactions')
+TRANSACTION_CACHE_MAX_SIZE = env.int('TRANSACTION_CACHE_MAX_SIZE', default=256 * 1024 * 1024)
+
+# Frequent itemsets mining engine and the apriori memory limit in bytes of the automatic choice
+
+PATTERN_MINING_ENGINE = env('PATTERN_MINING_ENGINE', default='auto')
+PATTERN_MINING_MEMORY_LIMIT = env.int('PATTERN_MINING_MEMORY_LIMIT', default=512 * 1024 * 1024)
+
+# Number of worker processes of the parallel Eclat mining, 1 mines in the request thread
+
+PATTERN_MINING_WORKERS = env.int('PATTERN_MINING_WORKERS', default=1)
+
+# Number of row partitions of the two-phase SON mining engine
+
+PATTERN_MINING_PARTITIONS = env.int('PATTERN_MINING_PARTITIONS', default=4)
+
+# Maximum size of the in-memory frequent itemsets cache in bytes and the highest support
+# the cached itemsets are mined at
+
+ITEMSET_LATTICE_CACHE_MAX_SIZE = env.int('ITEMSET_LATTICE_CACHE_MAX_SIZE', default=128 * 1024 * 1024)
+ITEMSET_LATTICE_FLOOR = env.float('ITEMSET_LATTICE_FLOOR', default=0.02)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,69 @@
+import time
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from modules.discretizer import Discretizer
+
+
+class Command(BaseCommand):
+    help = ("Compares the per-cell and vectorized quantile rank assignment "
+            "and checks that they give identical ranks")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        rows_count = options['rows']
+        data = pd.DataFrame({
+            'pushes': rng.zipf(1.5, rows_count).clip(max=10 ** 6),
+            'avg_push_size': rng.exponential(3.0, rows_count).round(2),
+            'watches': rng.integers(0, 20, rows_count),
+            'merged_pull_requests_ratio': np.where(rng.random(rows_count) < 0.05, 
+                                                   np.nan, 
+                                                   rng.random(rows_count).round(2)),
+        })
+        quantile_config = {'pushes': 'dec', 'avg_push_size': 'qua', 
+                           'watches': 'dec', 'merged_pull_requests_ratio': 'qua'}
+        discretizer = Discretizer()
+
+        started_at = time.perf_counter()
+        cut_points = discretizer.get_cut_points(data, quantile_config, 
+                                                pd.DataFrame({'columnName': list(data.columns)}))
+        vectorized_ranks = discretizer.discretize(data, cut_points)
+        vectorized_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        per_cell_ranks = convert_data_to_quantile_numbers_per_cell(data, quantile_config)
+        per_cell_time = time.perf_counter() - started_at
+
+        self.stdout.write(f"per cell: {rows_count} rows in {per_cell_time:.3f} s")
+        self.stdout.write(f"vectorized: {rows_count} rows in {vectorized_time:.3f} s "
+                          f"({per_cell_time / vectorized_time:.0f}x)")
+        self.stdout.write(f"ranks identical: {per_cell_ranks.equals(vectorized_ranks)}")
+
+
+def convert_data_to_quantile_numbers_per_cell(data, quantile_config):
+    # The rank assignment used before the vectorized discretizer
+    separation_types = {'qua': [0, 0.25, 0.5, 0.75, 1],
+                        'dec': [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]}
+    quantiles = pd.DataFrame({column: data[column].quantile(separation_types[quantile_type])
+                              for column, quantile_type in quantile_config.items()})
+    quantiles = quantiles.iloc[::-1].apply(lambda x: x.mask(x.duplicated(), np.nan)).iloc[::-1]
+
+    def find_quantile_rank(value, quantiles):
+        quantiles = sorted(quantiles, reverse=True)
+        for i, q in enumerate(quantiles, 1):
+            if value > q:
+                return i
+        return len(quantiles) + 1
+
+    quantile_numbers_data = data.copy()
+    quantile_values_without_bounds = quantiles.drop([0, 1])
+    for column in data.columns:
+        column_quantiles_values = quantile_values_without_bounds[column].dropna()
+        quantile_numbers_data[column] = quantile_numbers_data[column].apply(
+            find_quantile_rank,
+            quantiles=column_quantiles_values)
+    return quantile_numbers_data
@@ -0,0 +1,107 @@
+import time
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from github_patterns_app.models import SampleParams, RepositoryData
+from github_patterns_app.repository_storage import save_repository_data, is_copy_supported
+
+
+class Command(BaseCommand):
+    help = ("Compares the per-row and bulk ingestion of a synthetic sample "
+            "and checks that they store identical rows")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        github_data = get_synthetic_data(options['rows'], options['seed'])
+        methods = ['per_row', 'bulk_create'] + (['copy'] if is_copy_supported() else [])
+
+        samples = {}
+        try:
+            for method in methods:
+                started_at = time.perf_counter()
+                with transaction.atomic():
+                    samples[method] = create_sample(len(github_data))
+                    if method == 'per_row':
+                        save_repository_data_per_row(samples[method], github_data)
+                    else:
+                        save_repository_data(samples[method], github_data, method=method)
+                elapsed = time.perf_counter() - started_at
+                self.stdout.write(f"{method}: {len(github_data)} rows in {elapsed:.3f} s "
+                                  f"({len(github_data) / elapsed:.0f} rows/s)")
+
+            expected_rows = get_stored_rows(samples['per_row'])
+            for method in methods[1:]:
+                is_identical = get_stored_rows(samples[method]) == expected_rows
+                self.stdout.write(f"{method} rows identical to per_row: {is_identical}")
+        finally:
+            SampleParams.objects.filter(id__in=[sample.id for sample in samples.values()]).delete()
+
+
+def get_synthetic_data(rows_count, seed):
+    rng = np.random.default_rng(seed)
+    languages = np.array(['Python', 'JavaScript', 'Go', 'Rust', None], dtype=object)
+    licenses = np.array(['MIT License', 'Apache License 2.0', None], dtype=object)
+    return pd.DataFrame({
+        'repo': [f'owner{index}/repo{index}' for index in range(rows_count)],
+        'pushes': rng.integers(0, 5000, rows_count),
+        'avg_push_size': rng.random(rows_count).round(2) * 10,
+        'pull_requests': rng.integers(0, 500, rows_count),
+        'merged_pull_requests_ratio': rng.random(rows_count).round(2),
+        'issues': rng.integers(0, 500, rows_count),
+        'closed_issues_ratio': rng.random(rows_count).round(2),
+        'watches': rng.integers(0, 10000, rows_count),
+        'forks': rng.integers(0, 1000, rows_count),
+        'new_members': rng.integers(0, 20, rows_count),
+        'language': languages[rng.integers(0, len(languages), rows_count)],
+        'license_name': licenses[rng.integers(0, len(licenses), rows_count)],
+        'is_deleted_or_private': rng.random(rows_count) < 0.1,
+    })
+
+
+def create_sample(repos_count):
+    return SampleParams.objects.create(
+        save_time=timezone.now(),
+        start_date='2024-01-01',
+        end_date='2024-02-01',
+        repos_count=repos_count,
+        min_members_count=0,
+        min_watch_count=0,
+        is_new_repos=False,
+        note='benchmark',
+        **{field.name: 'ON' if field.name.endswith('_status') else 'QUA'
+           for field in SampleParams._meta.fields
+           if field.name.endswith(('_status', '_division'))})
+
+
+def save_repository_data_per_row(sample_params, github_data):
+    # The ingestion path used before bulk ingestion
+    for index, row in github_data.iterrows():
+        RepositoryData(
+            data_params_id=sample_params,
+            repo_name=row.get('repo', None),
+            pushes=row.get('pushes', None),
+            avg_push_size=row.get('avg_push_size', None),
+            pull_requests=row.get('pull_requests', None),
+            merged_pull_requests_ratio=row.get('merged_pull_requests_ratio', None),
+            issues=row.get('issues', None),
+            closed_issues_ratio=row.get('closed_issues_ratio', None),
+            watches=row.get('watches', None),
+            forks=row.get('forks', None),
+            new_members=row.get('new_members', None),
+            language=row.get('language', None),
+            license_name=row.get('license_name', None),
+            is_deleted_or_private=row.get('is_deleted_or_private', None)
+        ).save()
+
+
+def get_stored_rows(sample_params):
+    fields = [field.name for field in RepositoryData._meta.concrete_fields
+              if not field.primary_key and not field.is_relation]
+    return list(RepositoryData.objects.filter(data_params_id=sample_params.id)
+                .order_by('repo_name')
+                .values_list(*fields))
@@ -0,0 +1,110 @@
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from django.core.management.base import BaseCommand
+from modules.github_data_converter import GithubDataConverter
+from modules.pattern_miner import PatternMiner
+
+
+class Command(BaseCommand):
+    help = ("Compares the frequent itemsets mining engines on synthetic samples, "
+            "checks that they find the same itemsets and shows the automatic choice")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--supports', type=float, nargs='+', default=[0.1, 0.05, 0.02, 0.01])
+        parser.add_argument('--engines', nargs='+', default=PatternMiner.ENGINES)
+        parser.add_argument('--memory-limit', type=int, default=PatternMiner.DEFAULT_MEMORY_LIMIT,
+                            help="Apriori runs are skipped above this estimated memory in bytes")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Also runs the parallel Eclat with this number of processes")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        executor = None
+        if options['workers'] > 1:
+            executor = ProcessPoolExecutor(max_workers=options['workers'],
+                                           mp_context=multiprocessing.get_context('spawn'))
+        try:
+            self.compare_engines(options, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def compare_engines(self, options, executor):
+        engines = list(options['engines'])
+        if executor is not None:
+            engines.append(f"eclat x{options['workers']}")
+
+        for rows_count in options['rows']:
+            transactions = get_synthetic_transactions(rows_count, options['seed'])
+            self.stdout.write(f"{rows_count} rows, {transactions.shape[1]} items, "
+                              f"density {transactions.to_numpy().mean():.3f}")
+
+            for min_supp in options['supports']:
+                pattern_miner = PatternMiner(memory_limit=options['memory_limit'])
+                estimated_memory = pattern_miner.estimate_apriori_memory(transactions, min_supp)
+                auto_engine = pattern_miner.select_engine(transactions, min_supp)
+
+                results = []
+                timings = {}
+                for engine in engines:
+                    if engine == 'apriori' and estimated_memory > options['memory_limit']:
+                        continue
+                    if engine in PatternMiner.ENGINES:
+                        pattern_miner = PatternMiner(engine=engine)
+                    else:
+                        pattern_miner = PatternMiner(engine='eclat', executor=executor)
+                    started_at = time.perf_counter()
+                    itemsets = pattern_miner.find_frequent_itemsets(transactions, min_supp)
+                    timings[engine] = time.perf_counter() - started_at
+                    results.append(get_itemset_supports(itemsets))
+
+                identical = all(result == results[0] for result in results)
+                self.stdout.write(f"  min_supp {min_supp}: {len(results[0])} itemsets, "
+                                  + ', '.join(f"{engine} {timings[engine]:.3f} s" 
+                                              if engine in timings else f"{engine} skipped"
+                                              for engine in engines)
+                                  + f"; apriori estimate {estimated_memory / 2 ** 20:.0f} MB, "
+                                  f"auto {auto_engine}, identical: {identical}")
+
+                other_timings = [timing for engine, timing in timings.items() 
+                                 if not engine.startswith('eclat')]
+                if 'eclat' in timings and other_timings:
+                    self.stdout.write(f"    eclat speedup over the fastest mlxtend engine: "
+                                      f"{min(other_timings) / timings['eclat']:.1f}x")
+
+
+def get_synthetic_transactions(rows_count, seed):
+    rng = np.random.default_rng(seed)
+    repository_data = pd.DataFrame({
+        'repo_name': [f'owner{index}/repo{index}' for index in range(rows_count)],
+        'pushes': rng.zipf(1.5, rows_count).clip(max=10 ** 6),
+        'avg_push_size': rng.exponential(3.0, rows_count).round(2),
+        'pull_requests': rng.integers(0, 3, rows_count),
+        'merged_pull_requests_ratio': rng.random(rows_count).round(2),
+        'issues': rng.integers(1, 50, rows_count),
+        'closed_issues_ratio': rng.random(rows_count).round(2),
+        'watches': rng.integers(0, 20, rows_count),
+        'forks': rng.integers(1, 9, rows_count),
+        'new_members': rng.integers(0, 3, rows_count),
+        'language': rng.choice(np.array(['Python', 'Go', 'C++', 'Other', None], dtype=object), 
+                               rows_count),
+        'license_name': rng.choice(np.array(['MIT License', 'Apache License 2.0', None], 
+                                            dtype=object), 
+                                   rows_count),
+        'is_deleted_or_private': rng.random(rows_count) < 0.1,
+    })
+    quantile_config = {column: 'qua' for column in repository_data.columns 
+                       if column not in ('repo_name', 'language', 'license_name', 
+                                         'is_deleted_or_private')}
+    quantile_config.update({'language': 'None', 'license_name': 'None', 
+                            'is_deleted_or_private': 'None'})
+    return GithubDataConverter().convert_data_to_transactions(repository_data, quantile_config)
+
+
+def get_itemset_supports(itemsets):
+    return {frozenset(itemset): round(support, 9) 
+            for support, itemset in zip(itemsets['support'], itemsets['itemsets'])}
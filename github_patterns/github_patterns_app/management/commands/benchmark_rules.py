@@ -0,0 +1,78 @@
+import time
+from collections import Counter
+from mlxtend.frequent_patterns import association_rules
+from django.core.management.base import BaseCommand
+from modules.pattern_miner import PatternMiner
+from .benchmark_mining import get_synthetic_transactions
+
+
+class Command(BaseCommand):
+    help = ("Compares the vectorized rule generation with mlxtend association_rules "
+            "followed by the column dropping, rounding and filtering of the former miner, "
+            "and checks that they give the same rules")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+        parser.add_argument('--supports', type=float, nargs='+', default=[0.01, 0.005, 0.003])
+        parser.add_argument('--min-conf', type=float, default=0.0)
+        parser.add_argument('--min-lift', type=float, default=0.0)
+        parser.add_argument('--max-left', type=int, default=3)
+        parser.add_argument('--max-right', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        limits = (1, 1, options['max_left'], options['max_right'])
+        pattern_miner = PatternMiner(engine='eclat')
+
+        for rows_count in options['rows']:
+            transactions = get_synthetic_transactions(rows_count, options['seed'])
+            self.stdout.write(f"{rows_count} rows, {transactions.shape[1]} items")
+
+            for min_supp in options['supports']:
+                itemsets = pattern_miner.find_frequent_itemsets(transactions, min_supp,
+                                                                sum(limits[2:]))
+
+                started_at = time.perf_counter()
+                mlxtend_rules = get_mlxtend_rules(itemsets, options['min_conf'],
+                                                  options['min_lift'], *limits)
+                mlxtend_time = time.perf_counter() - started_at
+
+                started_at = time.perf_counter()
+                rules = pattern_miner.generate_rules(itemsets, options['min_conf'],
+                                                     options['min_lift'], *limits)
+                vectorized_time = time.perf_counter() - started_at
+
+                identical = get_rule_counter(rules) == get_rule_counter(mlxtend_rules)
+                self.stdout.write(f"  min_supp {min_supp}: {len(itemsets)} itemsets, "
+                                  f"{len(rules)} rules, mlxtend {mlxtend_time:.3f} s, "
+                                  f"vectorized {vectorized_time:.3f} s, "
+                                  f"speedup {mlxtend_time / vectorized_time:.1f}x, "
+                                  f"identical: {identical}")
+
+
+def get_mlxtend_rules(itemsets, min_conf, min_lift,
+                      min_left_elements, min_right_elements, max_left_elements, max_right_elements):
+    rules = association_rules(itemsets, metric='lift', min_threshold=min_lift)
+    rules = rules.drop(columns=['antecedent support', 'consequent support',
+                                'leverage', 'conviction', 'zhangs_metric']).copy()
+    for column in ['support', 'confidence', 'lift']:
+        rules[column] = rules[column].round(4)
+    if min_conf:
+        rules = rules[rules['confidence'] >= min_conf]
+    rules = rules[rules['antecedents'].apply(len).between(min_left_elements, max_left_elements)]
+    rules = rules[rules['consequents'].apply(len).between(min_right_elements, max_right_elements)]
+    rules['antecedents'] = rules['antecedents'].apply(lambda items: ', '.join(f"({item})"
+                                                                              for item in items))
+    rules['consequents'] = rules['consequents'].apply(lambda items: ', '.join(f"({item})"
+                                                                              for item in items))
+    return rules
+
+
+def get_rule_counter(rules):
+    # Items of a rule side may be listed in any order
+    return Counter((frozenset(antecedents[1:-1].split('), (')),
+                    frozenset(consequents[1:-1].split('), (')),
+                    support, confidence, lift)
+                   for antecedents, consequents, support, confidence, lift
+                   in rules[['antecedents', 'consequents', 'support', 'confidence', 'lift']]
+                   .itertuples(index=False))
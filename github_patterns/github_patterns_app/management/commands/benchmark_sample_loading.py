@@ -0,0 +1,62 @@
+import time
+import pandas as pd
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from github_patterns_app.models import SampleParams, RepositoryData
+from github_patterns_app.repository_storage import save_repository_data, load_repository_data
+from github_patterns_app.management.commands.benchmark_ingestion import get_synthetic_data, create_sample
+
+
+class Command(BaseCommand):
+    help = ("Compares the per-sample and single-query loading of merged samples "
+            "and checks that they return the same repositories")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=20)
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--overlap', type=float, default=0.2,
+                            help="Share of each sample repeating repositories of the previous one")
+
+    def handle(self, *args, **options):
+        sample_ids = []
+        try:
+            shift = int(options['rows'] * (1 - options['overlap']))
+            for sample_index in range(options['samples']):
+                github_data = get_synthetic_data(options['rows'], sample_index)
+                github_data['repo'] = [f'owner/repo{sample_index * shift + index}' 
+                                       for index in range(options['rows'])]
+                with transaction.atomic():
+                    sample = create_sample(len(github_data))
+                    save_repository_data(sample, github_data)
+                sample_ids.append(sample.id)
+
+            started_at = time.perf_counter()
+            per_sample_data = load_repository_data_per_sample(sample_ids)
+            per_sample_time = time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            single_query_data = load_repository_data(sample_ids)
+            single_query_time = time.perf_counter() - started_at
+
+            self.stdout.write(f"per sample: {len(per_sample_data)} rows in {per_sample_time:.3f} s")
+            self.stdout.write(f"single query: {len(single_query_data)} rows in {single_query_time:.3f} s")
+
+            expected_data = (per_sample_data
+                             .drop(columns=['id', 'data_params_id_id'])
+                             .drop_duplicates(subset='repo_name')
+                             .reset_index(drop=True))
+            is_identical = expected_data.equals(single_query_data[expected_data.columns])
+            self.stdout.write(f"single query rows identical to deduplicated per sample rows: {is_identical}")
+        finally:
+            SampleParams.objects.filter(id__in=sample_ids).delete()
+
+
+def load_repository_data_per_sample(sample_ids):
+    # The loading path used before the single query loader
+    df = pd.DataFrame()
+    for sample_id in sample_ids:
+        sample = SampleParams.objects.get(id=int(sample_id))
+        repository_data = RepositoryData.objects.filter(data_params_id=sample.id)
+        df_sample = pd.DataFrame.from_records(repository_data.values())
+        df = pd.concat([df, df_sample], ignore_index=True)
+    return df
@@ -0,0 +1,166 @@
+import io
+import numpy as np
+import pandas as pd
+from django.db import connection, models
+from github_patterns_app.models import RepositoryData
+
+
+BULK_CREATE_BATCH_SIZE = 2000
+COPY_NULL_VALUE = '\\N'
+INGESTION_METHODS = ['copy', 'bulk_create']
+COPY_DRIVERS = ['psycopg2', 'psycopg']
+
+
+def save_repository_data(sample_params, github_data, method=None):
+    """
+    Saves the repositories of a sample in bulk.
+
+    The data frame is converted column by column to the model field types.
+    On PostgreSQL through psycopg2 or psycopg the rows are streamed with
+    COPY FROM STDIN, otherwise they are inserted with batched bulk_create calls. Call it
+    inside a transaction to save the sample atomically.
+
+    Args:
+        sample_params (SampleParams): Saved sample the repositories belong to.
+        github_data (DataFrame): Repository data, the repository name in the "repo" column.
+        method (str, optional): 'copy' or 'bulk_create', chosen by the database driver by default.
+
+    Raises:
+        ValueError: If the method is unknown or COPY is not supported by the database driver.
+    """
+    if method is None:
+        method = 'copy' if is_copy_supported() else 'bulk_create'
+    if method not in INGESTION_METHODS:
+        raise ValueError(f"Unknown ingestion method: {method}")
+    if method == 'copy' and not is_copy_supported():
+        raise ValueError(f"COPY is not supported by the {get_database_driver()} database driver")
+
+    field_data = get_field_data(sample_params, github_data)
+    if field_data.empty:
+        return
+
+    if method == 'copy':
+        copy_field_data(field_data)
+    else:
+        bulk_create_field_data(field_data)
+
+
+def load_repository_data(sample_ids):
+    """
+    Loads the repositories of several samples with one query.
+
+    The values_list query is executed on a plain cursor, skipping the
+    per-row ORM conversion, and every column is built directly as a NumPy
+    array of the model field type. A repository present in
+    several samples is kept once, from the earliest saved sample, so the
+    result does not depend on the order of sample_ids.
+
+    Args:
+        sample_ids (list[int]): Sample identifiers.
+
+    Returns:
+        DataFrame: Repository data with the model field columns, without
+            the row and sample identifiers.
+    """
+    fields = [field for field in get_repository_data_fields() if not field.is_relation]
+    queryset = (RepositoryData.objects
+                .filter(data_params_id__in=sample_ids)
+                .order_by('data_params_id', 'id')
+                .values_list(*[field.attname for field in fields]))
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    if not rows:
+        return pd.DataFrame(columns=[field.name for field in fields])
+
+    columns = zip(*rows)
+    data = pd.DataFrame({field.name: get_field_column(field, values)
+                         for field, values in zip(fields, columns)})
+
+    return data.drop_duplicates(subset='repo_name').reset_index(drop=True)
+
+
+def get_field_column(field, values):
+    # Same dtypes as DataFrame.from_records: nullable integers become floats,
+    # columns without any value stay objects.
+    # Booleans are converted explicitly, some databases return them as integers
+    has_nulls = None in values
+    if has_nulls and all(value is None for value in values):
+        return np.array(values, dtype=object)
+    if isinstance(field, models.BooleanField):
+        if has_nulls:
+            return np.array([None if value is None else bool(value) for value in values], 
+                            dtype=object)
+        return np.array(values, dtype=bool)
+    if isinstance(field, models.IntegerField):
+        return np.array(values, dtype=np.float64 if has_nulls else np.int64)
+    if isinstance(field, models.FloatField):
+        return np.array(values, dtype=np.float64)
+    return np.array(values, dtype=object)
+
+
+def get_field_data(sample_params, github_data):
+    data = {}
+    for field in get_repository_data_fields():
+        if field.is_relation:
+            data[field.attname] = pd.Series(sample_params.pk, index=github_data.index, dtype='int64')
+            continue
+
+        column = 'repo' if field.name == 'repo_name' else field.name
+        values = github_data[column] if column in github_data else pd.Series(None, index=github_data.index)
+        data[field.attname] = values.astype(get_field_dtype(field))
+
+    return pd.DataFrame(data, index=github_data.index)
+
+
+def bulk_create_field_data(field_data):
+    # Object columns turn NumPy scalars into Python values and NA into None
+    object_data = field_data.astype(object)
+    object_data = object_data.where(field_data.notna(), None)
+    attnames = list(object_data.columns)
+
+    RepositoryData.objects.bulk_create(
+        [RepositoryData(**dict(zip(attnames, row)))
+         for row in object_data.itertuples(index=False, name=None)],
+        batch_size=BULK_CREATE_BATCH_SIZE)
+
+
+def copy_field_data(field_data):
+    buffer = io.StringIO()
+    field_data.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL_VALUE)
+    buffer.seek(0)
+
+    fields = get_repository_data_fields()
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    table = connection.ops.quote_name(RepositoryData._meta.db_table)
+    query = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL_VALUE}')"
+    # The Django cursor passes the driver methods through to the database cursor
+    with connection.cursor() as cursor:
+        if get_database_driver() == 'psycopg2':
+            cursor.copy_expert(query, buffer)
+        else:
+            with cursor.copy(query) as copy:
+                copy.write(buffer.getvalue())
+
+
+def is_copy_supported():
+    return connection.vendor == 'postgresql' and get_database_driver() in COPY_DRIVERS
+
+
+def get_database_driver():
+    return connection.Database.__name__
+
+
+def get_repository_data_fields():
+    return [field for field in RepositoryData._meta.concrete_fields if not field.primary_key]
+
+
+def get_field_dtype(field):
+    if isinstance(field, models.IntegerField):
+        return 'Int64'
+    if isinstance(field, models.FloatField):
+        return 'float64'
+    if isinstance(field, models.BooleanField):
+        return 'boolean'
+    return 'object'
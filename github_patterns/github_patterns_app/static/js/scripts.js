@@ -145,7 +145,9 @@ function load_data_submit() {
         return;
     }
 
+    loadingMessage.textContent = 'Загрузка данных...';
     loadingMessage.style.display = 'block';
+    notification.style.display = 'none';
 
     fetch('/load-data-submit', {
         method: 'POST',
@@ -162,9 +164,9 @@ function load_data_submit() {
         return response.json();
     })
     .then((data) => {
-        notification.textContent = "Данные успешно сохранены";
-        notification.style.display = 'block';
-        loadingMessage.style.display = 'none';
+        currentLoadJobId = data.job_id;
+        document.getElementById('cancelLoadButton').style.display = 'block';
+        poll_load_data_status(data.job_id);
     })
     .catch((error) => {
         errorDiv.textContent = error.Error;
@@ -174,6 +176,75 @@ function load_data_submit() {
     });
 }
 
+let currentLoadJobId = null;
+
+const LOAD_PHASE_NAMES = {
+    'clickhouse': 'Запрос данных ClickHouse',
+    'github_api': 'Запрос данных GitHub API',
+    'done': 'Обработка данных',
+    'saving': 'Сохранение выборки'
+};
+
+function poll_load_data_status(jobId) {
+    let errorDiv = document.getElementById('errorDiv');
+    let loadingMessage = document.getElementById('loadingMessage');
+    let notification = document.getElementById('notification');
+    let cancelButton = document.getElementById('cancelLoadButton');
+
+    fetch('/load-data-status/' + jobId)
+    .then((response) => {
+        if (!response.ok) {
+            return response.json().then(json => { throw json });
+        }
+        return response.json();
+    })
+    .then((job) => {
+        if (job.status === 'queued' || job.status === 'running') {
+            let phaseName = LOAD_PHASE_NAMES[job.phase] || 'Загрузка данных';
+            let progress = job.progress || {};
+            loadingMessage.textContent = phaseName + '... Репозиториев: ' + (progress.rows_fetched || 0) +
+                ', запросов к GitHub API: ' + (progress.api_calls || 0);
+            setTimeout(() => poll_load_data_status(jobId), 1000);
+            return;
+        }
+
+        currentLoadJobId = null;
+        cancelButton.style.display = 'none';
+        loadingMessage.style.display = 'none';
+        if (job.status === 'done') {
+            notification.textContent = "Данные успешно сохранены";
+            notification.style.display = 'block';
+        } else if (job.status === 'cancelled') {
+            notification.textContent = "Загрузка отменена";
+            notification.style.display = 'block';
+        } else {
+            errorDiv.textContent = job.error;
+            errorDiv.style.display = 'block';
+        }
+    })
+    .catch((error) => {
+        currentLoadJobId = null;
+        cancelButton.style.display = 'none';
+        errorDiv.textContent = error.error;
+        errorDiv.style.display = 'block';
+        loadingMessage.style.display = 'none';
+        console.error('Error:', error);
+    });
+}
+
+function load_data_cancel() {
+    if (!currentLoadJobId) {
+        return;
+    }
+
+    fetch('/load-data-cancel/' + currentLoadJobId, {
+        method: 'POST',
+    })
+    .catch((error) => {
+        console.error('Error:', error);
+    });
+}
+
 // samples table
 
 let selectedRows = [];
@@ -269,6 +340,7 @@ function find_patterns_submit() {
     let minsup = document.getElementById('minsup').value;
     let minconf = document.getElementById('minconf').value;
     let lift = document.getElementById('lift').value;
+    let itemsets_mode = document.querySelector('input[name="itemsetsMode"]:checked').value;
     let data = {
         antecedent: antecedent,
         consequent: consequent,
@@ -277,6 +349,7 @@ function find_patterns_submit() {
         minsup: minsup,
         minconf: minconf,
         lift: lift,
+        itemsets_mode: itemsets_mode,
         ids: ids
     };
 
@@ -309,7 +382,11 @@ function find_patterns_submit() {
 
         if (Array.isArray(data.patterns)) {
             let patternWordEnding = getPatternWordEnding(data.patterns.length);
-            document.getElementById('TableContainerName').textContent = `Найдено ${data.patterns.length} ${patternWordEnding}:`;
+            let countsText = '';
+            if (data.counts && data.counts.mode_rules !== data.counts.rules) {
+                countsText = ` (без сокращения ${data.counts.rules}, наборов ${data.counts.mode_itemsets} из ${data.counts.itemsets})`;
+            }
+            document.getElementById('TableContainerName').textContent = `Найдено ${data.patterns.length} ${patternWordEnding}${countsText}:`;
 
             data.patterns.forEach(pattern => {
                 let row = tbody.insertRow();
@@ -1,3 +1,1746 @@
-from django.test import TestCase
+import os
+import re
+import json
+import time
+import types
+import threading
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+import tempfile
+import multiprocessing
+from unittest import mock
+import numpy as np
+import pandas as pd
+import aiohttp
+from aiohttp import web
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+from github_patterns_app import views
+from github_patterns_app import repository_storage
+from github_patterns_app.models import RepositoryData
+from github_patterns_app.repository_storage import save_repository_data, load_repository_data
+from github_patterns_app.management.commands.benchmark_ingestion import create_sample, get_synthetic_data
+from github_patterns_app.management.commands.benchmark_sample_loading import load_repository_data_per_sample
+from github_patterns_app.management.commands.benchmark_rules import get_mlxtend_rules, get_rule_counter
+from github_patterns_app.management.commands.benchmark_discretizer import convert_data_to_quantile_numbers_per_cell
+from modules.clickhouse_client import ClickHouseClient
+from modules.github_api_fetcher import GithubApiFetcher
+from modules.github_graphql_fetcher import GithubGraphqlFetcher
+from modules.pattern_miner import PatternMiner
+from modules.job_manager import JobManager
+from modules.github_data_converter import GithubDataConverter
+from modules.discretizer import Discretizer, QuantileBinning, CustomBinning
+from modules.query_builder import ClickHouseQueryBuilder
+from modules.rollup_store import DailyRollupStore
+from modules.query_cache import QueryResultCache
+from modules.github_metadata_cache import GithubMetadataCache
+from modules.mining_result_cache import MiningResultCache
+from modules.transaction_matrix_cache import TransactionMatrixCache
+from modules.service_connector import ServiceConnector, GithubDataParams
+from modules.son import SonMiner, LocalCoordinator
+from modules.itemset_lattice import ItemsetLatticeCache
+from modules.exceptions import NoPatternsException, EmptyTableError, InsufficientRowsError
 
-# Create your tests here.
+
+def get_query_builder():
+    return ClickHouseQueryBuilder(pd.read_json(os.path.join(settings.BASE_DIR, 'dtype_conf.json')))
+
+
+def get_transactions_matrix(rows_count=300, items_count=10, density=0.45, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.random((rows_count, items_count)) < density,
+                        columns=[f'item {item}' for item in range(items_count)])
+
+
+def get_itemsets(frequent_itemsets):
+    return [(frozenset(itemset), round(support, 12))
+            for support, itemset in zip(frequent_itemsets['support'], frequent_itemsets['itemsets'])]
+
+
+def get_rules(pattern_miner, transactions_matrix, *mining_params):
+    try:
+        rules = pattern_miner.mine_patterns(transactions_matrix, *mining_params)
+    except NoPatternsException:
+        return set()
+    return set(rules[['antecedents', 'consequents', 'support', 'confidence', 'lift']]
+               .itertuples(index=False, name=None))
+
+
+def get_rules_with_lattice(pattern_miner, transactions_matrix, lattice_cache, sample_ids,
+                           *mining_params):
+    lattice_key = lattice_cache.get_key(list(sample_ids), 'transactions')
+    rules = pattern_miner.mine_patterns(transactions_matrix, *mining_params, lattice_key=lattice_key)
+    return set(rules[['antecedents', 'consequents', 'support', 'confidence', 'lift']]
+               .itertuples(index=False, name=None))
+
+
+@asynccontextmanager
+async def run_stub_server(routes):
+    application = web.Application()
+    application.add_routes(routes)
+    runner = web.AppRunner(application)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    try:
+        yield f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+    finally:
+        await runner.cleanup()
+
+
+class EclatEngineTests(SimpleTestCase):
+    def test_itemsets_match_apriori(self):
+        for seed, density in [(0, 0.45), (1, 0.2), (2, 0.7)]:
+            transactions_matrix = get_transactions_matrix(density=density, seed=seed)
+            for min_supp in [0.02, 0.1, 0.3]:
+                for max_len in [None, 1, 2, 3]:
+                    with self.subTest(seed=seed, min_supp=min_supp, max_len=max_len):
+                        self.assertEqual(
+                            get_itemsets(PatternMiner(engine='eclat')
+                                         .find_frequent_itemsets(transactions_matrix, min_supp, max_len)),
+                            get_itemsets(PatternMiner(engine='apriori')
+                                         .find_frequent_itemsets(transactions_matrix, min_supp, max_len)))
+
+    def test_no_frequent_items(self):
+        transactions_matrix = get_transactions_matrix(density=0.05)
+        self.assertTrue(PatternMiner(engine='eclat').find_frequent_itemsets(transactions_matrix, 0.5).empty)
+
+
+class ProcessPoolTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.executor = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        super().tearDownClass()
+
+
+class ParallelEclatTests(ProcessPoolTestCase):
+    def test_itemsets_match_serial_mining(self):
+        shared_memory_segments = get_shared_memory_segments()
+        transactions_matrix = get_transactions_matrix(rows_count=500)
+        for min_supp, max_len in [(0.05, None), (0.1, 2), (0.9, None)]:
+            with self.subTest(min_supp=min_supp, max_len=max_len):
+                self.assertEqual(
+                    get_itemsets(PatternMiner(engine='eclat', executor=self.executor)
+                                 .find_frequent_itemsets(transactions_matrix, min_supp, max_len)),
+                    get_itemsets(PatternMiner(engine='apriori')
+                                 .find_frequent_itemsets(transactions_matrix, min_supp, max_len)))
+        self.assertEqual(get_shared_memory_segments(), shared_memory_segments)
+
+
+class RecordingCoordinator(LocalCoordinator):
+    def __init__(self):
+        super().__init__()
+        self.tasks_counts = []
+
+    def run(self, function, tasks):
+        self.tasks_counts.append(len(tasks))
+        return super().run(function, tasks)
+
+
+class SonEngineTests(ProcessPoolTestCase):
+    def test_itemsets_match_apriori(self):
+        transactions_matrix = get_transactions_matrix(rows_count=1000)
+        for partitions_count in [1, 3, 7]:
+            for executor in [None, self.executor]:
+                for min_supp, max_len in [(0.05, None), (0.1, 2), (0.9, None)]:
+                    with self.subTest(partitions_count=partitions_count, parallel=executor is not None,
+                                      min_supp=min_supp, max_len=max_len):
+                        self.assertEqual(
+                            get_itemsets(PatternMiner(engine='son', executor=executor,
+                                                      partitions_count=partitions_count)
+                                         .find_frequent_itemsets(transactions_matrix, min_supp, max_len)),
+                            get_itemsets(PatternMiner(engine='apriori')
+                                         .find_frequent_itemsets(transactions_matrix, min_supp, max_len)))
+
+    def test_partitions_run_both_phases_on_the_coordinator(self):
+        coordinator = RecordingCoordinator()
+        SonMiner(partitions_count=4, coordinator=coordinator).find_frequent_itemsets(
+            get_transactions_matrix(rows_count=1000), 0.1)
+        self.assertEqual(coordinator.tasks_counts, [4, 4])
+
+    def test_small_partitions_are_merged(self):
+        # 300 rows at 10% support leave 30 rows of local support, one partition at most
+        self.assertEqual(SonMiner(partitions_count=8).get_partitions_count(300, 0.1), 1)
+
+
+def get_shared_memory_segments():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+class RuleGenerationTests(SimpleTestCase):
+    def test_rules_match_mlxtend_association_rules(self):
+        # 70 items take two mask words
+        for items_count, density, min_supp in [(10, 0.45, 0.05), (70, 0.2, 0.03)]:
+            frequent_itemsets = PatternMiner(engine='apriori').find_frequent_itemsets(
+                get_transactions_matrix(items_count=items_count, density=density), min_supp, 4)
+            for mining_params in [(0.0, 0.0, 1, 1, 3, 3), (0.3, 1.0, 1, 1, 2, 2),
+                                  (0.5, 1.1, 2, 1, 3, 1), (0.2, 0.0, 1, 2, 2, 3)]:
+                with self.subTest(items_count=items_count, mining_params=mining_params):
+                    self.assertEqual(
+                        get_rule_counter(PatternMiner().generate_rules(frequent_itemsets, *mining_params)),
+                        get_rule_counter(get_mlxtend_rules(frequent_itemsets, *mining_params)))
+
+    def test_rule_sides_list_items_in_name_order(self):
+        frequent_itemsets = pd.DataFrame({'support': [0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5],
+                                          'itemsets': [frozenset(['c']), frozenset(['a']), frozenset(['b']),
+                                                       frozenset(['c', 'a']), frozenset(['a', 'b']),
+                                                       frozenset(['c', 'b']), frozenset(['b', 'c', 'a'])]})
+        rules = PatternMiner().generate_rules(frequent_itemsets, 0.0, 0.0, 2, 1, 2, 1)
+        self.assertEqual(list(rules['antecedents']), ['(a), (b)', '(a), (c)', '(b), (c)'])
+        self.assertEqual(list(rules['confidence']), [1.0, 1.0, 1.0])
+
+
+class ItemsetsModesTests(SimpleTestCase):
+    def setUp(self):
+        transactions_matrix = get_transactions_matrix(rows_count=500, items_count=8, density=0.3)
+        # Implied and equivalent items give itemsets that are not closed
+        transactions_matrix['either'] = transactions_matrix['item 0'] | transactions_matrix['item 1']
+        transactions_matrix['both'] = transactions_matrix['item 2'] & transactions_matrix['item 3']
+        transactions_matrix['copy'] = transactions_matrix['item 4']
+        self.frequent_itemsets = PatternMiner(engine='eclat').find_frequent_itemsets(transactions_matrix,
+                                                                                     0.02, 5)
+
+    def get_rules(self, itemsets_mode, mining_params):
+        pattern_miner = PatternMiner()
+        rules = pattern_miner.generate_rules(self.frequent_itemsets, *mining_params, itemsets_mode)
+        return {(get_rule_side(antecedents), get_rule_side(consequents)): (support, confidence, lift)
+                for antecedents, consequents, support, confidence, lift
+                in rules.itertuples(index=False)}, pattern_miner.last_counts
+
+    def test_closed_rules_cover_dropped_rules(self):
+        for mining_params in [(0.0, 0.0, 1, 1, 3, 2), (0.3, 1.0, 1, 1, 2, 2), (0.1, 0.0, 2, 1, 3, 2)]:
+            with self.subTest(mining_params=mining_params):
+                all_rules, _ = self.get_rules('all', mining_params)
+                closed_rules, counts = self.get_rules('closed', mining_params)
+
+                self.assertLess(len(closed_rules), len(all_rules))
+                self.assertEqual((counts['rules'], counts['mode_rules']), (len(all_rules), len(closed_rules)))
+                for rule, metrics in closed_rules.items():
+                    self.assertEqual(all_rules[rule], metrics)
+                for (antecedent, consequent), (support, confidence, lift) in all_rules.items():
+                    if (antecedent, consequent) in closed_rules:
+                        continue
+                    self.assertTrue(any(
+                        covering_antecedent <= antecedent and covering_consequent >= consequent
+                        and covering_metrics[:2] == (support, confidence) and covering_metrics[2] >= lift
+                        for (covering_antecedent, covering_consequent), covering_metrics
+                        in closed_rules.items()))
+
+    def test_maximal_rules_come_from_maximal_itemsets(self):
+        itemsets = set(map(frozenset, self.frequent_itemsets['itemsets']))
+        maximal_itemsets = {itemset for itemset in itemsets
+                            if not any(itemset < other_itemset for other_itemset in itemsets)}
+        maximal_rules, counts = self.get_rules('maximal', (0.0, 0.0, 1, 1, 3, 2))
+
+        self.assertEqual(counts['mode_itemsets'], len(maximal_itemsets))
+        self.assertTrue(maximal_rules)
+        for antecedent, consequent in maximal_rules:
+            self.assertIn(antecedent | consequent, maximal_itemsets)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            PatternMiner().generate_rules(self.frequent_itemsets, 0.0, 0.0, itemsets_mode='minimal')
+
+
+def get_rule_side(rule_side):
+    return frozenset(rule_side[1:-1].split('), ('))
+
+
+class FpmaxEngineTests(SimpleTestCase):
+    def test_rules_match_apriori_within_element_limits(self):
+        transactions_matrix = get_transactions_matrix()
+        for element_limits in [(1, 1, 1, 1), (1, 1, 2, 1), (1, 1, 3, 3), (2, 1, 3, 2)]:
+            for min_supp in [0.05, 0.1, 0.2]:
+                mining_params = (min_supp, 0.1, 0.0, *element_limits)
+                with self.subTest(element_limits=element_limits, min_supp=min_supp):
+                    self.assertEqual(get_rules(PatternMiner(engine='fpmax'), transactions_matrix,
+                                               *mining_params),
+                                     get_rules(PatternMiner(engine='apriori'), transactions_matrix,
+                                               *mining_params))
+
+
+class GithubApiFetcherTests(SimpleTestCase):
+    RESPONSES = {
+        'owner/public': (200, {'language': 'Python', 'license': None}),
+        'owner/deleted': (404, {'message': 'Not Found'}),
+        'owner/unauthorized': (401, {'message': 'Bad credentials'}),
+        'owner/forbidden': (403, {'message': 'Resource not accessible'}),
+    }
+
+    def test_only_definitive_statuses_succeed(self):
+        responses, report = asyncio.run(self.fetch_repositories(list(self.RESPONSES)))
+
+        self.assertEqual([(repo_name, status) for repo_name, _, status, _ in responses],
+                         [('owner/public', 200), ('owner/deleted', 404),
+                          ('owner/unauthorized', None), ('owner/forbidden', None)])
+        self.assertEqual(report.succeeded, 2)
+        self.assertEqual(report.failed, 2)
+        self.assertEqual(report.requests, 4)
+
+    async def fetch_repositories(self, repo_names):
+        async def get_repository(request):
+            status, body = self.RESPONSES[f"{request.match_info['owner']}/{request.match_info['name']}"]
+            return web.json_response(body, status=status)
+
+        async with run_stub_server([web.get('/repos/{owner}/{name}', get_repository)]) as api_url:
+            async with GithubApiFetcher({}, api_url=api_url, backoff_base=0.01) as fetcher:
+                return await fetcher.fetch_repositories(repo_names), fetcher.report
+
+
+class FakeClock():
+    """
+    Clock of the GitHub fetchers whose sleeps return at once and move the time forward.
+    """
+    def __init__(self):
+        self.now = time.time()
+        self.delays = []
+
+    async def sleep(self, delay):
+        self.delays.append(delay)
+        self.now += delay
+        await asyncio.sleep(0)
+
+    @contextmanager
+    def patch(self):
+        fake_asyncio = types.SimpleNamespace(**{**vars(asyncio), 'sleep': self.sleep})
+        # The jitter is drawn at its upper bound to make the delays exact
+        fake_random = types.SimpleNamespace(uniform=lambda low, high: high)
+        with mock.patch('modules.github_api_fetcher.asyncio', fake_asyncio), \
+                mock.patch('modules.github_api_fetcher.time', types.SimpleNamespace(time=lambda: self.now)), \
+                mock.patch('modules.github_api_fetcher.random', fake_random), \
+                mock.patch('modules.github_graphql_fetcher.asyncio', fake_asyncio):
+            yield
+
+
+class GithubApiRateLimitTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.responses = {}
+
+    async def get_repository(self, request):
+        repo_responses = self.responses[f"{request.match_info['owner']}/{request.match_info['name']}"]
+        status, headers, body = repo_responses.pop(0) if len(repo_responses) > 1 else repo_responses[0]
+        return web.json_response(body, status=status, headers=headers)
+
+    def fetch(self, *repo_names_groups, **fetcher_kwargs):
+        async def fetch():
+            async with run_stub_server([web.get('/repos/{owner}/{name}', self.get_repository)]) as api_url:
+                async with GithubApiFetcher({}, api_url=api_url, **fetcher_kwargs) as fetcher:
+                    responses = []
+                    # Groups are fetched one after another
+                    for repo_names in repo_names_groups:
+                        responses += await fetcher.fetch_repositories(repo_names)
+                    return [(repo_name, status) for repo_name, _, status, _ in responses], fetcher.report
+
+        with self.clock.patch():
+            return asyncio.run(fetch())
+
+    def test_retry_after_is_waited(self):
+        self.responses['owner/a'] = [(429, {'Retry-After': '7'}, {}), (200, {}, {})]
+
+        responses, report = self.fetch(['owner/a'], backoff_base=0.5)
+
+        self.assertEqual(responses, [('owner/a', 200)])
+        self.assertEqual(self.clock.delays, [7.5])
+        self.assertEqual((report.requests, report.succeeded, report.throttled), (2, 1, 1))
+
+    def test_exhausted_rate_limit_waits_for_the_reset(self):
+        reset = str(int(self.clock.now) + 30)
+        self.responses['owner/a'] = [(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset},
+                                      {'message': 'API rate limit exceeded'}),
+                                     (200, {}, {})]
+
+        responses, report = self.fetch(['owner/a'], backoff_base=0.5)
+
+        self.assertEqual(responses, [('owner/a', 200)])
+        self.assertEqual(len(self.clock.delays), 1)
+        self.assertAlmostEqual(self.clock.delays[0], 30.5, delta=1)
+        self.assertEqual(report.throttled, 1)
+
+    def test_last_allowed_request_delays_the_next_ones(self):
+        reset = str(int(self.clock.now) + 20)
+        self.responses['owner/a'] = [(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}, {})]
+        self.responses['owner/b'] = [(200, {}, {})]
+
+        responses, report = self.fetch(['owner/a'], ['owner/b'])
+
+        self.assertEqual(responses, [('owner/a', 200), ('owner/b', 200)])
+        self.assertEqual(len(self.clock.delays), 1)
+        self.assertAlmostEqual(self.clock.delays[0], 20, delta=1)
+        self.assertEqual((report.requests, report.throttled), (2, 0))
+
+    def test_rate_limit_message_without_headers(self):
+        self.responses['owner/a'] = [(403, {}, {'message': 'API rate limit exceeded'}), (200, {}, {})]
+
+        responses, report = self.fetch(['owner/a'], backoff_base=0.5)
+
+        self.assertEqual(responses, [('owner/a', 200)])
+        self.assertEqual(self.clock.delays, [1.0])
+        self.assertEqual(report.throttled, 1)
+
+    def test_wait_is_capped(self):
+        self.responses['owner/a'] = [(429, {'Retry-After': '3600'}, {}), (200, {}, {})]
+
+        self.fetch(['owner/a'], backoff_base=0.5, backoff_max=10)
+
+        self.assertEqual(self.clock.delays, [10.5])
+
+    def test_server_errors_back_off_exponentially(self):
+        self.responses['owner/a'] = [(503, {}, {}), (502, {}, {}), (500, {}, {}), (200, {}, {})]
+
+        responses, report = self.fetch(['owner/a'], backoff_base=1, backoff_max=3)
+
+        self.assertEqual(responses, [('owner/a', 200)])
+        self.assertEqual(self.clock.delays, [1, 2, 3])
+        self.assertEqual((report.requests, report.succeeded, report.throttled), (4, 1, 0))
+
+    def test_server_errors_fail_after_the_retries(self):
+        self.responses['owner/a'] = [(503, {}, {})]
+
+        responses, report = self.fetch(['owner/a'], max_retries=2, backoff_base=1)
+
+        self.assertEqual(responses, [('owner/a', None)])
+        self.assertEqual(self.clock.delays, [1, 2, 4])
+        self.assertEqual((report.requests, report.failed), (3, 1))
+
+
+class GithubGraphqlFetcherTests(SimpleTestCase):
+    ALIAS_PATTERN = re.compile(r'(r\d+): repository\(owner: ("(?:[^"\\]|\\.)*"), name: ("(?:[^"\\]|\\.)*")\)')
+    REPOSITORIES = {
+        'owner/python-app': {'primaryLanguage': {'name': 'Python'}, 'licenseInfo': {'name': 'MIT License'}},
+        'owner/no.language': {'primaryLanguage': None, 'licenseInfo': None},
+    }
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.batch_sizes = []
+        self.failing_repo_name = None
+        self.graphql_errors_count = 0
+
+    async def handle_query(self, request):
+        aliases = {alias: f'{json.loads(owner)}/{json.loads(name)}'
+                   for alias, owner, name in self.ALIAS_PATTERN.findall((await request.json())['query'])}
+        self.batch_sizes.append(len(aliases))
+        if self.failing_repo_name in aliases.values():
+            return web.json_response({'message': 'Server Error'}, status=502)
+        if self.graphql_errors_count:
+            self.graphql_errors_count -= 1
+            return web.json_response({'data': None, 'errors': [{'message': 'Something went wrong'}]})
+
+        # Fields come back in another order than they were requested
+        return web.json_response({'data': {alias: self.REPOSITORIES.get(repo_name,
+                                                                        None if 'gone' in repo_name else {})
+                                           for alias, repo_name in reversed(aliases.items())}})
+
+    def fetch(self, repo_names):
+        async def fetch():
+            async with run_stub_server([web.post('/graphql', self.handle_query)]) as api_url:
+                async with GithubGraphqlFetcher({}, api_url=api_url, max_retries=1) as fetcher:
+                    return await fetcher.fetch_repositories_metadata(repo_names), fetcher.report
+
+        with self.clock.patch():
+            return asyncio.run(fetch())
+
+    def test_aliases_map_back_to_repositories(self):
+        metadata, report = self.fetch(['owner/python-app', 'owner/gone', 'owner/no.language'])
+
+        self.assertEqual(metadata, {
+            'owner/python-app': {'status': 200, 'language': 'Python', 'license_name': 'MIT License',
+                                 'etag': None},
+            'owner/gone': {'status': 404, 'language': None, 'license_name': None, 'etag': None},
+            'owner/no.language': {'status': 200, 'language': None, 'license_name': None, 'etag': None},
+        })
+        self.assertEqual((report.requests, report.succeeded), (1, 3))
+
+    def test_batches_are_split_at_batch_size(self):
+        repo_names = [f'owner/repo{index}' for index in range(250)]
+
+        metadata, report = self.fetch(repo_names)
+
+        self.assertEqual(sorted(self.batch_sizes), [50, 100, 100])
+        self.assertEqual(set(metadata), set(repo_names))
+        self.assertEqual((report.requests, report.succeeded), (3, 250))
+
+    def test_failed_batch_is_omitted(self):
+        repo_names = [f'owner/repo{index}' for index in range(150)]
+        self.failing_repo_name = 'owner/repo120'
+
+        metadata, report = self.fetch(repo_names)
+
+        # The batch is tried once more before it fails
+        self.assertEqual(sorted(self.batch_sizes), [50, 50, 100])
+        self.assertEqual(set(metadata), set(repo_names[:100]))
+        self.assertEqual((report.succeeded, report.failed), (100, 50))
+
+    def test_errors_without_data_are_retried(self):
+        self.graphql_errors_count = 1
+
+        metadata, report = self.fetch(['owner/python-app'])
+
+        self.assertEqual(metadata['owner/python-app']['language'], 'Python')
+        self.assertEqual((report.requests, report.succeeded, report.failed), (2, 1, 0))
+        self.assertEqual(len(self.clock.delays), 1)
+
+
+class RecordingPatternMiner(PatternMiner):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mined_supports = []
+
+    def find_frequent_itemsets(self, transactions_matrix, min_supp, max_len=None):
+        self.mined_supports.append(min_supp)
+        return super().find_frequent_itemsets(transactions_matrix, min_supp, max_len)
+
+
+class ItemsetLatticeCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.transactions_matrix = get_transactions_matrix()
+
+    def mine(self, pattern_miner, lattice_cache, min_supp, sample_ids=(1,)):
+        return get_rules_with_lattice(pattern_miner, self.transactions_matrix, lattice_cache,
+                                      sample_ids, min_supp, 0.1, 0.0)
+
+    def test_lattice_answers_higher_supports_without_mining(self):
+        lattice_cache = ItemsetLatticeCache()
+        pattern_miner = RecordingPatternMiner(engine='eclat', lattice_cache=lattice_cache,
+                                              lattice_floor=0.05)
+        for min_supp in [0.2, 0.1, 0.05]:
+            with self.subTest(min_supp=min_supp):
+                self.assertEqual(self.mine(pattern_miner, lattice_cache, min_supp),
+                                 get_rules(PatternMiner(engine='apriori'), self.transactions_matrix,
+                                           min_supp, 0.1, 0.0))
+        self.assertEqual(pattern_miner.mined_supports, [0.05])
+        self.assertEqual(lattice_cache.get_stats()['hits'], 2)
+
+    def test_oversized_floor_lattice_falls_back_to_query_support(self):
+        lattice_cache = ItemsetLatticeCache(max_size=1)
+        pattern_miner = RecordingPatternMiner(engine='eclat', lattice_cache=lattice_cache,
+                                              lattice_floor=0.05)
+        self.mine(pattern_miner, lattice_cache, 0.2)
+        self.mine(pattern_miner, lattice_cache, 0.2)
+        self.assertEqual(pattern_miner.mined_supports, [0.05, 0.2])
+        self.assertEqual(lattice_cache.get_stats()['oversized'], 1)
+
+        lattice_cache.invalidate_sample(1)
+        self.assertEqual(lattice_cache.get_stats()['oversized'], 0)
+
+
+
+class ClickHouseQueryBuilderTests(SimpleTestCase):
+    def test_data_query_is_one_aggregation_pass(self):
+        query = get_query_builder().build_data_query(GithubDataParams(
+            ['pushes', 'avg_push_size', 'language'], '2024-01-01', '2024-02-01', limit=50,
+            min_watch_event_count=10, min_members_count=4, is_new_repos=True))
+
+        self.assertEqual(query.count('FROM github_events'), 1)
+        self.assertNotIn('JOIN', query)
+        self.assertIn('GROUP BY repo_name', query)
+        self.assertIn("countIf(event_type = 'PushEvent') AS pushes", query)
+        self.assertIn("if(countIf(event_type = 'PushEvent') = 0, 0, "
+                      "sumIf(push_size, event_type = 'PushEvent') / countIf(event_type = 'PushEvent')) "
+                      "AS avg_push_size", query)
+        # Attributes of the GitHub API are not queried from ClickHouse
+        self.assertNotIn('language', query)
+        self.assertIn("HAVING countIf(event_type = 'CreateEvent' AND ref_type = 'repository') >= 1 "
+                      "AND countIf(event_type = 'WatchEvent') >= 10 "
+                      "AND countIf(event_type = 'MemberEvent' AND action = 'added') >= 2", query)
+        self.assertIn('LIMIT 50', query)
+
+    def test_data_query_without_filters(self):
+        query = get_query_builder().build_data_query(GithubDataParams(
+            ['pushes'], '2024-01-01', '2024-02-01', min_watch_event_count=0, min_members_count=0))
+        self.assertNotIn('HAVING', query)
+
+
+class PartialResultsMergeTests(SimpleTestCase):
+    def setUp(self):
+        self.query_builder = get_query_builder()
+        self.query_params = GithubDataParams(['pushes', 'avg_push_size', 'merged_pull_requests_ratio'],
+                                             '2024-01-01', '2024-03-01', limit=10,
+                                             min_watch_event_count=5, min_members_count=0)
+        columns = self.query_builder.get_partial_columns(self.query_params)
+        self.partial_results = [
+            pd.DataFrame([['a', 2, 10, 2, 1, 2, 3],
+                          ['b', 0, 0, 0, 0, 0, 6],
+                          ['c', 1, 4, 1, 0, 0, 1]], columns=columns),
+            pd.DataFrame([['a', 3, 5, 3, 1, 1, 2],
+                          ['c', 1, 2, 1, 0, 0, 1]], columns=columns),
+        ]
+
+    def test_partial_query_returns_mergeable_columns(self):
+        query = self.query_builder.build_partial_data_query(self.query_params, '2024-01-01', '2024-02-01')
+
+        self.assertEqual(self.query_builder.get_partial_columns(self.query_params),
+                         ['repo', 'pushes', 'avg_push_size', 'avg_push_size__divisor',
+                          'merged_pull_requests_ratio', 'merged_pull_requests_ratio__divisor',
+                          'min_watches_filter'])
+        self.assertIn("countIf(event_type = 'PushEvent') AS avg_push_size__divisor", query)
+        self.assertIn("countIf(event_type = 'WatchEvent') AS min_watches_filter", query)
+        # Only rows adding nothing to the totals are dropped by the shard query
+        self.assertIn("HAVING countIf(event_type = 'PushEvent') != 0 "
+                      "OR sumIf(push_size, event_type = 'PushEvent') != 0 "
+                      "OR countIf(event_type = 'PullRequestEvent' AND merged = 1) != 0 ", query)
+        self.assertEqual(query.count("countIf(event_type = 'PushEvent') != 0"), 1)
+        self.assertIn(" OR countIf(event_type = 'WatchEvent') != 0", query)
+        self.assertNotIn('>=', query)
+        for clause in ['ORDER BY', 'LIMIT']:
+            self.assertNotIn(clause, query)
+
+    def test_partial_query_without_filters_keeps_every_repository(self):
+        self.query_params.min_watch_event_count = 0
+        query = self.query_builder.build_partial_data_query(self.query_params, '2024-01-01', '2024-02-01')
+        self.assertNotIn('HAVING', query)
+
+    def test_shard_boundaries_splitting_repository_events(self):
+        self.query_params = GithubDataParams(['pushes', 'avg_push_size'], '2024-01-01', '2024-03-01',
+                                             limit=10, min_watch_event_count=3, min_members_count=0)
+        events = pd.DataFrame([
+            # a passes the filter only with the watches of both months
+            ['a', '2024-01-30', 'WatchEvent', 0], ['a', '2024-02-01', 'WatchEvent', 0],
+            ['a', '2024-02-02', 'WatchEvent', 0], ['a', '2024-01-31', 'PushEvent', 4],
+            ['a', '2024-02-01', 'PushEvent', 2], ['a', '2024-02-01', 'PushEvent', 6],
+            # b has only other events in January and no pushes at all
+            ['b', '2024-01-10', 'IssuesEvent', 0], ['b', '2024-02-10', 'WatchEvent', 0],
+            ['b', '2024-02-11', 'WatchEvent', 0], ['b', '2024-02-12', 'WatchEvent', 0],
+            # c has many pushes but too few watches
+            ['c', '2024-01-05', 'PushEvent', 1], ['c', '2024-02-05', 'PushEvent', 1],
+            ['c', '2024-01-06', 'WatchEvent', 0], ['c', '2024-02-06', 'WatchEvent', 0],
+            ['d', '2024-01-15', 'IssuesEvent', 0],
+        ], columns=['repo', 'created_at', 'event_type', 'push_size'])
+
+        def get_partial_result(start_date, end_date):
+            # The shard query evaluated over the events, its HAVING included
+            shard_events = events[(start_date <= events['created_at']) & (events['created_at'] < end_date)]
+            is_push = shard_events['event_type'] == 'PushEvent'
+            partial_result = pd.DataFrame({
+                'repo': shard_events['repo'],
+                'pushes': is_push,
+                'avg_push_size': shard_events['push_size'].where(is_push, 0),
+                'avg_push_size__divisor': is_push,
+                'min_watches_filter': shard_events['event_type'] == 'WatchEvent',
+            }).groupby('repo', as_index=False).sum()
+            return partial_result[(partial_result.drop(columns='repo') != 0).any(axis=1)]
+
+        shard_results = [get_partial_result('2024-01-01', '2024-02-01'),
+                         get_partial_result('2024-02-01', '2024-03-01')]
+        self.assertEqual(list(shard_results[0]['repo']), ['a', 'c'])
+        self.assertEqual(list(shard_results[0].columns), self.query_builder.get_partial_columns(self.query_params))
+
+        data = self.query_builder.merge_partial_results(shard_results, self.query_params)
+        whole_period_data = self.query_builder.merge_partial_results(
+            [get_partial_result('2024-01-01', '2024-03-01')], self.query_params)
+
+        data = data.sort_values('repo').reset_index(drop=True)
+        pd.testing.assert_frame_equal(data, whole_period_data.sort_values('repo').reset_index(drop=True))
+        pd.testing.assert_frame_equal(data, pd.DataFrame({
+            'repo': ['a', 'b'],
+            'pushes': [3, 0],
+            'avg_push_size': [4.0, 0.0],
+        }), check_dtype=False)
+
+    def test_shards_are_summed_before_ratios_and_filters(self):
+        data = self.query_builder.merge_partial_results(self.partial_results, self.query_params)
+        data = data.sort_values('repo').reset_index(drop=True)
+
+        # c has 2 watches over both shards, below the threshold of 5
+        pd.testing.assert_frame_equal(data, pd.DataFrame({
+            'repo': ['a', 'b'],
+            'pushes': [5, 0],
+            'avg_push_size': [3.0, 0.0],
+            'merged_pull_requests_ratio': [2 / 3, 0.0],
+        }), check_dtype=False)
+
+    def test_limit_draws_repositories(self):
+        self.query_params.limit = 1
+        data = self.query_builder.merge_partial_results(self.partial_results, self.query_params)
+        self.assertEqual(len(data), 1)
+        self.assertIn(data['repo'][0], ['a', 'b'])
+
+    def test_empty_partial_results(self):
+        self.assertTrue(self.query_builder.merge_partial_results([pd.DataFrame()], self.query_params).empty)
+
+
+class DailyRollupStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.query_builder = get_query_builder()
+        self.store = DailyRollupStore(self.temp_dir.name,
+                                      self.query_builder.build_daily_partial_data_query('{start}', '{end}'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_days_exclude_the_end_date(self):
+        self.assertEqual(self.store.get_days('2024-02-28', '2024-03-02'),
+                         ['2024-02-28', '2024-02-29', '2024-03-01'])
+
+    def test_saved_days_are_loaded_and_merged_like_shards(self):
+        query_params = GithubDataParams(['pushes', 'avg_push_size'], '2024-01-01', '2024-01-04',
+                                        min_watch_event_count=0, min_members_count=0)
+        columns = self.query_builder.get_partial_columns(query_params)
+        daily_data = pd.DataFrame({'day': ['2024-01-01', '2024-01-01', '2024-01-02'],
+                                   'repo': ['a', 'b', 'a'],
+                                   'pushes': [2, 1, 3],
+                                   'avg_push_size': [10, 1, 5],
+                                   'avg_push_size__divisor': [2, 1, 3]})
+        # The third day had no events and is stored empty
+        self.store.save(daily_data, ['2024-01-01', '2024-01-02', '2024-01-03'])
+
+        days = self.store.get_days('2024-01-01', '2024-01-05')
+        self.assertEqual(self.store.get_missing_days(days), ['2024-01-04'])
+
+        data = self.query_builder.merge_partial_results([self.store.load(days[:3], columns)], query_params)
+        pd.testing.assert_frame_equal(data.sort_values('repo').reset_index(drop=True),
+                                      pd.DataFrame({'repo': ['a', 'b'],
+                                                    'pushes': [5, 1],
+                                                    'avg_push_size': [3.0, 1.0]}),
+                                      check_dtype=False)
+
+    def test_store_is_keyed_by_the_rollup_query(self):
+        same_store = DailyRollupStore(self.temp_dir.name,
+                                      ' '.join(self.query_builder
+                                               .build_daily_partial_data_query('{start}', '{end}').split()))
+        other_store = DailyRollupStore(self.temp_dir.name, 'SELECT 1')
+        self.assertEqual(same_store.rollup_dir, self.store.rollup_dir)
+        self.assertNotEqual(other_store.rollup_dir, self.store.rollup_dir)
+
+    def test_only_the_given_days_are_stored(self):
+        daily_data = pd.DataFrame({'day': ['2024-01-01', '2024-01-02'],
+                                   'repo': ['a', 'a'],
+                                   'pushes': [1, 2]})
+        # The second day is not settled yet and is queried again next time
+        self.store.save(daily_data, ['2024-01-01'])
+
+        days = self.store.get_days('2024-01-01', '2024-01-03')
+        self.assertEqual(self.store.get_missing_days(days), ['2024-01-02'])
+        pd.testing.assert_frame_equal(self.store.load(['2024-01-01'], ['repo', 'pushes']),
+                                      pd.DataFrame({'repo': ['a'], 'pushes': [1]}))
+        # The day is the file name, it is not stored as a column
+        self.assertEqual(list(pd.read_parquet(self.store._get_path('2024-01-01')).columns),
+                         ['repo', 'pushes'])
+
+    def test_empty_days_load_an_empty_frame(self):
+        self.store.save(pd.DataFrame(columns=['day', 'repo', 'pushes']), ['2024-01-01'])
+        data = self.store.load(['2024-01-01'], ['repo', 'pushes'])
+        self.assertTrue(data.empty)
+        self.assertEqual(list(data.columns), ['repo', 'pushes'])
+
+
+class QueryResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data = pd.DataFrame({'repo': ['a', 'b'], 'pushes': [1, 2]})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_ignores_list_order_and_query_whitespace(self):
+        cache = QueryResultCache(self.temp_dir.name)
+        self.assertEqual(cache.get_key({'metrics': ['a', 'b']}, 'SELECT 1\n  FROM t'),
+                         cache.get_key({'metrics': ['b', 'a']}, 'SELECT 1 FROM t'))
+        self.assertNotEqual(cache.get_key({'metrics': ['a']}, 'SELECT 1'),
+                            cache.get_key({'metrics': ['a']}, 'SELECT 2'))
+
+    def test_saved_result_is_returned_until_it_expires(self):
+        cache = QueryResultCache(self.temp_dir.name)
+        key = cache.get_key({}, 'SELECT 1')
+        self.assertIsNone(cache.get(key))
+
+        cache.put(key, self.data)
+        pd.testing.assert_frame_equal(cache.get(key), self.data)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        expired_cache = QueryResultCache(self.temp_dir.name, ttl=-1)
+        self.assertIsNone(expired_cache.get(key))
+        self.assertEqual(cache.get_stats()['entries'], 0)
+
+    def test_least_recently_used_results_are_evicted(self):
+        cache = QueryResultCache(self.temp_dir.name, max_size=0)
+        first_key, second_key = cache.get_key({}, 'SELECT 1'), cache.get_key({}, 'SELECT 2')
+        cache.put(first_key, self.data)
+        cache.put(second_key, self.data)
+
+        # The result just saved is kept even over the limit
+        self.assertIsNone(cache.get(first_key))
+        self.assertIsNotNone(cache.get(second_key))
+
+    def test_hit_refreshes_the_eviction_order(self):
+        cache = QueryResultCache(self.temp_dir.name)
+        keys = [cache.get_key({}, f'SELECT {index}') for index in range(3)]
+        cache.put(keys[0], self.data)
+        cache.put(keys[1], self.data)
+        for age, key in [(200, keys[0]), (100, keys[1])]:
+            path = cache._get_path(key)
+            os.utime(path, (time.time() - age, os.path.getmtime(path)))
+
+        # The oldest result was just read, the other one is evicted
+        cache.get(keys[0])
+        cache.max_size = cache.get_stats()['size']
+        cache.put(keys[2], self.data)
+        self.assertEqual([cache.get(key) is not None for key in keys], [True, False, True])
+
+    def test_unreadable_result_is_a_miss(self):
+        cache = QueryResultCache(self.temp_dir.name)
+        key = cache.get_key({}, 'SELECT 1')
+        with open(cache._get_path(key), 'wb') as result_file:
+            result_file.write(b'not parquet')
+
+        self.assertIsNone(cache.get(key))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache.clear()
+        self.assertEqual(cache.get_stats()['entries'], 0)
+
+
+class GithubMetadataCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'github', 'metadata.sqlite3')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_saved_metadata_is_returned_for_known_repositories(self):
+        cache = GithubMetadataCache(self.cache_path)
+        cache.put_many({'a/a': {'status': 200, 'language': 'Python',
+                                'license_name': 'MIT License', 'etag': '"a"'},
+                        'b/b': {'status': 404, 'language': None,
+                                'license_name': None, 'etag': None}})
+
+        # A new instance reads the same file
+        metadata = GithubMetadataCache(self.cache_path).get_many(['a/a', 'b/b', 'c/c'])
+        self.assertEqual(set(metadata), {'a/a', 'b/b'})
+        self.assertEqual(metadata['a/a']['language'], 'Python')
+        self.assertEqual(metadata['a/a']['etag'], '"a"')
+        self.assertEqual(metadata['b/b']['status'], 404)
+
+    def test_not_found_entries_have_their_own_ttl(self):
+        cache = GithubMetadataCache(self.cache_path, ttl=60, not_found_ttl=-1)
+        cache.put_many({'a/a': {'status': 200, 'language': 'Go', 'license_name': None, 'etag': None},
+                        'b/b': {'status': 404, 'language': None, 'license_name': None, 'etag': None}})
+        metadata = cache.get_many(['a/a', 'b/b'])
+        self.assertTrue(cache.is_fresh(metadata['a/a']))
+        self.assertFalse(cache.is_fresh(metadata['b/b']))
+
+    def test_touch_confirms_metadata_without_changing_it(self):
+        cache = GithubMetadataCache(self.cache_path)
+        cache.put_many({'a/a': {'status': 200, 'language': 'C', 'license_name': None, 'etag': '"a"'}})
+        checked_at = cache.get_many(['a/a'])['a/a']['checked_at']
+
+        cache.touch_many(['a/a', 'b/b'])
+        metadata = cache.get_many(['a/a', 'b/b'])
+        self.assertEqual(list(metadata), ['a/a'])
+        self.assertGreaterEqual(metadata['a/a']['checked_at'], checked_at)
+        self.assertEqual(metadata['a/a']['language'], 'C')
+
+    def test_many_repositories_are_read_in_batches(self):
+        cache = GithubMetadataCache(self.cache_path)
+        repo_names = [f'owner/repo{index}' for index in range(1200)]
+        cache.put_many({repo_name: {'status': 200, 'language': None, 'license_name': None, 'etag': None}
+                        for repo_name in repo_names})
+        self.assertEqual(len(cache.get_many(repo_names)), 1200)
+
+    def test_touch_makes_stale_metadata_fresh_again(self):
+        cache = GithubMetadataCache(self.cache_path, ttl=60)
+        cache.put_many({'a/a': {'status': 200, 'language': 'C', 'license_name': None, 'etag': '"a"'}})
+
+        with mock.patch('modules.github_metadata_cache.time.time', return_value=time.time() + 120):
+            self.assertFalse(cache.is_fresh(cache.get_many(['a/a'])['a/a']))
+            cache.touch_many(['a/a'])
+            self.assertTrue(cache.is_fresh(cache.get_many(['a/a'])['a/a']))
+
+    def test_put_replaces_earlier_metadata(self):
+        cache = GithubMetadataCache(self.cache_path)
+        cache.put_many({'a/a': {'status': 200, 'language': 'C', 'license_name': 'MIT', 'etag': '"a"'}})
+        cache.put_many({'a/a': {'status': 404, 'language': None, 'license_name': None, 'etag': None}})
+
+        metadata = cache.get_many(['a/a'])['a/a']
+        self.assertEqual((metadata['status'], metadata['language'], metadata['etag']), (404, None, None))
+
+
+class MiningResultCacheTests(SimpleTestCase):
+    def test_key_ignores_sample_order_and_dictionary_order(self):
+        cache = MiningResultCache()
+        self.assertEqual(cache.get_key([2, 1, 2], {'stars': 'quartile', 'forks': 'decile'}, {'min_supp': 0.1}),
+                         cache.get_key([1, 2], {'forks': 'decile', 'stars': 'quartile'}, {'min_supp': 0.1}))
+        self.assertNotEqual(cache.get_key([1], {}, {'min_supp': 0.1}),
+                            cache.get_key([1], {}, {'min_supp': 0.2}))
+
+    def test_hits_count_the_saved_computation_time(self):
+        cache = MiningResultCache()
+        key = cache.get_key([1], {}, {})
+        self.assertIsNone(cache.get(key))
+
+        cache.put(key, b'result', [1], 2.5)
+        self.assertEqual(cache.get(key), b'result')
+        self.assertEqual(cache.get(key), b'result')
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['saved_time']), (2, 1, 5.0))
+        self.assertEqual(stats['size'], len(b'result'))
+
+    def test_least_recently_used_results_are_evicted(self):
+        cache = MiningResultCache(max_size=10)
+        cache.put('a', b'aaaa', [1], 1.0)
+        cache.put('b', b'bbbb', [1], 1.0)
+        cache.get('a')
+        cache.put('c', b'cccc', [1], 1.0)
+        cache.put('too large', b'x' * 11, [1], 1.0)
+
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+        self.assertEqual(cache.size, 8)
+
+    def test_deleting_a_sample_drops_its_results(self):
+        cache = MiningResultCache()
+        cache.put('a', b'a', [1, 2], 1.0)
+        cache.put('b', b'b', [2], 1.0)
+        cache.put('c', b'c', [3], 1.0)
+
+        cache.invalidate_sample(2)
+        self.assertEqual(list(cache.entries), ['c'])
+        self.assertEqual(cache.size, 1)
+
+
+class MiningResultCacheViewsTests(TestCase):
+    MINING_REQUEST = {'minsup': '0.1', 'minconf': '0.5', 'lift': '1', 'antecedent': '1',
+                      'consequent': '1', 'antecedent_max': '2', 'consequent_max': '1'}
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache = MiningResultCache()
+        for name, cache in [('MINING_RESULT_CACHE', self.cache),
+                            ('TRANSACTION_MATRIX_CACHE', TransactionMatrixCache(self.temp_dir.name))]:
+            patcher = mock.patch.object(views, name, cache)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_repeated_request_is_answered_from_the_cache(self):
+        samples = [create_sample(10), create_sample(10)]
+        sample_ids, quantile_config = views.get_samples_quantile_config([sample.id for sample in samples])
+        key = self.cache.get_key(sample_ids, quantile_config,
+                                 views.get_mining_params(self.MINING_REQUEST))
+        self.cache.put(key, b'{"patterns": []}', sample_ids, 1.5)
+
+        with mock.patch.object(views, 'get_transactions', side_effect=AssertionError):
+            response = self.client.post('/find-patterns-submit',
+                                        json.dumps({**self.MINING_REQUEST,
+                                                    'ids': [str(samples[1].id), str(samples[0].id)]}),
+                                        content_type='application/json')
+
+        self.assertEqual(response.content, b'{"patterns": []}')
+        self.assertEqual(self.client.get('/find-patterns-cache-stats').json()['results']['saved_time'], 1.5)
+
+    def test_deleting_a_sample_drops_its_cached_results(self):
+        samples = [create_sample(10), create_sample(10)]
+        self.cache.put('both', b'a', [samples[0].id, samples[1].id], 1.0)
+        self.cache.put('second', b'b', [samples[1].id], 1.0)
+
+        response = self.client.delete(f'/delete-sample/{samples[0].id}')
+
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(list(self.cache.entries), ['second'])
+
+
+class TransactionMatrixCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # The item count is not a multiple of 8, so the packed rows are padded
+        self.transactions = get_transactions_matrix(rows_count=50, items_count=11)
+        self.quartile_table = pd.DataFrame([[1.0, 2.0, 3.0]], index=['stars'], columns=['Q1', 'Q2', 'Q3'])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_saved_matrix_is_returned_with_its_quantile_tables(self):
+        cache = TransactionMatrixCache(self.temp_dir.name)
+        key = cache.get_key([1], {'stars': 'quartile'}, '{}')
+        self.assertIsNone(cache.get(key))
+
+        cache.put(key, self.transactions, self.quartile_table, None, [1])
+        transactions, quartile_table, decile_table = cache.get(key)
+        pd.testing.assert_frame_equal(transactions, self.transactions)
+        pd.testing.assert_frame_equal(quartile_table, self.quartile_table)
+        self.assertIsNone(decile_table)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key_depends_on_the_quantile_config(self):
+        cache = TransactionMatrixCache(self.temp_dir.name)
+        self.assertEqual(cache.get_key([2, 1], {}, '{}'), cache.get_key([1, 2, 2], {}, '{}'))
+        self.assertNotEqual(cache.get_key([1], {'stars': 'quartile'}, '{}'),
+                            cache.get_key([1], {'stars': 'decile'}, '{}'))
+
+    def test_deleting_a_sample_drops_its_matrices(self):
+        cache = TransactionMatrixCache(self.temp_dir.name)
+        cache.put('a', self.transactions, None, None, [1, 2])
+        cache.put('b', self.transactions, None, None, [3])
+
+        cache.invalidate_sample(2)
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['b.json', 'b.npy'])
+
+    def test_least_recently_used_matrices_are_evicted(self):
+        cache = TransactionMatrixCache(self.temp_dir.name, max_size=0)
+        cache.put('a', self.transactions, None, None, [1])
+        cache.put('b', self.transactions, None, None, [1])
+
+        # The matrix just saved is kept even over the limit
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+        self.assertEqual(cache.get_stats()['entries'], 1)
+
+    def test_hit_refreshes_the_eviction_order(self):
+        cache = TransactionMatrixCache(self.temp_dir.name)
+        cache.put('a', self.transactions, None, None, [1])
+        cache.put('b', self.transactions, None, None, [1])
+        for age, key in [(200, 'a'), (100, 'b')]:
+            matrix_path, _ = cache._get_paths(key)
+            os.utime(matrix_path, (time.time() - age, os.path.getmtime(matrix_path)))
+
+        cache.get('a')
+        cache.max_size = cache.get_stats()['size']
+        cache.put('c', self.transactions, None, None, [1])
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['a.json', 'a.npy', 'c.json', 'c.npy'])
+
+    def test_metadata_without_its_matrix_is_a_miss(self):
+        cache = TransactionMatrixCache(self.temp_dir.name)
+        cache.put('a', self.transactions, None, None, [1])
+        os.remove(cache._get_paths('a')[0])
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_converted_transactions_are_reused(self):
+        repository_data = get_synthetic_data(300, 0).rename(columns={'repo': 'repo_name'})
+        quantile_config = {'pushes': 'qua', 'watches': 'dec', 'language': 'None'}
+        load_data = mock.Mock(return_value=repository_data)
+
+        with mock.patch.object(views, 'TRANSACTION_MATRIX_CACHE', TransactionMatrixCache(self.temp_dir.name)), \
+                mock.patch.object(views, 'get_github_repository_data', load_data):
+            key, transactions, quartiles, deciles = views.get_transactions([2, 1], quantile_config)
+            cached_key, *cached_result = views.get_transactions([1, 2], quantile_config)
+
+        load_data.assert_called_once_with([2, 1])
+        self.assertEqual(cached_key, key)
+        pd.testing.assert_frame_equal(cached_result[0], transactions)
+        pd.testing.assert_frame_equal(cached_result[1], quartiles)
+        pd.testing.assert_frame_equal(cached_result[2], deciles)
+
+
+class ServiceConnectorTestCase(SimpleTestCase):
+    ENVIRONMENT = {
+        'CLICKHOUSE_CACHE_DIR': '',
+        'CLICKHOUSE_SHARD_PERIOD': '',
+        'GITHUB_CACHE_PATH': '',
+    }
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, self.ENVIRONMENT):
+            self.service_connector = ServiceConnector()
+        self.data_params = GithubDataParams(['pushes'], '2024-01-01', '2024-01-08')
+        self.fetched_repo_names = []
+
+        async def fetch_repository(fetcher, repo_name, headers=None):
+            self.fetched_repo_names.append(repo_name)
+            return repo_name, None, None, None
+
+        patcher = mock.patch.object(GithubApiFetcher, 'fetch_repository', fetch_repository)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_chunk(self, start, rows_count):
+        return pd.DataFrame({'repo': [f'owner/repo{index}' for index in range(start, start + rows_count)],
+                             'pushes': range(start, start + rows_count)})
+
+
+class StreamedClickHouseDataTests(ServiceConnectorTestCase):
+    ENVIRONMENT = {**ServiceConnectorTestCase.ENVIRONMENT, 'CLICKHOUSE_STREAM_CHUNK_ROWS': '100'}
+
+    def setUp(self):
+        super().setUp()
+        self.stream_closed = False
+
+    def set_stream(self, *chunks, error=None, wait_forever=False):
+        async def query_stream(query, chunk_rows):
+            self.assertEqual(chunk_rows, 100)
+            try:
+                for chunk in chunks:
+                    yield chunk
+                    # Enrichment must not start before the whole result is checked
+                    self.assertEqual(self.fetched_repo_names, [])
+                if error is not None:
+                    raise error
+                if wait_forever:
+                    await asyncio.Event().wait()
+            finally:
+                self.stream_closed = True
+
+        self.service_connector.clickhouse_client.query_stream = query_stream
+
+    def test_chunks_are_joined_before_enrichment(self):
+        self.set_stream(self.get_chunk(0, 100), self.get_chunk(100, 100), self.get_chunk(200, 50))
+
+        data = asyncio.run(self.service_connector.get_data_from_services(self.data_params))
+
+        self.assertEqual(list(data['repo']), [f'owner/repo{index}' for index in range(250)])
+        self.assertEqual(list(data['pushes']), list(range(250)))
+        self.assertEqual(self.fetched_repo_names, list(data['repo']))
+        self.assertEqual(self.service_connector.get_progress()['rows_fetched'], 250)
+        self.assertTrue(self.stream_closed)
+
+    def test_insufficient_rows_spend_no_api_requests(self):
+        self.set_stream(self.get_chunk(0, 100), self.get_chunk(100, 50))
+
+        with self.assertRaises(InsufficientRowsError):
+            asyncio.run(self.service_connector.get_data_from_services(self.data_params))
+        self.assertEqual(self.fetched_repo_names, [])
+
+    def test_stream_error_spends_no_api_requests(self):
+        self.set_stream(self.get_chunk(0, 100), self.get_chunk(100, 100),
+                        error=EmptyTableError("Ошибка сервиса ClickHouse"))
+
+        with self.assertRaises(EmptyTableError):
+            asyncio.run(self.service_connector.get_data_from_services(self.data_params))
+        self.assertEqual(self.fetched_repo_names, [])
+        self.assertTrue(self.stream_closed)
+
+    def test_cancellation_closes_the_stream(self):
+        self.set_stream(self.get_chunk(0, 100), wait_forever=True)
+
+        async def cancel_after_first_chunk():
+            task = asyncio.create_task(self.service_connector.get_data_from_services(self.data_params))
+            while not self.service_connector.rows_fetched:
+                await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertTrue(self.stream_closed)
+
+        asyncio.run(cancel_after_first_chunk())
+        self.assertEqual(self.fetched_repo_names, [])
+
+
+class ClickHouseClientTests(SimpleTestCase):
+    TYPED_BODY = (b'repo\tstars\tnew_stars\tratio\tlicense\tis_fork\n'
+                  b'String\tUInt64\tNullable(Int32)\tFloat64\tLowCardinality(Nullable(String))\tBool\n'
+                  b'a/a\t10\t\\N\tnan\tMIT\ttrue\n'
+                  b'b/b\t5\t3\t0.5\t\\N\tfalse\n'
+                  b'c/c\t7\t-1\t-nan\tApache\tfalse\n')
+    EMPTY_BODY = b'repo\tstars\nString\tUInt64\n'
+
+    def setUp(self):
+        self.requests = []
+
+    async def handle_query(self, request):
+        query = await request.text()
+        self.requests.append((query, request.query['default_format'],
+                              request.headers['X-ClickHouse-User'], request.headers['X-ClickHouse-Key']))
+        if query == 'SELECT typed':
+            return web.Response(body=self.TYPED_BODY)
+        if query == 'SELECT empty':
+            return web.Response(body=self.EMPTY_BODY)
+        if query == 'SELECT timeout':
+            return web.Response(status=500, text='Code: 159. DB::Exception: Timeout exceeded',
+                                headers={'X-ClickHouse-Exception-Code': '159'})
+        if query == 'SELECT slow':
+            await asyncio.sleep(1)
+            return web.Response(body=self.EMPTY_BODY)
+        if query == 'SELECT midstream':
+            # The status and headers are sent before the error, as ClickHouse does
+            response = web.StreamResponse()
+            await response.prepare(request)
+            await response.write(self.TYPED_BODY)
+            await response.write(b'Code: 241. DB::Exception: Memory limit exceeded\n')
+            return response
+        return web.Response(status=400, text='Code: 62. DB::Exception: Syntax error',
+                            headers={'X-ClickHouse-Exception-Code': '62'})
+
+    async def run_with_client(self, function, **client_kwargs):
+        async with run_stub_server([web.post('/', self.handle_query)]) as url:
+            return await function(ClickHouseClient(url=url + '/', user='reader', password='secret',
+                                                   **client_kwargs))
+
+    async def read_stream(self, client, query, chunk_rows):
+        return [chunk async for chunk in client.query_stream(query, chunk_rows)]
+
+    def test_result_is_typed_by_clickhouse_types(self):
+        data = asyncio.run(self.run_with_client(lambda client: client.query('SELECT typed;')))
+
+        self.assertEqual(self.requests, [('SELECT typed', 'TSVWithNamesAndTypes', 'reader', 'secret')])
+        self.assertEqual(data.dtypes.astype(str).to_dict(),
+                         {'repo': 'object', 'stars': 'int64', 'new_stars': 'Int64',
+                          'ratio': 'float64', 'license': 'object', 'is_fork': 'boolean'})
+        self.assertEqual(list(data['stars']), [10, 5, 7])
+        self.assertTrue(pd.isna(data['new_stars'][0]))
+        self.assertEqual(list(data['new_stars'][1:]), [3, -1])
+        self.assertTrue(data['ratio'][[0, 2]].isna().all())
+        self.assertTrue(pd.isna(data['license'][1]))
+        self.assertEqual(list(data['is_fork']), [True, False, False])
+
+    def test_empty_result_keeps_the_columns(self):
+        data = asyncio.run(self.run_with_client(lambda client: client.query('SELECT empty')))
+        self.assertTrue(data.empty)
+        self.assertEqual(list(data.columns), ['repo', 'stars'])
+
+    def test_stream_yields_the_result_in_chunks(self):
+        chunks = asyncio.run(self.run_with_client(
+            lambda client: self.read_stream(client, 'SELECT typed', 2)))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        # Every chunk is typed by the header, also without nulls in its rows
+        self.assertEqual(chunks[1]['new_stars'].dtype, 'Int64')
+
+        data = asyncio.run(self.run_with_client(lambda client: client.query('SELECT typed')))
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), data)
+
+        self.assertEqual(asyncio.run(self.run_with_client(
+            lambda client: self.read_stream(client, 'SELECT empty', 2))), [])
+
+    def test_error_in_the_middle_of_the_stream(self):
+        chunks = []
+
+        async def read_stream(client):
+            async for chunk in client.query_stream('SELECT midstream', 2):
+                chunks.append(chunk)
+
+        with self.assertRaisesRegex(EmptyTableError, 'Memory limit exceeded'):
+            asyncio.run(self.run_with_client(read_stream))
+        self.assertEqual([len(chunk) for chunk in chunks], [2])
+
+    def test_server_errors(self):
+        for query, message in [('SELECT wrong', 'Syntax error'), ('SELECT timeout', 'Слишком сложный')]:
+            with self.subTest(query=query):
+                with self.assertRaisesRegex(EmptyTableError, message):
+                    asyncio.run(self.run_with_client(lambda client: client.query(query)))
+                with self.assertRaisesRegex(EmptyTableError, message):
+                    asyncio.run(self.run_with_client(lambda client: self.read_stream(client, query, 2)))
+
+    def test_client_timeout(self):
+        with mock.patch.object(ClickHouseClient, '_get_client_timeout',
+                               return_value=aiohttp.ClientTimeout(total=0.1)):
+            with self.assertRaisesRegex(EmptyTableError, 'Слишком сложный'):
+                asyncio.run(self.run_with_client(lambda client: client.query('SELECT slow')))
+
+
+class ClickHouseSeleniumFallbackTests(ServiceConnectorTestCase):
+    def setUp(self):
+        super().setUp()
+        self.selenium_data = self.get_chunk(0, 250)
+        patcher = mock.patch.object(ServiceConnector, '_ServiceConnector__get_clickhouse_data_by_selenium',
+                                    return_value=self.selenium_data)
+        self.get_clickhouse_data_by_selenium = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def get_data(self):
+        async def fail_query(request):
+            return web.Response(status=500, text='Code: 202. DB::Exception: Too many simultaneous queries')
+
+        async with run_stub_server([web.post('/', fail_query)]) as url:
+            self.service_connector.clickhouse_client.url = url + '/'
+            return await self.service_connector.get_data_from_services(self.data_params)
+
+    def test_failed_query_is_scraped(self):
+        self.service_connector.clickhouse_selenium_fallback = True
+        with mock.patch('modules.service_connector.webdriver', object()):
+            data = asyncio.run(self.get_data())
+
+        self.get_clickhouse_data_by_selenium.assert_called_once()
+        self.assertEqual(list(data['repo']), list(self.selenium_data['repo']))
+
+    def test_fallback_is_disabled_by_default(self):
+        with mock.patch('modules.service_connector.webdriver', object()):
+            with self.assertRaisesRegex(EmptyTableError, 'Too many simultaneous queries'):
+                asyncio.run(self.get_data())
+        self.get_clickhouse_data_by_selenium.assert_not_called()
+
+    def test_fallback_without_selenium_raises_the_query_error(self):
+        self.service_connector.clickhouse_selenium_fallback = True
+        with mock.patch('modules.service_connector.webdriver', None):
+            with self.assertRaisesRegex(EmptyTableError, 'Too many simultaneous queries'):
+                asyncio.run(self.get_data())
+        self.get_clickhouse_data_by_selenium.assert_not_called()
+
+
+def get_dummies_transactions(quantile_data):
+    # Item encoding of the converter before the factorized one
+    data = quantile_data.copy()
+    for column in data.columns:
+        if np.issubdtype(data[column].dtype, np.number):
+            data[column] = data[column].apply(lambda x: f'{column} {x}')
+    if 'language' in data.columns:
+        data['language'] = data['language'].apply(
+            lambda x: 'language_' + x if x != 'None' and x != None else x)
+    if 'license_name' in data.columns:
+        data['license_name'] = data['license_name'].apply(
+            lambda x: 'license_' + x.replace('License', '') if x != 'None' and x is not None else x)
+
+    transactions = pd.get_dummies(data, prefix='')
+    transactions = transactions.rename(columns=lambda column: column.replace('_', '', 1).replace('_', ' '))
+    while 'None' in transactions.columns:
+        transactions = transactions.drop(columns='None')
+    if 'Other' in transactions.columns:
+        transactions = transactions.drop(columns='Other')
+    return transactions
+
+
+class GithubDataConverterTests(SimpleTestCase):
+    def get_repository_data(self, rows_count=400, seed=0):
+        rng = np.random.default_rng(seed)
+        return pd.DataFrame({
+            'repo': [f'owner/repo{index}' for index in range(rows_count)],
+            'pushes': rng.integers(0, 40, rows_count),
+            'avg_push_size': rng.exponential(3, rows_count).round(2),
+            'watches': rng.integers(1, 500, rows_count),
+            'language': rng.choice(['Python', 'C++', 'Go', 'None', 'Other'], rows_count),
+            'license_name': rng.choice(['MIT License', 'Apache License 2.0', 'None', None], rows_count),
+            'is_deleted_or_private': rng.random(rows_count) < 0.6,
+        })
+
+    def test_items_match_the_dummy_columns(self):
+        quantile_config = {'pushes': 'dec', 'avg_push_size': 'qua', 'watches': 'log', 'language': 'None',
+                           'license_name': 'None', 'is_deleted_or_private': 'None'}
+        converter = GithubDataConverter()
+        repository_data = self.get_repository_data()
+
+        transactions = converter.convert_data_to_transactions(repository_data, quantile_config)
+
+        cleaned_data = converter._clean_data(repository_data, quantile_config)
+        cut_points = converter.discretizer.get_cut_points(cleaned_data, quantile_config,
+                                                          converter.data_configuration)
+        expected_transactions = get_dummies_transactions(converter.discretizer.discretize(cleaned_data,
+                                                                                          cut_points))
+        # The boolean column comes first, as in get_dummies
+        self.assertEqual(transactions.columns[0], 'isdeleted or private')
+        self.assertIn('license MIT ', transactions.columns)
+        self.assertNotIn('None', transactions.columns)
+        pd.testing.assert_frame_equal(transactions, expected_transactions)
+
+    def test_numeric_items_are_ordered_as_strings(self):
+        converter = GithubDataConverter()
+        matrix, items = converter._GithubDataConverter__encode_items(
+            pd.DataFrame({'pushes': [1, 10, 2, 10], 'language': ['Go', 'None', 'C', None]}))
+
+        self.assertEqual(items, ['pushes 1', 'pushes 10', 'pushes 2', 'language C', 'language Go'])
+        self.assertEqual(matrix.tolist(), [[True, False, False, False, True],
+                                           [False, True, False, False, False],
+                                           [False, False, True, True, False],
+                                           [False, True, False, False, False]])
+
+
+class DiscretizerTests(SimpleTestCase):
+    def discretize(self, data, binning_config, data_configuration=None):
+        discretizer = Discretizer()
+        if data_configuration is None:
+            data_configuration = pd.DataFrame({'columnName': list(data.columns)})
+        cut_points = discretizer.get_cut_points(data, binning_config, data_configuration)
+        return cut_points, discretizer.discretize(data, cut_points)
+
+    def test_ranks_match_the_per_cell_assignment(self):
+        rng = np.random.default_rng(0)
+        rows_count = 2000
+        data = pd.DataFrame({
+            # Mostly zeros, so most quantiles are duplicated
+            'pushes': np.where(rng.random(rows_count) < 0.6, 0, rng.integers(1, 5, rows_count)),
+            # Few distinct values, so many values tie with the cut points
+            'watches': rng.integers(0, 6, rows_count),
+            'avg_push_size': rng.exponential(3.0, rows_count).round(2),
+            'merged_pull_requests_ratio': np.where(rng.random(rows_count) < 0.1, np.nan,
+                                                   rng.random(rows_count).round(1)),
+        })
+        binning_config = {'pushes': 'dec', 'watches': 'qua', 'avg_push_size': 'dec',
+                          'merged_pull_requests_ratio': 'qua'}
+
+        _, ranks = self.discretize(data, binning_config)
+
+        pd.testing.assert_frame_equal(ranks, convert_data_to_quantile_numbers_per_cell(data, binning_config))
+
+    def test_values_at_cut_points_and_missing_values(self):
+        ranks = Discretizer().get_ranks(np.array([0, 1, 1.5, 2, 3, 3.5, np.nan]),
+                                        np.array([1.0, 2.0, 3.0]))
+        # A value equal to a cut point is not above it
+        self.assertEqual(ranks.tolist(), [4, 4, 3, 3, 2, 1, 4])
+
+    def test_duplicated_quantiles_are_kept_once(self):
+        values = pd.Series([0, 0, 0, 0, 0, 0, 1, 2, 3, 4])
+        cut_points = QuantileBinning([0, 0.25, 0.5, 0.75, 1]).get_cut_points(values, {})
+        self.assertEqual(cut_points.tolist(), [0.0, 1.75])
+
+        constant_cut_points = QuantileBinning([0, 0.25, 0.5, 0.75, 1]).get_cut_points(pd.Series([7] * 5), {})
+        # The value is kept as the maximum, which is not a cut point
+        self.assertEqual(constant_cut_points.tolist(), [])
+
+    def test_equal_width_and_log_binnings(self):
+        data = pd.DataFrame({'watches': [0, 10, 30, 60, 100], 'pushes': [-5, 5, 50, 500, 9999]})
+
+        cut_points, ranks = self.discretize(data, {'watches': 'eqw', 'pushes': 'log'})
+
+        self.assertEqual(cut_points['watches'].tolist(), [25.0, 50.0, 75.0])
+        np.testing.assert_allclose(cut_points['pushes'], [9, 99, 999])
+        self.assertEqual(ranks['watches'].tolist(), [4, 4, 3, 2, 1])
+        self.assertEqual(ranks['pushes'].tolist(), [4, 4, 3, 2, 1])
+
+    def test_custom_binning(self):
+        data = pd.DataFrame({'forks': [0, 10, 50, 100, 1000, np.nan]})
+        data_configuration = pd.DataFrame({'columnName': ['forks'], 'cutPoints': [[100, 10, 100]]})
+
+        cut_points, ranks = self.discretize(data, {'forks': 'cut'}, data_configuration)
+
+        self.assertEqual(cut_points['forks'].tolist(), [10.0, 100.0])
+        self.assertEqual(ranks['forks'].tolist(), [3, 3, 2, 2, 1, 3])
+
+    def test_custom_binning_without_cut_points(self):
+        for column_configuration in [{'columnName': 'forks'}, {'columnName': 'forks', 'cutPoints': []}]:
+            with self.subTest(column_configuration=column_configuration):
+                with self.assertRaisesRegex(ValueError, 'forks'):
+                    CustomBinning().get_cut_points(pd.Series([1, 2]), column_configuration)
+
+
+class EngineSelectionTests(SimpleTestCase):
+    def get_matrix(self, rows_count, items_count, dense_items_count, seed=0):
+        rng = np.random.default_rng(seed)
+        densities = np.where(np.arange(items_count) < dense_items_count, 0.9, 0.05)
+        return pd.DataFrame(rng.random((rows_count, items_count)) < densities,
+                            columns=[f'item {item}' for item in range(items_count)])
+
+    def get_eclat_memory(self, transactions_matrix):
+        # An item bitset and a search path bitset per item, of whole 64-bit words
+        return 2 * transactions_matrix.shape[1] * -(-len(transactions_matrix) // 64) * 8
+
+    def assert_engine(self, transactions_matrix, min_supp, memory_limit, expected_engine):
+        pattern_miner = PatternMiner(memory_limit=memory_limit)
+        self.assertEqual(pattern_miner.select_engine(transactions_matrix, min_supp), expected_engine)
+
+        itemsets = pattern_miner.find_frequent_itemsets(transactions_matrix, min_supp, 3)
+        self.assertEqual(pattern_miner.last_engine, expected_engine)
+        self.assertEqual(set(get_itemsets(itemsets)),
+                         set(get_itemsets(PatternMiner(engine=expected_engine)
+                                          .find_frequent_itemsets(transactions_matrix, min_supp, 3))))
+        self.assertEqual(set(get_itemsets(itemsets)),
+                         set(get_itemsets(PatternMiner(engine='apriori')
+                                          .find_frequent_itemsets(transactions_matrix, min_supp, 3))))
+
+    def test_small_matrix_boundaries(self):
+        # A single frequent item keeps apriori below the memory of the item bitsets
+        transactions_matrix = self.get_matrix(640, 10, 1)
+        eclat_memory = self.get_eclat_memory(transactions_matrix)
+        apriori_memory = PatternMiner(memory_limit=eclat_memory).estimate_apriori_memory(transactions_matrix, 0.5)
+        self.assertEqual(apriori_memory, 640)
+
+        self.assert_engine(transactions_matrix, 0.5, eclat_memory, 'eclat')
+        self.assert_engine(transactions_matrix, 0.5, eclat_memory - 1, 'apriori')
+        self.assert_engine(transactions_matrix, 0.5, apriori_memory, 'apriori')
+        self.assert_engine(transactions_matrix, 0.5, apriori_memory - 1, 'fpgrowth')
+
+    def test_large_matrix_boundaries(self):
+        transactions_matrix = self.get_matrix(20000, 30, 6)
+        eclat_memory = self.get_eclat_memory(transactions_matrix)
+
+        self.assert_engine(transactions_matrix, 0.02, PatternMiner.DEFAULT_MEMORY_LIMIT, 'eclat')
+        self.assert_engine(transactions_matrix, 0.02, eclat_memory, 'eclat')
+        # Every row of every frequent item is held by apriori, more than the bitsets
+        self.assert_engine(transactions_matrix, 0.02, eclat_memory - 1, 'fpgrowth')
+
+    def test_apriori_estimate_grows_as_support_falls(self):
+        transactions_matrix = self.get_matrix(2000, 12, 4)
+        pattern_miner = PatternMiner(memory_limit=PatternMiner.DEFAULT_MEMORY_LIMIT)
+        estimates = [pattern_miner.estimate_apriori_memory(transactions_matrix, min_supp)
+                     for min_supp in [0.8, 0.5, 0.1, 0.01]]
+        self.assertEqual(estimates, sorted(estimates))
+        self.assertGreater(estimates[-1], estimates[0])
+
+        # The levels are not walked further once the limit is passed
+        capped_miner = PatternMiner(memory_limit=estimates[0])
+        self.assertLessEqual(capped_miner.estimate_apriori_memory(transactions_matrix, 0.01), estimates[-1])
+        self.assertGreater(capped_miner.estimate_apriori_memory(transactions_matrix, 0.01), estimates[0])
+
+
+class BlockingServiceConnector():
+    def __init__(self):
+        self.started = threading.Event()
+        self.cancelled = threading.Event()
+
+    async def get_data_from_services(self, data_params):
+        self.started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+class JobManagerTests(SimpleTestCase):
+    def setUp(self):
+        self.job_manager = JobManager(max_workers=1, expected_errors=(InsufficientRowsError,))
+        self.addCleanup(self.job_manager.executor.shutdown, cancel_futures=True)
+
+    def wait(self, job):
+        job.future.result(timeout=10)
+        return job.to_dict()
+
+    def test_job_result_and_progress(self):
+        started, resume = threading.Event(), threading.Event()
+
+        def job_function(job, value):
+            job.phase = 'counting'
+            job.progress = {'rows_fetched': value}
+            started.set()
+            resume.wait(10)
+            return {'value': value}
+
+        job = self.job_manager.submit(job_function, 3)
+        started.wait(10)
+        self.assertEqual(job.to_dict(), {'id': job.id, 'status': 'running', 'phase': 'counting',
+                                         'progress': {'rows_fetched': 3}, 'result': None, 'error': None})
+        resume.set()
+        self.assertEqual(self.wait(job)['status'], 'done')
+        self.assertEqual(job.to_dict()['result'], {'value': 3})
+        self.assertIs(self.job_manager.get(job.id), job)
+
+    def test_progress_source_overrides_the_phase(self):
+        def job_function(job):
+            job.phase = 'saving'
+            job.progress_source = lambda: {'phase': 'github_api', 'api_calls': 7}
+
+        job = self.job_manager.submit(job_function)
+        state = self.wait(job)
+        self.assertEqual((state['phase'], state['progress']), ('github_api', {'api_calls': 7}))
+
+    def test_failed_jobs(self):
+        def raise_error(job, error):
+            raise error
+
+        expected_job = self.job_manager.submit(raise_error, InsufficientRowsError("Получено меньше 200 записей"))
+        with self.assertLogs('modules.job_manager', 'ERROR'):
+            unexpected_job = self.job_manager.submit(raise_error, KeyError('pushes'))
+            self.wait(unexpected_job)
+
+        self.assertEqual((self.wait(expected_job)['status'], expected_job.error),
+                         ('failed', "Получено меньше 200 записей"))
+        self.assertEqual((unexpected_job.status, unexpected_job.error), ('failed', 'Ошибка сервера'))
+
+    def test_queued_job_is_cancelled_at_once(self):
+        resume = threading.Event()
+        calls = []
+        running_job = self.job_manager.submit(lambda job: resume.wait(10))
+        queued_job = self.job_manager.submit(lambda job: calls.append(job))
+
+        self.assertEqual(self.job_manager.cancel(queued_job.id).status, 'cancelled')
+        resume.set()
+        self.assertEqual(self.wait(running_job)['status'], 'done')
+        self.assertEqual(calls, [])
+
+    def test_running_event_loop_is_cancelled_from_another_thread(self):
+        service_connector = BlockingServiceConnector()
+        job = self.job_manager.submit(
+            lambda job: asyncio.run(views.get_cancellable_data(job, service_connector, None)))
+        service_connector.started.wait(10)
+
+        self.job_manager.cancel(job.id)
+
+        self.wait(job)
+        self.assertTrue(service_connector.cancelled.is_set())
+        self.assertEqual((job.status, job.error), ('cancelled', None))
+
+    def test_job_stops_at_a_cancellation_check(self):
+        started = threading.Event()
+
+        def job_function(job):
+            started.set()
+            while True:
+                job.raise_if_cancelled()
+                time.sleep(0.01)
+
+        job = self.job_manager.submit(job_function)
+        started.wait(10)
+        self.job_manager.cancel(job.id)
+        self.assertEqual(self.wait(job)['status'], 'cancelled')
+
+    def test_cancel_handler_registered_after_the_request_is_called(self):
+        calls = []
+        job = self.job_manager.submit(lambda job: None)
+        self.wait(job)
+        job.cancel_requested.set()
+        job.set_cancel_handler(lambda: calls.append('cancel'))
+        self.assertEqual(calls, ['cancel'])
+
+    def test_finished_jobs_are_forgotten(self):
+        job = self.job_manager.submit(lambda job: None)
+        self.wait(job)
+        self.assertIsNone(self.job_manager.cancel('unknown'))
+
+        self.job_manager.JOB_TTL = -1
+        self.job_manager.submit(lambda job: None)
+        self.assertIsNone(self.job_manager.get(job.id))
+
+
+class LoadDataViewsTests(SimpleTestCase):
+    REQUEST_PARAMS = {
+        'items': {views.TRANSACTION_ITEMS_DECODE_NAMES[0]: 'qua'},
+        'startDate': '2024-01-01',
+        'endDate': '2024-02-01',
+        'numRepos': '500',
+        'minParticipants': '3',
+        'minStars': '10',
+        'isNewRepos': False,
+        'note': '',
+    }
+
+    def setUp(self):
+        self.service_connector = BlockingServiceConnector()
+
+        def load_data(job, request_params, data_params):
+            self.data_params = data_params
+            return asyncio.run(views.get_cancellable_data(job, self.service_connector, data_params))
+
+        patcher = mock.patch('github_patterns_app.views.load_data', load_data)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self):
+        response = self.client.post('/load-data-submit', json.dumps(self.REQUEST_PARAMS),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        return response.json()['job_id']
+
+    def test_status_and_cancel(self):
+        job_id = self.submit()
+        self.service_connector.started.wait(10)
+        self.assertEqual(self.data_params.transaction_composition, ['pushes'])
+        self.assertEqual(self.client.get(f'/load-data-status/{job_id}').json()['status'], 'running')
+
+        self.assertEqual(self.client.get(f'/load-data-cancel/{job_id}').status_code, 400)
+        response = self.client.post(f'/load-data-cancel/{job_id}')
+        self.assertEqual(response.status_code, 200)
+
+        job = views.DATA_LOAD_JOBS.get(job_id)
+        job.future.result(timeout=10)
+        self.assertTrue(self.service_connector.cancelled.is_set())
+        state = self.client.get(f'/load-data-status/{job_id}').json()
+        self.assertEqual((state['status'], state['error'], state['result']), ('cancelled', None, None))
+        # Cancelling a finished job keeps its status
+        self.assertEqual(self.client.post(f'/load-data-cancel/{job_id}').json()['status'], 'cancelled')
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get('/load-data-status/unknown').status_code, 404)
+        self.assertEqual(self.client.post('/load-data-cancel/unknown').status_code, 404)
+
+
+class RepositoryStorageTests(TestCase):
+    def get_github_data(self):
+        return pd.DataFrame({
+            'repo': ['owner/a', 'owner/b', 'owner/c'],
+            'pushes': [10, np.nan, 30],
+            'avg_push_size': [1.5, np.nan, None],
+            'pull_requests': pd.array([1, None, 3], dtype='Int64'),
+            'language': ['Python', None, np.nan],
+            'is_deleted_or_private': [True, False, None],
+            'forks': np.array([0, 1, 2], dtype=np.uint16),
+        })
+
+    def get_stored_rows(self, sample):
+        return list(RepositoryData.objects.filter(data_params_id=sample.id)
+                    .order_by('repo_name')
+                    .values_list('repo_name', 'pushes', 'avg_push_size', 'pull_requests',
+                                 'language', 'is_deleted_or_private', 'forks', 'watches'))
+
+    def test_bulk_create_round_trips_missing_values_and_booleans(self):
+        sample = create_sample(3)
+        save_repository_data(sample, self.get_github_data())
+
+        self.assertEqual(self.get_stored_rows(sample), [
+            ('owner/a', 10, 1.5, 1, 'Python', True, 0, None),
+            ('owner/b', None, None, None, None, False, 1, None),
+            ('owner/c', 30, None, 3, None, None, 2, None),
+        ])
+        stored_types = [type(value) for value in self.get_stored_rows(sample)[0][:-1]]
+        self.assertEqual(stored_types, [str, int, float, int, str, bool, int])
+
+    def test_boolean_column_without_missing_values(self):
+        sample = create_sample(2)
+        save_repository_data(sample, pd.DataFrame({'repo': ['owner/a', 'owner/b'],
+                                                   'is_deleted_or_private': [False, True]}))
+        self.assertEqual(list(RepositoryData.objects.filter(data_params_id=sample.id)
+                              .order_by('repo_name')
+                              .values_list('is_deleted_or_private', flat=True)), [False, True])
+
+    def test_empty_data_saves_nothing(self):
+        sample = create_sample(0)
+        save_repository_data(sample, self.get_github_data().iloc[:0])
+        self.assertFalse(RepositoryData.objects.filter(data_params_id=sample.id).exists())
+
+    def test_copy_requires_a_supported_driver(self):
+        sample = create_sample(3)
+        with self.assertRaises(ValueError):
+            save_repository_data(sample, self.get_github_data(), method='copy')
+        with self.assertRaises(ValueError):
+            save_repository_data(sample, self.get_github_data(), method='insert')
+        self.assertFalse(RepositoryData.objects.filter(data_params_id=sample.id).exists())
+
+    def test_copy_is_chosen_by_the_driver(self):
+        def get_connection(vendor, driver):
+            return types.SimpleNamespace(vendor=vendor, Database=types.SimpleNamespace(__name__=driver))
+
+        for vendor, driver, is_supported in [('postgresql', 'psycopg2', True),
+                                             ('postgresql', 'psycopg', True),
+                                             ('postgresql', 'pg8000.dbapi', False),
+                                             ('sqlite', 'sqlite3.dbapi2', False)]:
+            with mock.patch.object(repository_storage, 'connection', get_connection(vendor, driver)):
+                self.assertEqual(repository_storage.is_copy_supported(), is_supported, driver)
+
+    def save_samples(self, samples_data):
+        sample_ids = []
+        for github_data in samples_data:
+            sample = create_sample(len(github_data))
+            save_repository_data(sample, github_data)
+            sample_ids.append(sample.id)
+        return sample_ids
+
+    def get_expected_data(self, sample_ids):
+        return (load_repository_data_per_sample(sample_ids)
+                .drop(columns=['id', 'data_params_id_id'])
+                .drop_duplicates(subset='repo_name')
+                .reset_index(drop=True))
+
+    def test_loading_matches_the_per_sample_orm_path(self):
+        samples_data = []
+        for sample_index in range(3):
+            github_data = get_synthetic_data(40, sample_index)
+            # Every sample repeats half of the repositories of the previous one
+            github_data['repo'] = [f'owner/repo{sample_index * 20 + index}' for index in range(40)]
+            samples_data.append(github_data)
+        samples_data[1] = samples_data[1].astype({'pushes': object, 'is_deleted_or_private': object})
+        samples_data[1].loc[::3, ['pushes', 'avg_push_size', 'is_deleted_or_private']] = None
+        # Columns missing from every sample are stored as NULL
+        samples_data = [github_data.drop(columns='forks') for github_data in samples_data]
+        sample_ids = self.save_samples(samples_data)
+
+        data = load_repository_data(sample_ids)
+
+        pd.testing.assert_frame_equal(data, self.get_expected_data(sample_ids))
+        self.assertEqual(len(data), 80)
+        self.assertEqual(data['pushes'].dtype, np.float64)
+        self.assertEqual(data['pull_requests'].dtype, np.int64)
+        self.assertEqual(data['is_deleted_or_private'].dtype, object)
+        self.assertTrue(data['forks'].isna().all())
+        # Overlapping repositories are taken from the earliest saved sample
+        pd.testing.assert_frame_equal(load_repository_data(sample_ids[::-1]), data)
+        self.assertEqual(data.set_index('repo_name').loc['owner/repo20', 'pushes'],
+                         samples_data[0].set_index('repo').loc['owner/repo20', 'pushes'])
+
+    def test_loading_without_missing_values(self):
+        sample_ids = self.save_samples([get_synthetic_data(10, 0).assign(language='Go', license_name='MIT')])
+
+        data = load_repository_data(sample_ids)
+
+        pd.testing.assert_frame_equal(data, self.get_expected_data(sample_ids))
+        self.assertEqual(data['is_deleted_or_private'].dtype, bool)
+
+    def test_loading_unknown_samples(self):
+        data = load_repository_data([-1])
+        self.assertTrue(data.empty)
+        self.assertEqual(list(data.columns), list(self.get_expected_data(self.save_samples(
+            [get_synthetic_data(1, 0)])).columns))
@@ -8,8 +8,11 @@ urlpatterns = [
     path('', views.find_patterns, name='find_patterns'), 
     path('request-data', views.request_data, name='request_data'),
     path('load-data-submit', views.load_data_submit, name='load_data_submit'),  # Добавьте эту строку
+    path('load-data-status/<str:job_id>', views.load_data_status, name='load_data_status'),
+    path('load-data-cancel/<str:job_id>', views.load_data_cancel, name='load_data_cancel'),
     path('delete-sample/<int:id>', views.delete_sample, name='delete_sample'),
     path('find-patterns-submit', views.find_patterns_submit, name='find_patterns_submit'),
+    path('find-patterns-cache-stats', views.find_patterns_cache_stats, name='find_patterns_cache_stats'),
     
     # path('accounts/', include("django.contrib.auth.urls")),   # working for login.html
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
@@ -1,21 +1,40 @@
 from django.shortcuts import render
-from django.http import JsonResponse
-from django.db import transaction
+from django.http import JsonResponse, HttpResponse
+from django.db import transaction, connection
+from django.conf import settings
 from datetime import datetime
 import pandas as pd
 import json
+import time
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from django.views.decorators.csrf import csrf_exempt
-from github_patterns_app.models import SampleParams, RepositoryData
+from github_patterns_app.models import SampleParams
+from github_patterns_app.repository_storage import save_repository_data, load_repository_data
 from modules.service_connector import ServiceConnector, GithubDataParams
 from modules.github_data_converter import GithubDataConverter
 from modules.pattern_miner import PatternMiner
+from modules.job_manager import JobManager
+from modules.mining_result_cache import MiningResultCache
+from modules.transaction_matrix_cache import TransactionMatrixCache
+from modules.itemset_lattice import ItemsetLatticeCache
 from modules.exceptions import *
 
 
 TRANSACTION_ITEMS_NAMES = list(pd.read_json("dtype_conf.json")["columnName"])
 TRANSACTION_ITEMS_DECODE_NAMES = list(pd.read_json("dtype_conf.json")["decode"])
 TRANSACTION_ITEMS_DATA_TYPE = list(pd.read_json("dtype_conf.json")["dtype"])
+DATA_LOAD_JOBS = JobManager(max_workers=settings.DATA_LOAD_WORKERS, 
+                            expected_errors=(EmptyTableError, InsufficientRowsError))
+MINING_RESULT_CACHE = MiningResultCache(max_size=settings.MINING_RESULT_CACHE_MAX_SIZE)
+TRANSACTION_MATRIX_CACHE = TransactionMatrixCache(settings.TRANSACTION_CACHE_DIR, 
+                                                  max_size=settings.TRANSACTION_CACHE_MAX_SIZE)
+ITEMSET_LATTICE_CACHE = ItemsetLatticeCache(max_size=settings.ITEMSET_LATTICE_CACHE_MAX_SIZE)
+# Spawned workers do not inherit the locks of the server threads
+MINING_EXECUTOR = (ProcessPoolExecutor(max_workers=settings.PATTERN_MINING_WORKERS,
+                                       mp_context=multiprocessing.get_context('spawn'))
+                   if settings.PATTERN_MINING_WORKERS > 1 else None)
 
 
 def find_patterns(request):
@@ -41,90 +60,128 @@ def load_data_submit(request):
                 columnName = items_decode_name_name_dict[decode_name]
                 current_transaction_items_names.append(columnName)
                 
-        
-        service_connector = ServiceConnector()
-        try:
-            data_params = GithubDataParams(
-                transaction_composition=current_transaction_items_names,
-                start_date=request_params["startDate"],
-                end_date=request_params["endDate"],
-                limit=int(request_params["numRepos"]),
-                min_members_count=int(request_params["minParticipants"]),
-                min_watch_event_count=int(request_params["minStars"]),
-                is_new_repos=bool(request_params["isNewRepos"])
-            )
-            github_data = asyncio.run(service_connector.get_data_from_services(data_params))
-        except (EmptyTableError, InsufficientRowsError) as e:
-            return JsonResponse({'Error': str(e)}, status=400)
-        
-        attribute_info = {} 
-        for decode_name in TRANSACTION_ITEMS_DECODE_NAMES:
-            status_value = 'ON' if decode_name in request_params["items"] else 'OFF'
-            division_value = str(request_params["items"].get(decode_name, 'NONE')).upper()
-            
-            attribute_info[items_decode_name_name_dict[decode_name]] = {
-                'status': status_value,
-                'division': division_value
-            }
-        
-        sample_params = SampleParams(
-            save_time=datetime.now(),
+        data_params = GithubDataParams(
+            transaction_composition=current_transaction_items_names,
             start_date=request_params["startDate"],
             end_date=request_params["endDate"],
-            repos_count=len(github_data),
-            min_members_count=request_params["minParticipants"],
-            min_watch_count=request_params["minStars"],
-            is_new_repos=request_params["isNewRepos"],
-            note=request_params["note"],
-            pushes_duration_status=attribute_info.get('pushes', {}).get('status'),
-            pushes_duration_division=attribute_info.get('pushes', {}).get('division'),
-            avg_push_size_status=attribute_info.get('avg_push_size', {}).get('status'),
-            avg_push_size_division=attribute_info.get('avg_push_size', {}).get('division'),
-            pull_requests_status=attribute_info.get('pull_requests', {}).get('status'),
-            pull_requests_division=attribute_info.get('pull_requests', {}).get('division'),
-            merged_pull_requests_ratio_status=attribute_info.get('merged_pull_requests_ratio', {}).get('status'),
-            merged_pull_requests_ratio_division=attribute_info.get('merged_pull_requests_ratio', {}).get('division'),
-            issues_status=attribute_info.get('issues', {}).get('status'),
-            issues_division=attribute_info.get('issues', {}).get('division'),
-            closed_issues_ratio_status=attribute_info.get('closed_issues_ratio', {}).get('status'),
-            closed_issues_ratio_division=attribute_info.get('closed_issues_ratio', {}).get('division'),
-            watches_status=attribute_info.get('watches', {}).get('status'),
-            watches_division=attribute_info.get('watches', {}).get('division'),
-            forks_status=attribute_info.get('forks', {}).get('status'),
-            forks_division=attribute_info.get('forks', {}).get('division'),
-            new_members_status=attribute_info.get('new_members', {}).get('status'),
-            new_members_division=attribute_info.get('new_members', {}).get('division'),
-            language_status=attribute_info.get('language', {}).get('status'),
-            license_name_status=attribute_info.get('license_name', {}).get('status'),
-            is_deleted_or_private_status=attribute_info.get('is_deleted_or_private', {}).get('status'),
+            limit=int(request_params["numRepos"]),
+            min_members_count=int(request_params["minParticipants"]),
+            min_watch_event_count=int(request_params["minStars"]),
+            is_new_repos=bool(request_params["isNewRepos"])
         )
-        sample_params.save()
-        
-        with transaction.atomic():
-            for index, row in github_data.iterrows():
-                repo_data = RepositoryData(
-                    data_params_id=sample_params,
-                    repo_name=row.get('repo', None),
-                    pushes=row.get('pushes', None),
-                    avg_push_size=row.get('avg_push_size', None),
-                    pull_requests=row.get('pull_requests', None),
-                    merged_pull_requests_ratio=row.get('merged_pull_requests_ratio', None),
-                    issues=row.get('issues', None),
-                    closed_issues_ratio=row.get('closed_issues_ratio', None),
-                    watches=row.get('watches', None),
-                    forks=row.get('forks', None),
-                    new_members=row.get('new_members', None),
-                    language=row.get('language', None),
-                    license_name=row.get('license_name', None),
-                    is_deleted_or_private=row.get('is_deleted_or_private', None)
-                )
-                repo_data.save()
         
-        return JsonResponse({'status': 'ok'}) 
+        job = DATA_LOAD_JOBS.submit(load_data, request_params, data_params)
+        return JsonResponse({'job_id': job.id}, status=202)
+    else:
+        return JsonResponse({'error': 'Ошибка сервера'}, status=400)
+
+
+def load_data_status(request, job_id):
+    job = DATA_LOAD_JOBS.get(job_id)
+    if job is None:
+        return JsonResponse({'error': 'Задача не найдена'}, status=404)
+    return JsonResponse(job.to_dict())
+
+
+@csrf_exempt
+def load_data_cancel(request, job_id):
+    if request.method == 'POST':
+        job = DATA_LOAD_JOBS.cancel(job_id)
+        if job is None:
+            return JsonResponse({'error': 'Задача не найдена'}, status=404)
+        return JsonResponse(job.to_dict())
     else:
         return JsonResponse({'error': 'Ошибка сервера'}, status=400)
 
 
+def load_data(job, request_params, data_params):
+    service_connector = ServiceConnector()
+    job.progress_source = service_connector.get_progress
+    try:
+        github_data = asyncio.run(get_cancellable_data(job, service_connector, data_params))
+        
+        job.raise_if_cancelled()
+        job.progress_source = None
+        job.phase = 'saving'
+        job.progress = {'rows_fetched': len(github_data),
+                        'api_calls': service_connector.github_api_report.requests}
+        sample_params = save_sample(request_params, github_data)
+    finally:
+        # Worker threads outlive the job, so their connections are closed explicitly
+        connection.close()
+    
+    return {'sample_id': sample_params.id, 'repos_count': len(github_data)}
+
+
+async def get_cancellable_data(job, service_connector, data_params):
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    
+    def cancel():
+        try:
+            loop.call_soon_threadsafe(task.cancel)
+        except RuntimeError:
+            # The loop is already closed, the job stops before saving
+            pass
+    
+    job.set_cancel_handler(cancel)
+    try:
+        return await service_connector.get_data_from_services(data_params)
+    finally:
+        job.set_cancel_handler(None)
+
+
+def save_sample(request_params, github_data):
+    items_decode_name_name_dict = get_items_decode_name_name_dict()
+    
+    attribute_info = {} 
+    for decode_name in TRANSACTION_ITEMS_DECODE_NAMES:
+        status_value = 'ON' if decode_name in request_params["items"] else 'OFF'
+        division_value = str(request_params["items"].get(decode_name, 'NONE')).upper()
+        
+        attribute_info[items_decode_name_name_dict[decode_name]] = {
+            'status': status_value,
+            'division': division_value
+        }
+    
+    sample_params = SampleParams(
+        save_time=datetime.now(),
+        start_date=request_params["startDate"],
+        end_date=request_params["endDate"],
+        repos_count=len(github_data),
+        min_members_count=request_params["minParticipants"],
+        min_watch_count=request_params["minStars"],
+        is_new_repos=request_params["isNewRepos"],
+        note=request_params["note"],
+        pushes_duration_status=attribute_info.get('pushes', {}).get('status'),
+        pushes_duration_division=attribute_info.get('pushes', {}).get('division'),
+        avg_push_size_status=attribute_info.get('avg_push_size', {}).get('status'),
+        avg_push_size_division=attribute_info.get('avg_push_size', {}).get('division'),
+        pull_requests_status=attribute_info.get('pull_requests', {}).get('status'),
+        pull_requests_division=attribute_info.get('pull_requests', {}).get('division'),
+        merged_pull_requests_ratio_status=attribute_info.get('merged_pull_requests_ratio', {}).get('status'),
+        merged_pull_requests_ratio_division=attribute_info.get('merged_pull_requests_ratio', {}).get('division'),
+        issues_status=attribute_info.get('issues', {}).get('status'),
+        issues_division=attribute_info.get('issues', {}).get('division'),
+        closed_issues_ratio_status=attribute_info.get('closed_issues_ratio', {}).get('status'),
+        closed_issues_ratio_division=attribute_info.get('closed_issues_ratio', {}).get('division'),
+        watches_status=attribute_info.get('watches', {}).get('status'),
+        watches_division=attribute_info.get('watches', {}).get('division'),
+        forks_status=attribute_info.get('forks', {}).get('status'),
+        forks_division=attribute_info.get('forks', {}).get('division'),
+        new_members_status=attribute_info.get('new_members', {}).get('status'),
+        new_members_division=attribute_info.get('new_members', {}).get('division'),
+        language_status=attribute_info.get('language', {}).get('status'),
+        license_name_status=attribute_info.get('license_name', {}).get('status'),
+        is_deleted_or_private_status=attribute_info.get('is_deleted_or_private', {}).get('status'),
+    )
+    with transaction.atomic():
+        sample_params.save()
+        save_repository_data(sample_params, github_data)
+    
+    return sample_params
+
+
 @csrf_exempt
 def delete_sample(request, id):
     if request.method == 'DELETE':
@@ -132,6 +189,9 @@ def delete_sample(request, id):
            with transaction.atomic():
                 sample = SampleParams.objects.get(id=id)
                 sample.delete()
+                MINING_RESULT_CACHE.invalidate_sample(id)
+                TRANSACTION_MATRIX_CACHE.invalidate_sample(id)
+                ITEMSET_LATTICE_CACHE.invalidate_sample(id)
                 return JsonResponse({'success': True})
             
         except SampleParams.DoesNotExist:
@@ -142,31 +202,40 @@ def delete_sample(request, id):
 def find_patterns_submit(request):
     if request.method == 'POST':
         data = json.loads(request.body)
-        ids = data['ids']
+        started_at = time.perf_counter()
 
         try:
-            repository_data, quantile_config = get_github_repository_data(ids)
+            sample_ids, quantile_config = get_samples_quantile_config(data['ids'])
         except ValueError as e:
             return JsonResponse({'Error': str(e)}, status=400)
         except EmptyTableError as e:
             return JsonResponse({'Error': str(e)}, status=400)
         
-        github_data_converter = GithubDataConverter()
-        transactions = github_data_converter.convert_data_to_transactions(repository_data, 
-                                                                          quantile_config)
-        quartiles = github_data_converter.quartile_table
-        deciles = github_data_converter.decile_table
+        mining_params = get_mining_params(data)
+        if mining_params['itemsets_mode'] not in PatternMiner.ITEMSETS_MODES:
+            return JsonResponse({'Error': 'Неизвестный режим поиска наборов'}, status=400)
+        cache_key = MINING_RESULT_CACHE.get_key(sample_ids, quantile_config, mining_params)
+        cached_content = MINING_RESULT_CACHE.get(cache_key)
+        if cached_content is not None:
+            return HttpResponse(cached_content, content_type='application/json')
         
-        pattern_miner = PatternMiner()
+        try:
+            transactions_key, transactions, quartiles, deciles = get_transactions(sample_ids, 
+                                                                                  quantile_config)
+        except EmptyTableError as e:
+            return JsonResponse({'Error': str(e)}, status=400)
+        
+        pattern_miner = PatternMiner(engine=settings.PATTERN_MINING_ENGINE, 
+                                     memory_limit=settings.PATTERN_MINING_MEMORY_LIMIT,
+                                     executor=MINING_EXECUTOR,
+                                     partitions_count=settings.PATTERN_MINING_PARTITIONS,
+                                     lattice_cache=ITEMSET_LATTICE_CACHE,
+                                     lattice_floor=settings.ITEMSET_LATTICE_FLOOR)
+        lattice_key = ITEMSET_LATTICE_CACHE.get_key(sample_ids, transactions_key)
         try:
             github_patterns = pattern_miner.mine_patterns(transactions, 
-                                                        min_supp=float(data['minsup']),
-                                                        min_conf=float(data['minconf']),
-                                                        min_lift=float(data['lift']),
-                                                        min_left_elements=int(data['antecedent']),
-                                                        min_right_elements=int(data['consequent']), 
-                                                        max_left_elements=int(data['antecedent_max']),
-                                                        max_right_elements=int(data['consequent_max']))
+                                                          **mining_params, 
+                                                          lattice_key=lattice_key)
         except NoPatternsException as e:
             return JsonResponse({'Error': str(e)}, status=400)
         
@@ -175,36 +244,82 @@ def find_patterns_submit(request):
         else:
             response_data = {
                 'patterns': github_patterns.to_dict(orient='records'),
+                'counts': pattern_miner.last_counts,
                 'quartiles': quartiles.to_dict(orient='records') if quartiles is not None else [],
                 'deciles': deciles.to_dict(orient='records') if deciles is not None else []
             }
-            return JsonResponse(response_data, safe=False)
+            response = JsonResponse(response_data, safe=False)
+            MINING_RESULT_CACHE.put(cache_key, 
+                                    response.content, 
+                                    sample_ids, 
+                                    time.perf_counter() - started_at)
+            return response
+        
+
+def find_patterns_cache_stats(request):
+    return JsonResponse({'results': MINING_RESULT_CACHE.get_stats(),
+                         'transactions': TRANSACTION_MATRIX_CACHE.get_stats(),
+                         'lattices': ITEMSET_LATTICE_CACHE.get_stats()})
+
+
+def get_mining_params(data):
+    return {
+        'min_supp': float(data['minsup']),
+        'min_conf': float(data['minconf']),
+        'min_lift': float(data['lift']),
+        'min_left_elements': int(data['antecedent']),
+        'min_right_elements': int(data['consequent']),
+        'max_left_elements': int(data['antecedent_max']),
+        'max_right_elements': int(data['consequent_max']),
+        'itemsets_mode': data.get('itemsets_mode', 'all')
+    }
         
     
-def get_github_repository_data(sample_ids):
-    df = pd.DataFrame()
+def get_samples_quantile_config(sample_ids):
+    sample_ids = list(dict.fromkeys(int(sample_id) for sample_id in sample_ids if sample_id))
+    samples = SampleParams.objects.in_bulk(sample_ids)
     attribute_dict = {}
     
     for sample_id in sample_ids:
-        if not sample_id:
-            continue
-
-        sample = SampleParams.objects.get(id=int(sample_id))
-        repository_data = RepositoryData.objects.filter(data_params_id=sample.id)
-        df_sample = pd.DataFrame.from_records(repository_data.values())
-        df = pd.concat([df, df_sample], ignore_index=True)
+        if sample_id not in samples:
+            raise EmptyTableError("Данные не получены. Перезагрузите страницу, и выберите заново")
         
-        current_attributes = get_attributes_dict(sample)
+        current_attributes = get_attributes_dict(samples[sample_id])
         
         if not attribute_dict:
             attribute_dict = current_attributes
         elif attribute_dict != current_attributes:
             raise ValueError("Параметры атрибутов данных не совпадают")
     
+    return sample_ids, attribute_dict
+
+
+def get_transactions(sample_ids, quantile_config):
+    github_data_converter = GithubDataConverter()
+    cache_key = TRANSACTION_MATRIX_CACHE.get_key(sample_ids, 
+                                                 quantile_config, 
+                                                 github_data_converter.data_configuration.to_json())
+    cached_transactions = TRANSACTION_MATRIX_CACHE.get(cache_key)
+    if cached_transactions is not None:
+        return (cache_key, *cached_transactions)
+    
+    repository_data = get_github_repository_data(sample_ids)
+    transactions = github_data_converter.convert_data_to_transactions(repository_data, 
+                                                                      quantile_config)
+    quartiles = github_data_converter.quartile_table
+    deciles = github_data_converter.decile_table
+    
+    TRANSACTION_MATRIX_CACHE.put(cache_key, transactions, quartiles, deciles, sample_ids)
+    return cache_key, transactions, quartiles, deciles
+
+
+def get_github_repository_data(sample_ids):
+    df = load_repository_data(sample_ids)
+    
     if df.empty:
         raise EmptyTableError("Данные не получены. Перезагрузите страницу, и выберите заново")
     
-    return df, attribute_dict
+    return df
 
 
 def get_attributes_dict(sample):
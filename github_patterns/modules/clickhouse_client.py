@@ -0,0 +1,221 @@
+import csv
+import io
+import asyncio
+import aiohttp
+import pandas as pd
+from .exceptions import *
+
+
+class ClickHouseClient():
+    """
+    Executes queries through the ClickHouse HTTP interface.
+
+    The result is requested in the TSVWithNamesAndTypes format, so column
+    names and ClickHouse types arrive together with the data and are mapped
+    straight to pandas dtypes. Results can also be read as a stream of
+    DataFrame chunks while the server is still sending them, which bounds
+    the memory of parsing the body. A query with ORDER BY sends nothing
+    before its sort completes, so the time to the first row is unchanged.
+
+    Attributes:
+        DEFAULT_URL (str): ClickHouse playground HTTP endpoint.
+        DEFAULT_USER (str): ClickHouse playground user.
+        DEFAULT_TIMEOUT (int): Query timeout in seconds.
+        DEFAULT_CHUNK_ROWS (int): Default number of rows in a streamed chunk.
+        OUTPUT_FORMAT (str): Output format requested from the server.
+        NULL_VALUE (str): Null representation in the TSV formats.
+        NAN_VALUES (list): NaN representations of ClickHouse floats.
+        TIMEOUT_ERROR_CODES (list): ClickHouse error codes raised on query timeout.
+        STREAM_EXCEPTION_MARKER (bytes): Marker of an error written into a streamed body.
+    """
+    DEFAULT_URL = 'https://play.clickhouse.com/'
+    DEFAULT_USER = 'play'
+    DEFAULT_TIMEOUT = 100
+    DEFAULT_CHUNK_ROWS = 500
+    OUTPUT_FORMAT = 'TSVWithNamesAndTypes'
+    NULL_VALUE = '\\N'
+    NAN_VALUES = ['nan', '-nan']
+    TIMEOUT_ERROR_CODES = ['159', '160']
+    STREAM_EXCEPTION_MARKER = b'DB::Exception:'
+
+    def __init__(self,
+                 url: str = DEFAULT_URL,
+                 user: str = DEFAULT_USER,
+                 password: str = '',
+                 timeout: int = DEFAULT_TIMEOUT):
+        self.url = url
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+
+    async def query(self, query: str) -> pd.DataFrame:
+        """
+        Executes a query and returns its result as a typed DataFrame.
+
+        Args:
+            query (str): SQL query without a FORMAT clause.
+
+        Returns:
+            pd.DataFrame: Query result, empty if the query returned no rows.
+
+        Raises:
+            EmptyTableError: If the query timed out or ClickHouse returned an error.
+        """
+        async with aiohttp.ClientSession() as session:
+            try:
+                async with session.post(self.url,
+                                        params=self._get_query_settings(),
+                                        headers=self._get_auth_headers(),
+                                        data=self._prepare_query(query).encode(),
+                                        timeout=self._get_client_timeout()) as response:
+                    body = await response.read()
+                    exception_code = response.headers.get('X-ClickHouse-Exception-Code')
+                    if response.status != 200 or exception_code:
+                        self._raise_clickhouse_error(body.decode(errors='replace'),
+                                                     exception_code)
+            except asyncio.TimeoutError:
+                raise EmptyTableError("Слишком сложный запрос, данные не получены.\
+                    Попробуйте изменить параметры запроса")
+            except aiohttp.ClientError as e:
+                raise EmptyTableError(f"Ошибка сервиса ClickHouse: \"{e}\"\
+                    Попробуйте изменить параметры запроса")
+
+        return self._read_tsv_with_names_and_types(body)
+
+    async def query_stream(self, query: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        """
+        Executes a query and yields its result in typed DataFrame chunks as the rows arrive.
+
+        Args:
+            query (str): SQL query without a FORMAT clause.
+            chunk_rows (int, optional): Maximum number of rows in a chunk.
+
+        Yields:
+            pd.DataFrame: Consecutive chunks of the query result, nothing if it has no rows.
+
+        Raises:
+            EmptyTableError: If the query timed out or ClickHouse returned an error,
+                also when the error is reported in the middle of the stream.
+        """
+        async with aiohttp.ClientSession() as session:
+            try:
+                async with session.post(self.url,
+                                        params=self._get_query_settings(),
+                                        headers=self._get_auth_headers(),
+                                        data=self._prepare_query(query).encode(),
+                                        timeout=self._get_client_timeout()) as response:
+                    exception_code = response.headers.get('X-ClickHouse-Exception-Code')
+                    if response.status != 200 or exception_code:
+                        body = await response.read()
+                        self._raise_clickhouse_error(body.decode(errors='replace'),
+                                                     exception_code)
+
+                    names = self._split_header_line(await response.content.readline())
+                    clickhouse_types = self._split_header_line(await response.content.readline())
+                    if not clickhouse_types:
+                        return
+                    dtypes, na_values = self._get_column_types(names, clickhouse_types)
+
+                    lines = []
+                    async for line in response.content:
+                        # Errors after the headers were sent are written into the body
+                        if self.STREAM_EXCEPTION_MARKER in line:
+                            error_text = line + await response.content.read()
+                            self._raise_clickhouse_error(error_text.decode(errors='replace'),
+                                                         None)
+                        lines.append(line)
+                        if len(lines) >= chunk_rows:
+                            yield self._read_tsv_rows(b''.join(lines), names, dtypes, na_values)
+                            lines = []
+
+                    if lines:
+                        yield self._read_tsv_rows(b''.join(lines), names, dtypes, na_values)
+            except asyncio.TimeoutError:
+                raise EmptyTableError("Слишком сложный запрос, данные не получены.\
+                    Попробуйте изменить параметры запроса")
+            except aiohttp.ClientError as e:
+                raise EmptyTableError(f"Ошибка сервиса ClickHouse: \"{e}\"\
+                    Попробуйте изменить параметры запроса")
+
+    def _prepare_query(self, query: str) -> str:
+        return query.strip().rstrip(';')
+
+    def _get_query_settings(self) -> dict:
+        return {
+            'default_format': self.OUTPUT_FORMAT,
+            'max_execution_time': self.timeout,
+        }
+
+    def _get_auth_headers(self) -> dict:
+        return {
+            'X-ClickHouse-User': self.user,
+            'X-ClickHouse-Key': self.password,
+        }
+
+    def _get_client_timeout(self) -> aiohttp.ClientTimeout:
+        # Leave the server a chance to report its own timeout error first
+        return aiohttp.ClientTimeout(total=self.timeout + 10)
+
+    def _raise_clickhouse_error(self, error_text: str, exception_code: str | None):
+        if exception_code in self.TIMEOUT_ERROR_CODES:
+            raise EmptyTableError("Слишком сложный запрос, данные не получены.\
+                Попробуйте изменить параметры запроса")
+
+        raise EmptyTableError(f"Ошибка сервиса ClickHouse: \"{error_text.strip()}\"\
+            Попробуйте изменить параметры запроса")
+
+    def _read_tsv_with_names_and_types(self, body: bytes) -> pd.DataFrame:
+        if not body.strip():
+            return pd.DataFrame()
+
+        header_end = body.index(b'\n')
+        types_end = body.index(b'\n', header_end + 1)
+        names = self._split_header_line(body[:header_end])
+        clickhouse_types = self._split_header_line(body[header_end + 1:types_end])
+        dtypes, na_values = self._get_column_types(names, clickhouse_types)
+
+        rows = body[types_end + 1:]
+        if not rows.strip():
+            return pd.DataFrame(columns=names)
+
+        return self._read_tsv_rows(rows, names, dtypes, na_values)
+
+    def _split_header_line(self, line: bytes) -> list[str]:
+        line = line.decode().rstrip('\n')
+        return line.split('\t') if line else []
+
+    def _get_column_types(self, 
+                          names: list[str], 
+                          clickhouse_types: list[str]) -> tuple[dict, dict]:
+        dtypes = {name: self._to_pandas_dtype(clickhouse_type)
+                  for name, clickhouse_type in zip(names, clickhouse_types)}
+        na_values = {name: [self.NULL_VALUE] + (self.NAN_VALUES if dtype == 'float64' else [])
+                     for name, dtype in dtypes.items()}
+        return dtypes, na_values
+
+    def _read_tsv_rows(self, 
+                       rows: bytes, 
+                       names: list[str], 
+                       dtypes: dict, 
+                       na_values: dict) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(rows),
+                           sep='\t',
+                           names=names,
+                           dtype=dtypes,
+                           na_values=na_values,
+                           keep_default_na=False,
+                           quoting=csv.QUOTE_NONE)
+
+    def _to_pandas_dtype(self, clickhouse_type: str) -> str:
+        is_nullable = clickhouse_type.startswith('Nullable(')
+        for wrapper in ('Nullable(', 'LowCardinality('):
+            if clickhouse_type.startswith(wrapper):
+                clickhouse_type = clickhouse_type[len(wrapper):-1]
+
+        if clickhouse_type.startswith(('Int', 'UInt')):
+            return 'Int64' if is_nullable else 'int64'
+        if clickhouse_type.startswith(('Float', 'Decimal')):
+            return 'float64'
+        if clickhouse_type == 'Bool':
+            return 'boolean'
+        return 'object'
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+
+class Binning():
+    """
+    Base class of binning strategies.
+
+    A strategy returns the cut points of a column. Values above every cut
+    point get rank 1, values not above any of them get the last rank, so
+    rank 1 is always the highest bin.
+    """
+    def get_cut_points(self, values: pd.Series, column_configuration: dict) -> np.ndarray:
+        """
+        Returns the cut points of a column.
+
+        Args:
+            values (Series): Column values.
+            column_configuration (dict): Column entry of the data configuration.
+
+        Returns:
+            ndarray: Unique cut points in ascending order.
+        """
+        raise NotImplementedError
+
+
+class QuantileBinning(Binning):
+    """
+    Cuts a column at its quantiles.
+
+    Quantiles are computed with pandas linear interpolation. Repeated
+    quantile values are kept once, at the highest level, and the minimum
+    and maximum are not used as cut points.
+    """
+    def __init__(self, quantiles: list[float]):
+        self.quantiles = quantiles
+
+    def get_cut_points(self, values: pd.Series, column_configuration: dict) -> np.ndarray:
+        quantile_values = values.quantile(self.quantiles)
+        quantile_values = quantile_values.iloc[::-1].mask(quantile_values.iloc[::-1].duplicated())
+        cut_points = quantile_values.drop([0, 1]).dropna()
+        return np.sort(cut_points.to_numpy(dtype=np.float64))
+
+
+class EqualWidthBinning(Binning):
+    """
+    Cuts the range of a column into bins of equal width.
+    """
+    def __init__(self, bins_count: int):
+        self.bins_count = bins_count
+
+    def get_cut_points(self, values: pd.Series, column_configuration: dict) -> np.ndarray:
+        edges = np.linspace(values.min(), values.max(), self.bins_count + 1)
+        return np.unique(edges[1:-1])
+
+
+class LogBinning(Binning):
+    """
+    Cuts the range of a non-negative column into bins of equal width on the log(1 + x) scale.
+    """
+    def __init__(self, bins_count: int):
+        self.bins_count = bins_count
+
+    def get_cut_points(self, values: pd.Series, column_configuration: dict) -> np.ndarray:
+        edges = np.expm1(np.linspace(np.log1p(max(values.min(), 0)),
+                                     np.log1p(max(values.max(), 0)),
+                                     self.bins_count + 1))
+        return np.unique(edges[1:-1])
+
+
+class CustomBinning(Binning):
+    """
+    Cuts a column at the points listed in the "cutPoints" key of its configuration.
+    """
+    def get_cut_points(self, values: pd.Series, column_configuration: dict) -> np.ndarray:
+        cut_points = column_configuration.get('cutPoints')
+        if not isinstance(cut_points, list) or not cut_points:
+            raise ValueError(f"Cut points are not configured for {column_configuration.get('columnName')}")
+        return np.unique(np.asarray(cut_points, dtype=np.float64))
+
+
+class Discretizer():
+    """
+    Converts numeric columns to bin ranks with vectorized binary search.
+
+    The rank of a value is one plus the number of cut points not below it,
+    so rank 1 is the highest bin. Missing values get the last rank. Ranks
+    of a column are computed with a single np.searchsorted call over the
+    ascending cut points.
+
+    Binning strategies are registered by name, the name being the division
+    type of a column in the quantile configuration.
+
+    Attributes:
+        BINNINGS (dict): Default binning strategies by name.
+    """
+    BINNINGS = {
+        'qua': QuantileBinning([0, 0.25, 0.5, 0.75, 1]),
+        'dec': QuantileBinning([0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]),
+        'eqw': EqualWidthBinning(4),
+        'log': LogBinning(4),
+        'cut': CustomBinning(),
+    }
+
+    def __init__(self, binnings: dict[str, Binning] | None = None):
+        self.binnings = dict(self.BINNINGS if binnings is None else binnings)
+
+    def register(self, name: str, binning: Binning):
+        self.binnings[name] = binning
+
+    def get_cut_points(self,
+                       data: pd.DataFrame,
+                       binning_config: dict[str, str],
+                       data_configuration: pd.DataFrame) -> dict[str, np.ndarray]:
+        """
+        Returns the cut points of the numeric columns listed in the binning configuration.
+
+        Args:
+            data (DataFrame): Data to discretize.
+            binning_config (dict): Binning strategy name by column.
+            data_configuration (DataFrame): Data configuration with a "columnName" column.
+
+        Returns:
+            dict: Ascending cut points by column.
+        """
+        column_configurations = {configuration['columnName']: configuration
+                                 for configuration in data_configuration.to_dict(orient='records')}
+        cut_points = {}
+        for column in data.select_dtypes(include=[np.number]).columns:
+            if column not in binning_config:
+                continue
+            binning = self.binnings[binning_config[column]]
+            cut_points[column] = binning.get_cut_points(data[column],
+                                                        column_configurations.get(column, {}))
+        return cut_points
+
+    def discretize(self, data: pd.DataFrame, cut_points: dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Replaces the columns with cut points by their ranks, other columns are kept.
+        """
+        discretized_data = data.copy()
+        for column, column_cut_points in cut_points.items():
+            values = data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            discretized_data[column] = self.get_ranks(values, column_cut_points)
+        return discretized_data
+
+    def get_ranks(self, values: np.ndarray, cut_points: np.ndarray) -> np.ndarray:
+        ranks = len(cut_points) + 1 - np.searchsorted(cut_points, values, side='left')
+        ranks[np.isnan(values)] = len(cut_points) + 1
+        return ranks.astype(np.int64)
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import Executor
+from multiprocessing.shared_memory import SharedMemory
+
+
+class Eclat():
+    """
+    Depth-first frequent itemsets mining over packed transaction bitsets.
+
+    Every item is a bitset of the transactions containing it, packed with
+    np.packbits and viewed as 64-bit words. The support of an itemset is
+    the popcount of the AND of its bitsets. The search extends a prefix
+    with the items after its last one, all extensions of a prefix being
+    intersected and counted with one vectorized bitwise_and and
+    bitwise_count call, so no candidate tables are built and the memory
+    is bounded by the bitsets of the current search path.
+
+    Supports are computed and compared with the minimum support as in
+    mlxtend, so the itemsets and their order are the same as apriori's.
+
+    With a process pool executor the subtrees of the frequent items are
+    mined in parallel, one task per first item. The bitsets are placed in
+    shared memory once and attached by the workers instead of being
+    pickled with every task, and the partial results are sorted like the
+    serial ones, so the output does not depend on the number of workers.
+
+    Attributes:
+        max_len (int): Maximum itemset length, unlimited if None.
+        executor (Executor): Process pool mining the subtrees, serial mining if None.
+    """
+    WORD_BYTES = 8
+
+    def __init__(self, max_len: int | None = None, executor: Executor | None = None):
+        self.max_len = max_len
+        self.executor = executor
+
+    def find_frequent_itemsets(self,
+                               transactions_matrix: pd.DataFrame,
+                               min_supp: float) -> pd.DataFrame:
+        """
+        Finds the frequent itemsets of a binary transactions matrix.
+
+        Args:
+            transactions_matrix (DataFrame): Binary matrix of transactions.
+            min_supp (float): Minimum support threshold.
+
+        Returns:
+            DataFrame: "support" and "itemsets" columns like mlxtend apriori
+                with use_colnames, itemsets are frozensets of column names.
+        """
+        columns = list(transactions_matrix.columns)
+        rows_count = len(transactions_matrix)
+        if not rows_count or not columns:
+            return pd.DataFrame({'support': pd.Series(dtype=np.float64), 'itemsets': []})
+
+        bitsets = self.get_bitsets(transactions_matrix.to_numpy(dtype=bool))
+        supports = self.get_supports(bitsets, rows_count)
+        frequent_items = np.flatnonzero(supports >= min_supp)
+
+        itemsets = [((item,), supports[item]) for item in frequent_items]
+        if self.max_len is None or self.max_len > 1:
+            positions = range(len(frequent_items))
+            if self.executor is None:
+                itemsets += self.find_extensions(bitsets, frequent_items, positions,
+                                                 rows_count, min_supp)
+            else:
+                itemsets += self.__find_extensions_in_parallel(bitsets, frequent_items, positions,
+                                                               rows_count, min_supp)
+
+        itemsets.sort(key=lambda itemset: (len(itemset[0]), itemset[0]))
+        return pd.DataFrame({
+            'support': np.array([support for _, support in itemsets], dtype=np.float64),
+            'itemsets': [frozenset(columns[item] for item in items) for items, _ in itemsets],
+        })
+
+    def get_bitsets(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Packs the columns of a boolean matrix into rows of 64-bit words.
+        """
+        packed_columns = np.packbits(matrix.T, axis=1)
+        padding = -packed_columns.shape[1] % self.WORD_BYTES
+        packed_columns = np.pad(packed_columns, ((0, 0), (0, padding)))
+        return np.ascontiguousarray(packed_columns).view(np.uint64)
+
+    def get_supports(self, bitsets: np.ndarray, rows_count: int) -> np.ndarray:
+        return np.bitwise_count(bitsets).sum(axis=1, dtype=np.int64) / rows_count
+
+    def find_extensions(self,
+                        bitsets: np.ndarray,
+                        frequent_items: np.ndarray,
+                        positions,
+                        rows_count: int,
+                        min_supp: float) -> list[tuple[tuple, float]]:
+        """
+        Finds the frequent itemsets of two or more items starting with the given frequent items.
+
+        Args:
+            bitsets (ndarray): Packed bitsets of all items.
+            frequent_items (ndarray): Frequent items in ascending order.
+            positions (iterable): Positions in frequent_items of the first items.
+            rows_count (int): Number of transactions.
+            min_supp (float): Minimum support threshold.
+
+        Returns:
+            list: Item tuples with their supports.
+        """
+        itemsets = []
+        for position in positions:
+            item = frequent_items[position]
+            self.__extend((item,), bitsets[item], frequent_items[position + 1:],
+                          bitsets, rows_count, min_supp, itemsets)
+        return itemsets
+
+    def __find_extensions_in_parallel(self, bitsets, frequent_items, positions, rows_count, min_supp):
+        shared_memory = SharedMemory(create=True, size=max(bitsets.nbytes, 1))
+        futures = []
+        try:
+            shared_bitsets = np.ndarray(bitsets.shape, dtype=bitsets.dtype, buffer=shared_memory.buf)
+            shared_bitsets[:] = bitsets
+            del shared_bitsets
+
+            for position in positions:
+                futures.append(self.executor.submit(find_shared_extensions, 
+                                                    shared_memory.name, bitsets.shape, self.max_len, 
+                                                    frequent_items, [position], rows_count, min_supp))
+            itemsets = []
+            for future in futures:
+                itemsets += future.result()
+            return itemsets
+        finally:
+            # Running tasks keep their own mapping, the segment is freed when they close it
+            for future in futures:
+                future.cancel()
+            shared_memory.close()
+            shared_memory.unlink()
+
+    def __extend(self, prefix, prefix_bitset, candidates, bitsets, rows_count, min_supp, itemsets):
+        if not len(candidates):
+            return
+
+        candidate_bitsets = np.bitwise_and(bitsets[candidates], prefix_bitset)
+        supports = self.get_supports(candidate_bitsets, rows_count)
+        frequent = np.flatnonzero(supports >= min_supp)
+        frequent_candidates = candidates[frequent]
+
+        for position, candidate_position in enumerate(frequent):
+            itemset = prefix + (candidates[candidate_position],)
+            itemsets.append((itemset, supports[candidate_position]))
+            if self.max_len is None or len(itemset) < self.max_len:
+                self.__extend(itemset, candidate_bitsets[candidate_position],
+                              frequent_candidates[position + 1:],
+                              bitsets, rows_count, min_supp, itemsets)
+
+
+def find_shared_extensions(shared_memory_name, shape, max_len, frequent_items, positions, rows_count, min_supp):
+    """
+    Worker task of the parallel Eclat: mines the subtrees of the given
+    first items over bitsets attached from shared memory.
+    """
+    shared_memory = SharedMemory(name=shared_memory_name)
+    try:
+        bitsets = np.ndarray(shape, dtype=np.uint64, buffer=shared_memory.buf)
+        itemsets = Eclat(max_len).find_extensions(bitsets, frequent_items, positions,
+                                                  rows_count, min_supp)
+        del bitsets
+        return itemsets
+    finally:
+        shared_memory.close()
@@ -0,0 +1,203 @@
+import json
+import time
+import random
+import asyncio
+import aiohttp
+
+
+class GithubApiFetchReport():
+    """
+    Counters of a GitHub API fetch.
+
+    Attributes:
+        succeeded (int): Repositories with a definitive response, "not found" included.
+        throttled (int): Repositories whose requests hit a rate limit at least once.
+        failed (int): Repositories left without a definitive response after all retries.
+        requests (int): HTTP requests sent, retries included.
+        cached (int): Repositories answered from a cache without requests.
+    """
+    def __init__(self):
+        self.succeeded = 0
+        self.throttled = 0
+        self.failed = 0
+        self.requests = 0
+        self.cached = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'succeeded': self.succeeded,
+            'throttled': self.throttled,
+            'failed': self.failed,
+            'requests': self.requests,
+            'cached': self.cached,
+        }
+
+
+class GithubApiFetcher():
+    """
+    Fetches GitHub repositories through the REST API with bounded concurrency.
+
+    The number of requests in flight is capped by a semaphore and all of them
+    share one connection pool. The X-RateLimit-Remaining, X-RateLimit-Reset
+    and Retry-After headers are tracked, and when a limit is reached every
+    request waits until it is lifted. Rate limited requests, server errors
+    and connection errors are retried with jittered exponential backoff.
+    Other statuses than DEFINITIVE_STATUSES, e.g. 401 of an invalid token,
+    fail the repository without retries, so they are never cached as an
+    answer about the repository.
+
+    The fetcher is an async context manager that owns the HTTP session:
+
+        async with GithubApiFetcher(headers) as fetcher:
+            responses = await fetcher.fetch_repositories(repo_names)
+
+    Attributes:
+        DEFAULT_API_URL (str): GitHub API base URL.
+        REPOSITORY_PATH (str): Repository endpoint path.
+        DEFAULT_MAX_CONCURRENCY (int): Default number of requests in flight.
+        DEFAULT_MAX_RETRIES (int): Default number of retries of a request.
+        DEFAULT_BACKOFF_BASE (float): Default first retry delay in seconds.
+        DEFAULT_BACKOFF_MAX (float): Default maximum retry delay in seconds.
+        RETRY_STATUSES (list): Statuses of transient server errors.
+        DEFINITIVE_STATUSES (list): Statuses answering about the repository itself.
+        report (GithubApiFetchReport): Counters of the fetches made by the fetcher.
+    """
+    DEFAULT_API_URL = 'https://api.github.com'
+    REPOSITORY_PATH = '/repos/{repo_name}'
+    DEFAULT_MAX_CONCURRENCY = 20
+    DEFAULT_MAX_RETRIES = 3
+    DEFAULT_BACKOFF_BASE = 1.0
+    DEFAULT_BACKOFF_MAX = 60.0
+    RETRY_STATUSES = [500, 502, 503, 504]
+    DEFINITIVE_STATUSES = [200, 304, 404]
+
+    def __init__(self,
+                 headers: dict,
+                 api_url: str = DEFAULT_API_URL,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX):
+        self.headers = headers
+        self.api_url = api_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.report = GithubApiFetchReport()
+        self.session = None
+        self.semaphore = None
+        self.blocked_until = 0.0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                                         limit_per_host=self.max_concurrency,
+                                         ttl_dns_cache=300,
+                                         keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector,
+                                             headers=self.headers,
+                                             timeout=aiohttp.ClientTimeout(total=30))
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.session.close()
+        self.session = None
+
+    async def fetch_repositories(self, repo_names) -> list[tuple[str, dict | None, int | None, str | None]]:
+        """
+        Fetches repositories, keeping the order of the names.
+
+        Args:
+            repo_names (Iterable[str]): Repository names in the "owner/name" form.
+
+        Returns:
+            list[tuple]: (repo name, response JSON, status, ETag) for every repository.
+                The JSON and the status are None if no definitive response was received.
+                A "not modified" response to a conditional request has an empty JSON.
+        """
+        return await asyncio.gather(*[self.fetch_repository(repo_name)
+                                      for repo_name in repo_names])
+
+    async def fetch_repository(self,
+                               repo_name: str,
+                               headers: dict | None = None) -> tuple[str, dict | None, int | None, str | None]:
+        """
+        Fetches one repository, see fetch_repositories.
+
+        Args:
+            repo_name (str): Repository name in the "owner/name" form.
+            headers (dict, optional): Additional request headers, e.g. If-None-Match.
+        """
+        url = self.api_url + self.REPOSITORY_PATH.format(repo_name=repo_name)
+        is_throttled = False
+
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._wait_for_rate_limit()
+                self.report.requests += 1
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        response_text = await response.text()
+                        retry_delay = self._update_rate_limit(response, response_text)
+                        if retry_delay is not None:
+                            is_throttled = True
+                            await asyncio.sleep(retry_delay)
+                            continue
+
+                        if response.status in self.RETRY_STATUSES:
+                            await asyncio.sleep(self._get_backoff_delay(attempt))
+                            continue
+
+                        if response.status not in self.DEFINITIVE_STATUSES:
+                            break
+
+                        response_json = json.loads(response_text) if response_text else {}
+                        self.report.succeeded += 1
+                        self.report.throttled += is_throttled
+                        return repo_name, response_json, response.status, response.headers.get('ETag')
+
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    await asyncio.sleep(self._get_backoff_delay(attempt))
+
+        self.report.failed += 1
+        self.report.throttled += is_throttled
+        return repo_name, None, None, None
+
+    async def _wait_for_rate_limit(self):
+        delay = self.blocked_until - time.time()
+        if delay > 0:
+            await asyncio.sleep(min(delay, self.backoff_max))
+
+    def _update_rate_limit(self, 
+                           response: aiohttp.ClientResponse, 
+                           response_text: str) -> float | None:
+        """
+        Tracks the rate limit headers and returns a retry delay if the request was limited.
+        """
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        retry_after = response.headers.get('Retry-After')
+
+        if remaining == '0' and reset is not None:
+            self.blocked_until = max(self.blocked_until, float(reset))
+
+        if response.status not in (403, 429):
+            return None
+
+        if retry_after is not None:
+            delay = float(retry_after)
+        elif remaining == '0' and reset is not None:
+            delay = float(reset) - time.time()
+        elif response.status == 429 or 'rate limit' in response_text.lower():
+            delay = self.backoff_base
+        else:
+            # Forbidden without a rate limit is not retried
+            return None
+
+        delay = min(max(delay, 0), self.backoff_max) + random.uniform(0, self.backoff_base)
+        self.blocked_until = max(self.blocked_until, time.time() + delay)
+        return delay
+
+    def _get_backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from .discretizer import Discretizer
 
 
 class GithubDataConverter():
@@ -8,13 +9,17 @@ class GithubDataConverter():
 
     Attributes:
         SEPARATION_TYPES (dict): A dictionary with types of data separation.
+        DROPPED_ITEMS (list): Item names left out of the transactions.
         data_configuration (DataFrame): Data configuration read from a JSON file.
+        discretizer (Discretizer): Converts numeric attributes to bin ranks.
     """
     SEPARATION_TYPES = {'qua': [0, 0.25, 0.5, 0.75, 1],
             'dec': [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]}
+    DROPPED_ITEMS = ['None', 'Other']
     
     def __init__(self):
         self.data_configuration = pd.read_json(r"dtype_conf.json")
+        self.discretizer = Discretizer()
         self.quartile_table = None
         self.decile_table = None
 
@@ -39,13 +44,12 @@ class GithubDataConverter():
                                                 quantile_config)
 
         quantile_data = self.__convert_data_to_quantile_numbers(cleaned_data,
-                                                        quantile_column_values)
+                                                                quantile_config)
         
-        quantile_data = self.__add_column_name_in_items(quantile_data)
-
-        transactions = pd.get_dummies(quantile_data, prefix='')
+        matrix, vocabulary = self.__encode_items(quantile_data)
         
-        transactions = self.__format_column_names(transactions)
+        # Item names are only the column labels, cells stay boolean
+        transactions = pd.DataFrame(matrix, index=quantile_data.index, columns=vocabulary)
         
         qurtile_table, decile_table = self.__split_to_quartiles_and_deciles(quantile_column_values, quantile_config)
         
@@ -117,48 +121,74 @@ class GithubDataConverter():
         
         return quartiles, deciles
     
-    def __add_column_name_in_items(self, data):
-        edited_column_names = data.copy()
-        
-        for column in edited_column_names.columns:
-            if np.issubdtype(edited_column_names[column].dtype, np.number):
-                edited_column_names[column] = edited_column_names[column].apply(
-                    lambda x: f'{column} {x}')
-                
-        if 'language' in edited_column_names.columns:
-            edited_column_names['language'] = edited_column_names['language'].apply(
-                lambda x: 'language_' + x if x != 'None' and x != None else x)
-                
-        if 'license_name' in edited_column_names.columns:
-            edited_column_names['license_name'] = edited_column_names['license_name'].apply(
-                lambda x: 'license_' + x.replace('License', '') if x != 'None' and x is not None else x)
-            
-        return edited_column_names
+    def __encode_items(self, data: pd.DataFrame) -> tuple[np.ndarray, list[str]]:
+        """
+        Encodes attribute values as items of a boolean transaction matrix.
+
+        Every column is factorized to integer codes and each (column, value)
+        pair gets a position in the item vocabulary, so an item name is
+        formatted once per distinct value instead of once per cell. Dropped
+        items get no position, so the matrix is allocated once with its final
+        width. Items and their order are the same as the dummy columns of the
+        formatted attribute values: boolean columns first, then the values of
+        every other column sorted by item name.
+
+        Args:
+            data (DataFrame): Discretized repository data.
+
+        Returns:
+            tuple: Boolean matrix of rows by items and the item names.
+        """
+        bool_columns = [column for column in data.columns if data[column].dtype == bool
+                        and self.__format_item_name(column) not in self.DROPPED_ITEMS]
+        vocabulary = [self.__format_item_name(column) for column in bool_columns]
+        row_indices = []
+        item_indices = []
+        for column in data.columns:
+            if data[column].dtype == bool:
+                continue
+            codes, values = pd.factorize(data[column], use_na_sentinel=True)
+            items = [self.__get_item_name(column, value, data[column].dtype) for value in values]
+            item_positions = {}
+            for item in sorted(set(items)):
+                item_name = self.__format_item_name(f'_{item}')
+                if item_name in self.DROPPED_ITEMS:
+                    item_positions[item] = -1
+                else:
+                    item_positions[item] = len(vocabulary)
+                    vocabulary.append(item_name)
+            value_positions = np.array([item_positions[item] for item in items], dtype=np.int64)
+
+            rows = np.flatnonzero(codes >= 0)
+            positions = value_positions[codes[rows]]
+            row_indices.append(rows[positions >= 0])
+            item_indices.append(positions[positions >= 0])
+
+        matrix = np.zeros((len(data), len(vocabulary)), dtype=bool)
+        matrix[:, :len(bool_columns)] = data[bool_columns].to_numpy(dtype=bool)
+        if row_indices:
+            matrix[np.concatenate(row_indices), np.concatenate(item_indices)] = True
+        return matrix, vocabulary
+    
+    def __get_item_name(self, column, value, dtype):
+        if np.issubdtype(dtype, np.number):
+            return f'{column} {value}'
+        if column == 'language' and value != 'None':
+            return 'language_' + value
+        if column == 'license_name' and value != 'None':
+            return 'license_' + value.replace('License', '')
+        return value
+    
+    def __format_item_name(self, name: str) -> str:
+        return name.replace('_', '', 1).replace('_', ' ')
     
     def __convert_data_to_quantile_numbers(self, 
                                            repo_data: pd.DataFrame,
-                                           quantile_values: pd.DataFrame):
-        
-        def find_quantile_rank(value, quantiles):
-            quantiles = sorted(quantiles, reverse=True)
-            for i, q in enumerate(quantiles, 1):
-                if value > q:
-                    return i
-            return len(quantiles) + 1
-        
-        quantile_numbers_data = repo_data.copy()
-        
-        quantile_values_without_bounds = quantile_values.drop([0, 1])
-
-        number_columns = quantile_numbers_data.select_dtypes(include=[np.number])
-        
-        for column in number_columns.columns:
-            if column in quantile_values_without_bounds.columns:
-                column_quantiles_values = quantile_values_without_bounds[column].dropna()
-                quantile_numbers_data[column] = quantile_numbers_data[column].apply(
-                    find_quantile_rank,
-                    quantiles=column_quantiles_values)
-        return quantile_numbers_data
+                                           quantile_config: dict[str, str]):
+        cut_points = self.discretizer.get_cut_points(repo_data, 
+                                                     quantile_config, 
+                                                     self.data_configuration)
+        return self.discretizer.discretize(repo_data, cut_points)
     
     def __find_quantiles(self, 
                          data: pd.DataFrame, 
@@ -167,7 +197,8 @@ class GithubDataConverter():
         quantiles_by_column = {}
         numeric_columns = data.select_dtypes(include=['number'])
         for column in numeric_columns:
-            if column in quantile_conf.keys():
+            # Other binning strategies have no quantile tables
+            if quantile_conf.get(column) in self.SEPARATION_TYPES:
                 quantile_type = quantile_conf[column]
                 quantiles = self.SEPARATION_TYPES[quantile_type]
                 quantiles_by_column[column] = numeric_columns[column].quantile(quantiles)
@@ -189,24 +220,3 @@ class GithubDataConverter():
                 clean_data.drop(column, axis=1, inplace=True)
             
         return clean_data
-    
-    def __format_column_names(self, transaction_data):
-        def edit_column_names(string):
-            string = string.replace('_', '', 1)
-            string = string.replace('_', ' ')
-            return string
-        
-        rename_columns_data = transaction_data.copy()
-        
-        for column in rename_columns_data.columns:
-            rename_columns_data.rename(
-                columns={column: edit_column_names(column)},
-                inplace=True)
-        
-        while 'None' in rename_columns_data.columns:
-            rename_columns_data.drop(columns='None', inplace=True)
-            
-        if 'Other' in rename_columns_data.columns:
-            rename_columns_data.drop(columns='Other', inplace=True)
-            
-        return rename_columns_data
\ No newline at end of file
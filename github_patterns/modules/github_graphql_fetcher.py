@@ -0,0 +1,105 @@
+import json
+import asyncio
+import aiohttp
+from .github_api_fetcher import GithubApiFetcher
+
+
+class GithubGraphqlFetcher(GithubApiFetcher):
+    """
+    Fetches GitHub repository metadata through the GraphQL API in batches.
+
+    Up to BATCH_SIZE repositories are requested in one query, every one as
+    an aliased repository(owner:, name:) field. A null repository means the
+    repository was deleted or made private. Concurrency, rate limits and
+    retries are handled as in GithubApiFetcher.
+
+    Attributes:
+        GRAPHQL_PATH (str): GraphQL endpoint path.
+        BATCH_SIZE (int): Maximum number of repositories in one query.
+        REPOSITORY_FIELDS (str): Requested repository fields.
+    """
+    GRAPHQL_PATH = '/graphql'
+    BATCH_SIZE = 100
+    REPOSITORY_FIELDS = 'primaryLanguage { name } licenseInfo { name }'
+
+    async def fetch_repositories_metadata(self, repo_names: list[str]) -> dict[str, dict]:
+        """
+        Fetches metadata of the repositories.
+
+        Args:
+            repo_names (list[str]): Repository names in the "owner/name" form.
+
+        Returns:
+            dict: Metadata dictionaries with the status, language, license_name
+                and etag keys by repository name. Repositories of failed batches
+                are omitted. Missing repositories have the 404 status.
+        """
+        batches = [repo_names[start:start + self.BATCH_SIZE]
+                   for start in range(0, len(repo_names), self.BATCH_SIZE)]
+        batch_results = await asyncio.gather(*[self._fetch_batch(batch) for batch in batches])
+
+        repositories_metadata = {}
+        for batch_result in batch_results:
+            repositories_metadata.update(batch_result)
+        return repositories_metadata
+
+    async def _fetch_batch(self, repo_names: list[str]) -> dict[str, dict]:
+        url = self.api_url + self.GRAPHQL_PATH
+        query = self._build_query(repo_names)
+        is_throttled = False
+
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._wait_for_rate_limit()
+                self.report.requests += 1
+                try:
+                    async with self.session.post(url, json={'query': query}) as response:
+                        response_text = await response.text()
+                        retry_delay = self._update_rate_limit(response, response_text)
+                        if retry_delay is not None:
+                            is_throttled = True
+                            await asyncio.sleep(retry_delay)
+                            continue
+
+                        response_json = json.loads(response_text) if response_text else {}
+                        if response.status != 200 or response_json.get('data') is None:
+                            await asyncio.sleep(self._get_backoff_delay(attempt))
+                            continue
+
+                        self.report.succeeded += len(repo_names)
+                        self.report.throttled += len(repo_names) * is_throttled
+                        return self._parse_batch(repo_names, response_json['data'])
+
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    await asyncio.sleep(self._get_backoff_delay(attempt))
+
+        self.report.failed += len(repo_names)
+        self.report.throttled += len(repo_names) * is_throttled
+        return {}
+
+    def _build_query(self, repo_names: list[str]) -> str:
+        fields = []
+        for index, repo_name in enumerate(repo_names):
+            owner, _, name = repo_name.partition('/')
+            fields.append(f'r{index}: repository(owner: {json.dumps(owner)}, '
+                          f'name: {json.dumps(name)}) {{ {self.REPOSITORY_FIELDS} }}')
+        return 'query { ' + ' '.join(fields) + ' }'
+
+    def _parse_batch(self, repo_names: list[str], data: dict) -> dict[str, dict]:
+        repositories_metadata = {}
+        for index, repo_name in enumerate(repo_names):
+            repository = data.get(f'r{index}')
+            if repository is None:
+                repositories_metadata[repo_name] = {'status': 404,
+                                                    'language': None,
+                                                    'license_name': None,
+                                                    'etag': None}
+                continue
+
+            language = repository.get('primaryLanguage') or {}
+            license_info = repository.get('licenseInfo') or {}
+            repositories_metadata[repo_name] = {'status': 200,
+                                                'language': language.get('name'),
+                                                'license_name': license_info.get('name'),
+                                                'etag': None}
+        return repositories_metadata
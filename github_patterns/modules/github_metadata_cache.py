@@ -0,0 +1,109 @@
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+
+
+class GithubMetadataCache():
+    """
+    Persistent cache of GitHub repository metadata in a local SQLite file.
+
+    For every repository the response status, language, license name and
+    ETag are kept together with the time they were last confirmed. Fresh
+    entries are used without requests, stale entries with an ETag are
+    revalidated with conditional requests, and "not found" answers are
+    cached with their own, usually shorter, time to live.
+
+    Attributes:
+        DEFAULT_TTL (int): Default time to live of an entry in seconds.
+        DEFAULT_NOT_FOUND_TTL (int): Default time to live of a "not found" entry in seconds.
+        FIELDS (list): Cached metadata fields.
+    """
+    DEFAULT_TTL = 7 * 24 * 60 * 60
+    DEFAULT_NOT_FOUND_TTL = 24 * 60 * 60
+    FIELDS = ['status', 'language', 'license_name', 'etag', 'checked_at']
+
+    def __init__(self,
+                 cache_path: str,
+                 ttl: int = DEFAULT_TTL,
+                 not_found_ttl: int = DEFAULT_NOT_FOUND_TTL):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS repository_metadata (
+                    repo_name TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    language TEXT,
+                    license_name TEXT,
+                    etag TEXT,
+                    checked_at REAL NOT NULL
+                )
+            """)
+
+    def get_many(self, repo_names: list[str]) -> dict[str, dict]:
+        """
+        Returns cached metadata of the repositories, fresh or not.
+
+        Args:
+            repo_names (list[str]): Repository names.
+
+        Returns:
+            dict: Metadata dictionaries by repository name, missing repositories are omitted.
+        """
+        metadata = {}
+        with self._connect() as connection:
+            # Stay below the SQLite limit of query parameters
+            for start in range(0, len(repo_names), 500):
+                names = repo_names[start:start + 500]
+                rows = connection.execute(
+                    f"""SELECT repo_name, {', '.join(self.FIELDS)}
+                        FROM repository_metadata
+                        WHERE repo_name IN ({', '.join('?' * len(names))})""",
+                    names)
+                for repo_name, *values in rows:
+                    metadata[repo_name] = dict(zip(self.FIELDS, values))
+        return metadata
+
+    def is_fresh(self, metadata: dict) -> bool:
+        ttl = self.not_found_ttl if metadata['status'] == 404 else self.ttl
+        return time.time() - metadata['checked_at'] <= ttl
+
+    def put_many(self, metadata: dict[str, dict]):
+        """
+        Saves metadata of the repositories as confirmed now.
+        """
+        checked_at = time.time()
+        with self._connect() as connection:
+            connection.executemany(
+                """INSERT OR REPLACE INTO repository_metadata
+                   (repo_name, status, language, license_name, etag, checked_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [(repo_name, values['status'], values['language'],
+                  values['license_name'], values['etag'], checked_at)
+                 for repo_name, values in metadata.items()])
+
+    def touch_many(self, repo_names: list[str]):
+        """
+        Marks cached metadata of the repositories as confirmed now.
+        """
+        checked_at = time.time()
+        with self._connect() as connection:
+            connection.executemany(
+                "UPDATE repository_metadata SET checked_at = ? WHERE repo_name = ?",
+                [(checked_at, repo_name) for repo_name in repo_names])
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
@@ -0,0 +1,172 @@
+import sys
+import json
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+
+class ItemsetLattice():
+    """
+    Frequent itemsets of a transactions matrix mined once at a floor support.
+
+    Itemsets are kept with their supports and lengths in arrays, so the
+    itemsets of any support at or above the floor and of any length up to
+    the mined one are selected with a vectorized filter.
+
+    Attributes:
+        min_supp (float): Floor support the itemsets were mined at.
+        max_len (int): Maximum mined itemset length, unlimited if None.
+        size (int): Estimated memory used by the lattice in bytes.
+    """
+    def __init__(self, frequent_itemsets: pd.DataFrame, min_supp: float, max_len: int | None):
+        self.min_supp = min_supp
+        self.max_len = max_len
+        self.itemsets = np.empty(len(frequent_itemsets), dtype=object)
+        self.itemsets[:] = [frozenset(itemset) for itemset in frequent_itemsets['itemsets']]
+        self.itemset_supports = frequent_itemsets['support'].to_numpy(dtype=np.float64)
+        self.lengths = np.array([len(itemset) for itemset in self.itemsets], dtype=np.int64)
+        self.size = self.__get_size()
+
+    def can_answer(self, min_supp: float, max_len: int | None) -> bool:
+        """
+        Checks that every itemset of the query was mined.
+        """
+        if min_supp < self.min_supp:
+            return False
+        return self.max_len is None or (max_len is not None and max_len <= self.max_len)
+
+    def get_frequent_itemsets(self, min_supp: float, max_len: int | None) -> pd.DataFrame:
+        """
+        Returns the itemsets of a query in the mining order.
+
+        Args:
+            min_supp (float): Minimum support, not below the floor.
+            max_len (int): Maximum itemset length, unlimited if None.
+
+        Returns:
+            DataFrame: "support" and "itemsets" columns.
+        """
+        mask = self.itemset_supports >= min_supp
+        if max_len is not None:
+            mask &= self.lengths <= max_len
+        return pd.DataFrame({'support': self.itemset_supports[mask],
+                             'itemsets': self.itemsets[mask]})
+
+    def __get_size(self) -> int:
+        # Frozensets share the item strings with the transactions matrix columns
+        itemsets_size = sum(sys.getsizeof(itemset) for itemset in self.itemsets)
+        return (itemsets_size
+                + self.itemsets.nbytes
+                + self.itemset_supports.nbytes
+                + self.lengths.nbytes)
+
+
+class ItemsetLatticeCache():
+    """
+    In-memory LRU cache of itemset lattices by transactions matrix.
+
+    The key of a lattice holds the samples of its matrix, so deleting a
+    sample drops its lattices. A lattice is replaced when a query needs a
+    lower support or longer itemsets than it was mined for. The total
+    estimated size of the lattices is bounded, the least recently used
+    ones are evicted first. Keys whose lattice was larger than the whole
+    cache are remembered, so their later lattices are mined at the query
+    support instead of the floor.
+
+    Attributes:
+        DEFAULT_MAX_SIZE (int): Default maximum total size of the lattices in bytes.
+        hits (int): Number of queries answered by a cached lattice.
+        misses (int): Number of queries that needed mining.
+    """
+    DEFAULT_MAX_SIZE = 128 * 1024 * 1024
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.oversized_keys = set()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_key(self, sample_ids: list[int], transactions_key: str) -> str:
+        """
+        Builds the cache key of the lattice of a transactions matrix.
+
+        Args:
+            sample_ids (list[int]): Samples the matrix was built from.
+            transactions_key (str): Key identifying the matrix.
+        """
+        return json.dumps([sorted(set(sample_ids)), transactions_key])
+
+    def get(self, key: str, min_supp: float, max_len: int | None) -> ItemsetLattice | None:
+        """
+        Returns the cached lattice when it can answer the query, or None.
+        """
+        with self.lock:
+            lattice = self.entries.get(key)
+            if lattice is None or not lattice.can_answer(min_supp, max_len):
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return lattice
+
+    def put(self, key: str, lattice: ItemsetLattice) -> bool:
+        """
+        Stores a lattice, evicting the least recently used ones above the size limit.
+
+        Returns:
+            bool: False if the lattice is larger than the cache and was not stored.
+        """
+        with self.lock:
+            if lattice.size > self.max_size:
+                self.oversized_keys.add(key)
+                return False
+
+            self.__remove(key)
+            self.entries[key] = lattice
+            self.size += lattice.size
+
+            while self.size > self.max_size:
+                self.__remove(next(iter(self.entries)))
+            return True
+
+    def is_oversized(self, key: str) -> bool:
+        """
+        Checks whether a lattice of the key was too large to be stored.
+        """
+        with self.lock:
+            return key in self.oversized_keys
+
+    def invalidate_sample(self, sample_id: int):
+        """
+        Drops the lattices of the matrices built from a sample.
+        """
+        with self.lock:
+            for key in [key for key in self.entries if sample_id in json.loads(key)[0]]:
+                self.__remove(key)
+            self.oversized_keys = {key for key in self.oversized_keys
+                                   if sample_id not in json.loads(key)[0]}
+
+    def get_stats(self) -> dict:
+        """
+        Returns hit/miss counters and the current cache volume.
+        """
+        with self.lock:
+            requests_count = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests_count if requests_count else 0.0,
+                'entries': len(self.entries),
+                'oversized': len(self.oversized_keys),
+                'size': self.size,
+            }
+
+    def __remove(self, key: str):
+        lattice = self.entries.pop(key, None)
+        if lattice is not None:
+            self.size -= lattice.size
@@ -0,0 +1,187 @@
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelledError(Exception):
+    """Raised inside a job when its cancellation was requested"""
+    pass
+
+
+class BackgroundJob():
+    """
+    State of a job run by JobManager.
+
+    The job function receives the job and reports its progress through the
+    phase and progress attributes, or sets progress_source to a callable
+    returning a dictionary with the phase and the counters. A function that can be interrupted at
+    any time registers a cancel handler, otherwise it should call
+    raise_if_cancelled between its steps.
+
+    Attributes:
+        id (str): Job identifier.
+        status (str): 'queued', 'running', 'done', 'failed' or 'cancelled'.
+        phase (str | None): Current step of the job function.
+        progress (dict): Progress counters reported by the job function.
+        progress_source (callable | None): Source of the current phase and counters.
+        result: Value returned by the job function.
+        error (str | None): Error message of a failed job.
+    """
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.phase = None
+        self.progress = {}
+        self.progress_source = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self.cancel_requested = threading.Event()
+        self.cancel_handler = None
+        self.lock = threading.Lock()
+
+    def set_cancel_handler(self, cancel_handler):
+        """
+        Registers a callable that interrupts the running job function.
+
+        The handler is called from the thread requesting the cancellation,
+        immediately if the cancellation was already requested.
+        """
+        with self.lock:
+            self.cancel_handler = cancel_handler
+            is_cancel_requested = self.cancel_requested.is_set()
+        if is_cancel_requested and cancel_handler is not None:
+            cancel_handler()
+
+    def raise_if_cancelled(self):
+        if self.cancel_requested.is_set():
+            raise JobCancelledError()
+
+    def is_finished(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def to_dict(self) -> dict:
+        phase = self.phase
+        progress = dict(self.progress)
+        progress_source = self.progress_source
+        if progress_source is not None:
+            progress.update(progress_source())
+            phase = progress.pop('phase', phase)
+
+        return {
+            'id': self.id,
+            'status': self.status,
+            'phase': phase,
+            'progress': progress,
+            'result': self.result if self.status == 'done' else None,
+            'error': self.error,
+        }
+
+
+class JobManager():
+    """
+    Runs jobs in a pool of worker threads of the current process.
+
+    Jobs are kept in memory and finished jobs are forgotten after JOB_TTL
+    seconds. Exceptions of the expected_errors types mark the job as failed
+    with their message, any other exception is reported with a generic one.
+
+    Attributes:
+        JOB_TTL (int): Time a finished job is kept in seconds.
+        DEFAULT_MAX_WORKERS (int): Default number of worker threads.
+    """
+    JOB_TTL = 60 * 60
+    DEFAULT_MAX_WORKERS = 2
+
+    def __init__(self,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 expected_errors: tuple = ()):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='job')
+        self.expected_errors = expected_errors
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, job_function, *args) -> BackgroundJob:
+        """
+        Queues a job.
+
+        Args:
+            job_function (callable): Function called as job_function(job, *args).
+                Its return value becomes the job result.
+            *args: Additional arguments of the function.
+
+        Returns:
+            BackgroundJob: The queued job.
+        """
+        job = BackgroundJob()
+        with self.lock:
+            self.__forget_finished_jobs()
+            self.jobs[job.id] = job
+        job.future = self.executor.submit(self.__run, job, job_function, *args)
+        return job
+
+    def get(self, job_id: str) -> BackgroundJob | None:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> BackgroundJob | None:
+        """
+        Requests the cancellation of a job.
+
+        A queued job is cancelled at once, a running one when its function
+        is interrupted by the cancel handler or stops at raise_if_cancelled.
+
+        Returns:
+            BackgroundJob | None: The job, None if it is not found.
+        """
+        job = self.get(job_id)
+        if job is None or job.is_finished():
+            return job
+
+        with job.lock:
+            job.cancel_requested.set()
+            cancel_handler = job.cancel_handler
+        if job.future.cancel():
+            self.__finish(job, 'cancelled')
+        elif cancel_handler is not None:
+            cancel_handler()
+        return job
+
+    def __run(self, job: BackgroundJob, job_function, *args):
+        if job.cancel_requested.is_set():
+            self.__finish(job, 'cancelled')
+            return
+
+        job.status = 'running'
+        try:
+            job.result = job_function(job, *args)
+        except BaseException as e:
+            # Cancellation may surface as any error raised by the interrupted function
+            if job.cancel_requested.is_set():
+                self.__finish(job, 'cancelled')
+            elif isinstance(e, self.expected_errors):
+                job.error = str(e)
+                self.__finish(job, 'failed')
+            else:
+                logging.getLogger(__name__).exception("Job %s failed", job.id)
+                job.error = 'Ошибка сервера'
+                self.__finish(job, 'failed')
+                if not isinstance(e, Exception):
+                    raise
+        else:
+            self.__finish(job, 'done')
+
+    def __finish(self, job: BackgroundJob, status: str):
+        job.status = status
+        job.finished_at = time.time()
+
+    def __forget_finished_jobs(self):
+        expired_time = time.time() - self.JOB_TTL
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.is_finished() and job.finished_at < expired_time]:
+            del self.jobs[job_id]
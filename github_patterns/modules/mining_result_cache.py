@@ -0,0 +1,112 @@
+import json
+import threading
+from collections import OrderedDict
+
+
+class MiningResultCache():
+    """
+    In-memory LRU cache of serialized pattern mining results.
+
+    A result is keyed by the selected samples, their quantile configuration
+    and the mining thresholds, and remembers the samples it was computed
+    from, so deleting a sample drops every result that depends on it. The
+    total size of the stored results is bounded, the least recently used
+    ones are evicted first.
+
+    Attributes:
+        DEFAULT_MAX_SIZE (int): Default maximum total size of the results in bytes.
+        hits (int): Number of requests answered from the cache.
+        misses (int): Number of requests not found in the cache.
+        saved_time (float): Computation time of the results returned from the cache in seconds.
+    """
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_time = 0.0
+        self.lock = threading.Lock()
+
+    def get_key(self, sample_ids: list[int], quantile_config: dict, mining_params: dict) -> str:
+        """
+        Builds the cache key of a mining request.
+
+        Args:
+            sample_ids (list[int]): Selected sample identifiers.
+            quantile_config (dict): Quantile type by attribute.
+            mining_params (dict): Mining thresholds and itemset bounds.
+
+        Returns:
+            str: Key that does not depend on the order of the samples and dictionaries.
+        """
+        return json.dumps([sorted(set(sample_ids)), quantile_config, mining_params],
+                          sort_keys=True, default=str)
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_time += entry['compute_time']
+            return entry['content']
+
+    def put(self, key: str, content: bytes, sample_ids: list[int], compute_time: float):
+        """
+        Stores a result, evicting the least recently used ones above the size limit.
+
+        Args:
+            key (str): Cache key built by get_key.
+            content (bytes): Serialized result.
+            sample_ids (list[int]): Samples the result was computed from.
+            compute_time (float): Time spent computing the result in seconds.
+        """
+        if len(content) > self.max_size:
+            return
+
+        with self.lock:
+            self.__remove(key)
+            self.entries[key] = {
+                'content': content,
+                'sample_ids': set(sample_ids),
+                'compute_time': compute_time,
+            }
+            self.size += len(content)
+
+            while self.size > self.max_size:
+                self.__remove(next(iter(self.entries)))
+
+    def invalidate_sample(self, sample_id: int):
+        """
+        Drops the results computed from a sample.
+        """
+        with self.lock:
+            for key in [key for key, entry in self.entries.items()
+                        if sample_id in entry['sample_ids']]:
+                self.__remove(key)
+
+    def get_stats(self) -> dict:
+        """
+        Returns hit/miss counters, the saved computation time and the current cache volume.
+        """
+        with self.lock:
+            requests_count = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests_count if requests_count else 0.0,
+                'saved_time': self.saved_time,
+                'entries': len(self.entries),
+                'size': self.size,
+            }
+
+    def __remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry['content'])
@@ -1,11 +1,84 @@
+import itertools
+from concurrent.futures import Executor
+import numpy as np
 import pandas as pd
 from mlxtend.frequent_patterns import apriori
-from mlxtend.frequent_patterns import association_rules
 from mlxtend.frequent_patterns import fpgrowth
+from mlxtend.frequent_patterns import fpmax
+from .eclat import Eclat
+from .son import SonMiner, LocalCoordinator
+from .itemset_lattice import ItemsetLattice, ItemsetLatticeCache
 from .exceptions import *
 
 
 class PatternMiner():
+    """
+    Mines association rules from a binary transaction matrix.
+    
+    Frequent itemsets are found by one of the ENGINES. Eclat is the
+    native engine over packed item bitsets, it finds the same itemsets
+    as apriori with memory bounded by the search path. Apriori is the
+    fastest of the mlxtend engines on our narrow one-hot matrices, but it
+    checks all candidates of a level against all rows at once, so its
+    memory grows as rows x candidates. The automatic choice takes Eclat
+    when the item bitsets fit the memory limit, otherwise apriori while
+    its estimated peak fits the limit, and FP-growth above it.
+    FP-max finds maximal itemsets only, supports of their subsets are
+    counted on the matrix to generate rules. Eclat mines the subtrees of
+    the frequent items in parallel when a process pool executor is given.
+    SON mines row partitions and counts the union of their itemsets on
+    every partition, it is only used when chosen explicitly.
+    
+    With a lattice cache the itemsets of a matrix are mined once at the
+    lower of the query support and the lattice floor, later queries with
+    a support not below it and no longer itemsets are answered from the
+    cached lattice.
+    
+    In the closed and maximal ITEMSETS_MODES only rules of closed or
+    maximal itemsets are kept, and a rule is dropped when another kept
+    rule within the element limits has the same support and confidence,
+    a smaller antecedent and a larger consequent, so its lift is not lower.
+    
+    Attributes:
+        ENGINES (list[str]): Names of the mining engines.
+        AUTO_ENGINE (str): Name of the automatic engine choice.
+        ITEMSETS_MODES (list[str]): Itemsets the rules are generated from.
+        DEFAULT_MEMORY_LIMIT (int): Default memory limit of the automatic choice in bytes.
+        DEFAULT_LATTICE_FLOOR (float): Default highest support of the cached itemsets.
+        engine (str): Engine name or AUTO_ENGINE.
+        memory_limit (int): Memory limit of the automatic choice in bytes.
+        executor (Executor): Process pool of the parallel Eclat and SON tasks, serial mining if None.
+        partitions_count (int): Number of row partitions of the SON engine.
+        lattice_cache (ItemsetLatticeCache): Cache of the itemsets by matrix, mining every query if None.
+        lattice_floor (float): Highest support the cached itemsets are mined at.
+        last_engine (str): Engine used by the last call.
+        last_counts (dict): Numbers of itemsets and rules of the last rule generation 
+            before and after the itemsets mode.
+    """
+    ENGINES = ['apriori', 'fpgrowth', 'fpmax', 'eclat', 'son']
+    AUTO_ENGINE = 'auto'
+    ITEMSETS_MODES = ['all', 'closed', 'maximal']
+    DEFAULT_MEMORY_LIMIT = 512 * 1024 * 1024
+    DEFAULT_LATTICE_FLOOR = 0.02
+    
+    def __init__(self, 
+                 engine: str = AUTO_ENGINE, 
+                 memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                 executor: Executor | None = None,
+                 partitions_count: int = SonMiner.DEFAULT_PARTITIONS_COUNT,
+                 lattice_cache: ItemsetLatticeCache | None = None,
+                 lattice_floor: float = DEFAULT_LATTICE_FLOOR):
+        if engine != self.AUTO_ENGINE and engine not in self.ENGINES:
+            raise ValueError(f"Unknown mining engine: {engine}")
+        self.engine = engine
+        self.memory_limit = memory_limit
+        self.executor = executor
+        self.partitions_count = partitions_count
+        self.lattice_cache = lattice_cache
+        self.lattice_floor = lattice_floor
+        self.last_engine = None
+        self.last_counts = None
+    
     def mine_patterns(self, 
                       transactions_matrix: pd.DataFrame, 
                       min_supp: float, 
@@ -14,9 +87,11 @@ class PatternMiner():
                       min_left_elements: int=1, 
                       min_right_elements: int=1,
                       max_left_elements: int=3,
-                      max_right_elements: int=3):
+                      max_right_elements: int=3,
+                      itemsets_mode: str='all',
+                      lattice_key: str | None = None):
         """
-        Mine patterns from transaction data using Apriori algorithm and generate association rules.
+        Mine patterns from transaction data and generate association rules within the element limits.
         
         Parameters:
         - transactions_matrix: pd.DataFrame - Binary matrix of transactions.
@@ -27,79 +102,357 @@ class PatternMiner():
         - min_right_elements: int - Minimum number of elements in the consequent.
         - max_left_elements: int - Maximum number of elements in the antecedent.
         - max_right_elements: int - Maximum number of elements in the consequent.
+        - itemsets_mode: str - One of ITEMSETS_MODES.
+        - lattice_key: str | None - Lattice cache key of the transactions matrix, not cached if None.
         
         Returns:
         - pd.DataFrame - Dataframe containing the association rules.
         """
         
-        def cell_to_string(cell):
-            if not isinstance(cell, str):
-                try:
-                    iter(cell)
-                    string = ""
-                    for item in cell:
-                        string += f"({item}), "
-                    string = string[:-2]
-                    return string
-                except TypeError:
-                    pass
-            return cell
-        
         def check_for_empty_rules(rules):
             if rules.empty:
                 raise NoPatternsException("Шаблоны не найдены. Попробуйте изменить параметры поиска")
-            
-        def drop_unnecessary_columns(dataframe: pd.DataFrame, 
-                                     columns: list[str]):
-            
-            changed_dataframe = dataframe.copy()
-            for column in columns:
-                if column in changed_dataframe.columns:
-                    changed_dataframe = changed_dataframe.drop(column, 
-                                                               axis=1)
-            return changed_dataframe
-                    
-        def round_unnecessary_columns(dataframe: pd.DataFrame, 
-                                      columns: list[str]):
-            
-            changed_dataframe = dataframe.copy()
-            for column in columns:
-                if column in changed_dataframe.columns:
-                    changed_dataframe[column] = changed_dataframe[column].round(4)
-                    
-            return changed_dataframe    
         
-        freaquent_itemsets = apriori(transactions_matrix, min_support=min_supp, use_colnames=True)
+        # Longer itemsets give no rule within the element limits
+        max_len = max_left_elements + max_right_elements
+        if self.lattice_cache is not None and lattice_key is not None:
+            lattice = self.get_lattice(transactions_matrix, min_supp, max_len, lattice_key)
+            freaquent_itemsets = lattice.get_frequent_itemsets(min_supp, max_len)
+        else:
+            freaquent_itemsets = self.find_frequent_itemsets(transactions_matrix, min_supp, max_len)
         check_for_empty_rules(freaquent_itemsets)
 
-        rules = association_rules(freaquent_itemsets, metric='lift', min_threshold=min_lift)
+        rules = self.generate_rules(freaquent_itemsets, 
+                                    min_conf, 
+                                    min_lift,
+                                    min_left_elements,
+                                    min_right_elements,
+                                    max_left_elements,
+                                    max_right_elements,
+                                    itemsets_mode)
         check_for_empty_rules(rules)
+
+        return rules
+    
+    def find_frequent_itemsets(self, 
+                               transactions_matrix: pd.DataFrame, 
+                               min_supp: float,
+                               max_len: int | None = None) -> pd.DataFrame:
+        """
+        Find frequent itemsets with the configured or automatically selected engine.
         
-        rules = drop_unnecessary_columns(rules, ['antecedent support',
-                                         'consequent support',
-                                         'leverage',
-                                         'conviction',
-                                         'zhangs_metric'])
+        Parameters:
+        - transactions_matrix: pd.DataFrame - Binary matrix of transactions.
+        - min_supp: float - Minimum support threshold.
+        - max_len: int | None - Maximum itemset length, unlimited if None.
         
-        rules = round_unnecessary_columns(rules, 
-                                          ['support',
-                                           'confidence',
-                                           'lift'])
-
-        if min_conf:
-            rules = rules[rules["confidence"] >= min_conf]
+        Returns:
+        - pd.DataFrame - "support" and "itemsets" columns, items are column names.
+        """
+        engine = self.engine
+        if engine == self.AUTO_ENGINE:
+            engine = self.select_engine(transactions_matrix, min_supp)
+        self.last_engine = engine
         
-        check_for_empty_rules(rules)
+        if engine == 'apriori':
+            return apriori(transactions_matrix, min_support=min_supp, use_colnames=True, 
+                           max_len=max_len)
+        if engine == 'fpgrowth':
+            return fpgrowth(transactions_matrix, min_support=min_supp, use_colnames=True, 
+                            max_len=max_len)
+        if engine == 'son':
+            son_miner = SonMiner(self.partitions_count, LocalCoordinator(self.executor), max_len)
+            return son_miner.find_frequent_itemsets(transactions_matrix, min_supp)
+        if engine == 'eclat':
+            return Eclat(max_len=max_len, executor=self.executor).find_frequent_itemsets(transactions_matrix, 
+                                                                                         min_supp)
+        
+        # With max_len fpmax returns the maximal itemsets of the truncated search, 
+        # whose subsets miss frequent itemsets, so the length limit is applied to the subsets
+        maximal_itemsets = fpmax(transactions_matrix, min_support=min_supp, use_colnames=True)
+        return self.__get_subsets_support(maximal_itemsets, transactions_matrix, max_len)
+    
+    def get_lattice(self, 
+                    transactions_matrix: pd.DataFrame, 
+                    min_supp: float, 
+                    max_len: int | None, 
+                    lattice_key: str) -> ItemsetLattice:
+        """
+        Return the cached itemset lattice of a query or mine it at the floor support.
+        
+        A matrix whose floor lattice did not fit the cache is mined at the query
+        support, which costs less and may still be cached.
+        """
+        lattice = self.lattice_cache.get(lattice_key, min_supp, max_len)
+        if lattice is None:
+            floor_supp = min(min_supp, self.lattice_floor)
+            if self.lattice_cache.is_oversized(lattice_key):
+                floor_supp = min_supp
+            lattice = ItemsetLattice(self.find_frequent_itemsets(transactions_matrix, floor_supp, max_len),
+                                     floor_supp, 
+                                     max_len)
+            self.lattice_cache.put(lattice_key, lattice)
+        return lattice
+    
+    def generate_rules(self,
+                       frequent_itemsets: pd.DataFrame,
+                       min_conf: float,
+                       min_lift: float,
+                       min_left_elements: int=1, 
+                       min_right_elements: int=1,
+                       max_left_elements: int=3,
+                       max_right_elements: int=3,
+                       itemsets_mode: str='all') -> pd.DataFrame:
+        """
+        Generate association rules within the element limits and thresholds.
+        
+        Itemsets are encoded as bitmasks of their items in 64-bit words, and
+        the supports are looked up by mask in one sorted array. For every
+        itemset length and every choice of antecedent positions the 
+        antecedent and consequent masks, supports, confidence and lift of 
+        all itemsets of that length are computed with array operations, so 
+        no rule is built in Python. Only antecedent and consequent sizes 
+        within the limits are evaluated. Confidence is compared after 
+        rounding to 4 digits, lift before it, as mlxtend association_rules 
+        followed by rounding did.
+        
+        In the closed and maximal modes the immediate subsets of every
+        itemset are looked up the same way. An itemset with a subset of equal
+        support is not a generator, and the subset is not closed. A rule of
+        a non-closed itemset is dropped in the closed mode when its
+        consequent can take the missing item, a rule of a non-maximal
+        itemset in the maximal mode. A rule with a non-generator antecedent
+        is dropped when an item can move from the antecedent to the
+        consequent within the limits.
+        
+        Rules follow the order of the itemsets, antecedents from the longest.
+        Items of a rule side are listed in name order. The numbers of 
+        itemsets and rules before and after the mode are kept in last_counts.
+        
+        Parameters:
+        - frequent_itemsets: pd.DataFrame - "support" and "itemsets" columns with every subset of an itemset.
+        - min_conf: float - Minimum confidence threshold, not checked if 0.
+        - min_lift: float - Minimum lift threshold.
+        - min_left_elements, min_right_elements, max_left_elements, max_right_elements: int - Element limits.
+        - itemsets_mode: str - One of ITEMSETS_MODES.
+        
+        Returns:
+        - pd.DataFrame - "antecedents" and "consequents" strings, "support", "confidence" and "lift" 
+          rounded to 4 digits.
+        """
+        if itemsets_mode not in self.ITEMSETS_MODES:
+            raise ValueError(f"Unknown itemsets mode: {itemsets_mode}")
+        
+        itemsets = frequent_itemsets['itemsets'].to_numpy()
+        itemset_supports = frequent_itemsets['support'].to_numpy(dtype=np.float64)
+        lengths = np.fromiter(map(len, itemsets), dtype=np.int64, count=len(itemsets))
+        codes, items = pd.factorize(np.fromiter(itertools.chain.from_iterable(itemsets), 
+                                                dtype=object, count=lengths.sum()), 
+                                    sort=True)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        
+        item_masks = np.zeros((len(items), -(-len(items) // 64)), dtype=np.uint64)
+        item_masks[np.arange(len(items)), np.arange(len(items)) // 64] = (
+            np.uint64(1) << (np.arange(len(items)) % 64).astype(np.uint64))
+        itemset_masks = np.zeros((len(itemsets), item_masks.shape[1]), dtype=np.uint64)
+        itemset_codes = {}
+        for length in np.unique(lengths):
+            rows = np.flatnonzero(lengths == length)
+            positions = offsets[rows][:, None] + np.arange(length)
+            codes[positions] = np.sort(codes[positions], axis=1)
+            itemset_codes[length] = codes[positions]
+            # Items of an itemset are distinct, so the sum of their masks is their union
+            itemset_masks[rows] = item_masks[itemset_codes[length]].sum(axis=1, dtype=np.uint64)
+        mask_keys = self.__get_mask_keys(itemset_masks)
+        mask_order = np.argsort(mask_keys)
+        sorted_mask_keys = mask_keys[mask_order]
+        
+        def find_itemsets(masks):
+            return mask_order[np.searchsorted(sorted_mask_keys, self.__get_mask_keys(masks))]
+        
+        has_superset = np.zeros(len(itemsets), dtype=bool)
+        has_equal_superset = np.zeros(len(itemsets), dtype=bool)
+        has_equal_subset = np.zeros(len(itemsets), dtype=bool)
+        if itemsets_mode != 'all':
+            for length, length_codes in itemset_codes.items():
+                if length < 2:
+                    continue
+                rows = np.flatnonzero(lengths == length)
+                for position in range(length):
+                    subsets = find_itemsets(itemset_masks[rows] - item_masks[length_codes[:, position]])
+                    equal = itemset_supports[subsets] == itemset_supports[rows]
+                    has_superset[subsets] = True
+                    has_equal_superset[subsets[equal]] = True
+                    has_equal_subset[rows[equal]] = True
+        mode_itemsets = {'all': np.ones(len(itemsets), dtype=bool),
+                         'closed': ~has_equal_superset,
+                         'maximal': ~has_superset}[itemsets_mode]
+        
+        rules_count = 0
+        rule_parts = []
+        for length, length_codes in itemset_codes.items():
+            rows = np.flatnonzero(lengths == length)
+            split_index = 0
+            for antecedent_length in range(length - 1, 0, -1):
+                consequent_length = length - antecedent_length
+                if not (min_left_elements <= antecedent_length <= max_left_elements
+                        and min_right_elements <= consequent_length <= max_right_elements):
+                    continue
+                
+                for positions in itertools.combinations(range(length), antecedent_length):
+                    split_index += 1
+                    antecedent_masks = item_masks[length_codes[:, positions]].sum(axis=1, dtype=np.uint64)
+                    antecedents = find_itemsets(antecedent_masks)
+                    consequents = find_itemsets(itemset_masks[rows] - antecedent_masks)
+                    
+                    confidence = itemset_supports[rows] / itemset_supports[antecedents]
+                    lift = confidence / itemset_supports[consequents]
+                    selected = lift >= min_lift
+                    if min_conf:
+                        selected &= np.round(confidence, 4) >= min_conf
+                    rules_count += selected.sum()
+                    
+                    if itemsets_mode == 'maximal':
+                        selected &= ~has_superset[rows]
+                    if consequent_length < max_right_elements:
+                        if itemsets_mode == 'closed':
+                            selected &= ~has_equal_superset[rows]
+                        if antecedent_length > min_left_elements:
+                            selected &= ~has_equal_subset[antecedents]
+                    
+                    rule_parts.append((rows[selected], 
+                                       np.full(selected.sum(), split_index), 
+                                       antecedents[selected], 
+                                       consequents[selected], 
+                                       confidence[selected], 
+                                       lift[selected]))
+        
+        if rule_parts:
+            rule_rows, splits, antecedents, consequents, confidence, lift = map(np.concatenate, 
+                                                                               zip(*rule_parts))
+        else:
+            rule_rows = splits = antecedents = consequents = np.empty(0, dtype=np.int64)
+            confidence = lift = np.empty(0, dtype=np.float64)
+        order = np.lexsort((splits, rule_rows))
+        self.last_counts = {
+            'itemsets': len(itemsets),
+            'mode_itemsets': int(mode_itemsets.sum()),
+            'rules': int(rules_count),
+            'mode_rules': len(order),
+        }
+        
+        side_itemsets = np.unique(np.concatenate([antecedents, consequents]))
+        side_strings = np.empty(len(itemsets), dtype=object)
+        side_strings[side_itemsets] = [
+            ', '.join(f"({item})" for item in items[codes[offsets[itemset]:offsets[itemset] + lengths[itemset]]])
+            for itemset in side_itemsets]
+        
+        return pd.DataFrame({
+            'antecedents': side_strings[antecedents[order]],
+            'consequents': side_strings[consequents[order]],
+            'support': np.round(itemset_supports[rule_rows[order]], 4),
+            'confidence': np.round(confidence[order], 4),
+            'lift': np.round(lift[order], 4),
+        })
+    
+    def select_engine(self, transactions_matrix: pd.DataFrame, min_supp: float) -> str:
+        """
+        Choose Eclat, apriori or FP-growth by the memory they need.
+        
+        Eclat keeps a bitset per item and one per search depth, each of 
+        rows / 8 bytes, and was faster than the mlxtend engines on every
+        benchmark sample from 10k rows (benchmark_mining).
+        """
+        items_count = transactions_matrix.shape[1]
+        bitset_size = -(-len(transactions_matrix) // 64) * 8
+        if 2 * items_count * bitset_size <= self.memory_limit:
+            return 'eclat'
+        if self.estimate_apriori_memory(transactions_matrix, min_supp) <= self.memory_limit:
+            return 'apriori'
+        return 'fpgrowth'
+    
+    def estimate_apriori_memory(self, 
+                                transactions_matrix: pd.DataFrame, 
+                                min_supp: float) -> int:
+        """
+        Estimate the peak memory of apriori in bytes.
+        
+        Apriori holds a boolean array of rows x candidates x itemset length
+        and the rows x candidates matches for every level, a candidate being a frequent itemset of the previous 
+        level extended by an item that forms frequent pairs with all of its 
+        items. Supports of larger itemsets are estimated from the item 
+        supports and the pair lifts, sup(I + j) = sup(I) * sup(j) * lift(i, j) 
+        over i in I, and the levels are walked until the estimate passes 
+        the memory limit.
+        
+        Parameters:
+        - transactions_matrix: pd.DataFrame - Binary matrix of transactions.
+        - min_supp: float - Minimum support threshold.
+        
+        Returns:
+        - int - Estimate of the largest level array, capped just above the memory limit.
+        """
+        rows_count = len(transactions_matrix)
+        if not rows_count:
+            return 0
+        
+        matrix = transactions_matrix.to_numpy(dtype=np.float32)
+        pair_support = (matrix.T @ matrix) / rows_count
+        item_support = np.diag(pair_support).copy()
+        frequent_items = item_support >= min_supp
+        # Only pairs (i, j) with i < j, so every itemset is built once
+        frequent_pairs = np.triu(pair_support >= min_supp, k=1)
+        frequent_pairs &= frequent_items[:, None] & frequent_items[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_item_support = np.log(item_support)
+            log_lift = np.log(pair_support) - log_item_support[:, None] - log_item_support[None, :]
+        log_lift[~np.isfinite(log_lift)] = 0
+        
+        # Every row is a frequent itemset: its extensions, estimated log support and
+        # sum of the log lifts of its items with every item
+        items = np.flatnonzero(frequent_items)
+        extensions = frequent_pairs[items]
+        log_support = log_item_support[items]
+        log_lift_sum = log_lift[items]
+        level = 1
+        peak_memory = rows_count * len(items)
+        while extensions.any():
+            level += 1
+            itemsets, items = np.nonzero(extensions)
+            # Candidate items of every row and the row matches of every candidate
+            peak_memory = max(peak_memory, rows_count * len(items) * (level + 1))
+            if peak_memory > self.memory_limit:
+                break
             
-        rules = rules[rules['antecedents'].apply(len).between(min_left_elements, max_left_elements)]
-        check_for_empty_rules(rules)
-        rules = rules[rules['consequents'].apply(len).between(min_right_elements, max_right_elements)]
-        check_for_empty_rules(rules)  
+            log_support = (log_support[itemsets] + log_item_support[items] 
+                           + log_lift_sum[itemsets, items])
+            frequent = log_support >= np.log(min_supp)
+            itemsets, items, log_support = itemsets[frequent], items[frequent], log_support[frequent]
+            extensions = extensions[itemsets] & frequent_pairs[items]
+            log_lift_sum = log_lift_sum[itemsets] + log_lift[items]
         
-        rules["antecedents"] = rules["antecedents"].apply(lambda x: cell_to_string(x))
-        rules["consequents"] = rules["consequents"].apply(lambda x: cell_to_string(x))
-        rules.dropna(inplace=True)
+        return peak_memory
+    
+    def __get_mask_keys(self, masks: np.ndarray) -> np.ndarray:
+        # Masks of one word are compared as integers, longer ones as raw bytes
+        if masks.shape[1] == 1:
+            return masks[:, 0]
+        return np.ascontiguousarray(masks).view(np.dtype((np.void, masks.itemsize * masks.shape[1]))).ravel()
+    
+    def __get_subsets_support(self, 
+                              maximal_itemsets: pd.DataFrame, 
+                              transactions_matrix: pd.DataFrame,
+                              max_len: int | None = None) -> pd.DataFrame:
+        itemsets = set()
+        for maximal_itemset in maximal_itemsets['itemsets']:
+            max_subset_length = len(maximal_itemset) if max_len is None else min(max_len, len(maximal_itemset))
+            for length in range(1, max_subset_length + 1):
+                itemsets.update(frozenset(subset) 
+                                for subset in itertools.combinations(sorted(maximal_itemset), length))
         
-        check_for_empty_rules(rules)
-
-        return rules
\ No newline at end of file
+        itemsets = sorted(itemsets, key=lambda itemset: (len(itemset), sorted(itemset)))
+        matrix = transactions_matrix.to_numpy(dtype=bool)
+        column_positions = {column: i for i, column in enumerate(transactions_matrix.columns)}
+        supports = [matrix[:, [column_positions[item] for item in itemset]].all(axis=1).mean()
+                    for itemset in itemsets]
+        return pd.DataFrame({'support': supports, 'itemsets': itemsets})
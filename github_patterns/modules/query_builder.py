@@ -0,0 +1,245 @@
+import pandas as pd
+from .queries import *
+
+
+class ClickHouseQueryBuilder():
+    """
+    Builds ClickHouse queries for GitHub repository data.
+
+    Every ClickHouse attribute is described in the data configuration by an
+    "aggregate" expression and, for averages and ratios, an "aggregateDivisor"
+    expression. All attributes and threshold filters are computed with
+    conditional aggregation in a single GROUP BY repo_name pass over
+    github_events, so adding an attribute only needs a new configuration entry.
+
+    Partial queries return the aggregates and divisors themselves instead of
+    their ratios. Partial results over disjoint date ranges are merged by
+    summing them, which gives exact totals, ratios and weighted averages.
+    The threshold filters and the limit only apply to the merged totals, so
+    every partial result holds nearly all repositories active in its range
+    and the merge needs memory for all repositories of the whole period.
+
+    Attributes:
+        DIVISOR_SUFFIX (str): Suffix of divisor columns in partial results.
+        data_configuration (DataFrame): Data configuration read from a JSON file.
+    """
+    DIVISOR_SUFFIX = '__divisor'
+
+    def __init__(self, data_configuration: pd.DataFrame):
+        self.data_configuration = data_configuration
+
+    def build_data_query(self, query_params) -> str:
+        """
+        Builds the repository data query.
+
+        Args:
+            query_params (GithubDataParams): Parameters for data retrieval.
+
+        Returns:
+            str: ClickHouse query returning one row per repository.
+        """
+        select_clauses = [REPO_SELECT_CLAUSE]
+        for config_row in self._get_aggregated_attributes(query_params.transaction_composition):
+            select_clauses.append(self._build_select_clause(config_row))
+
+        return CLICKHOUSE_DATA_QUERY.format(
+            select_clause_str=", ".join(select_clauses),
+            start_date=query_params.start_date,
+            end_date=query_params.end_date,
+            having_clause_str=self._build_having_clause(query_params),
+            limit=query_params.limit
+        )
+
+    def build_partial_data_query(self, query_params, start_date: str, end_date: str) -> str:
+        """
+        Builds a query of mergeable per-repository aggregates for a date range.
+
+        The threshold filters and the limit are applied by merge_partial_results,
+        a repository may pass them only after its partial results are summed.
+        When the request has filters, the query only drops the rows whose
+        aggregates are all zero, they do not change the merged totals.
+
+        Args:
+            query_params (GithubDataParams): Parameters for data retrieval.
+            start_date (str): Start of the range (format: 'YYYY-MM-DD').
+            end_date (str): End of the range, not included (format: 'YYYY-MM-DD').
+
+        Returns:
+            str: ClickHouse query returning one row per repository.
+        """
+        attributes = self._get_aggregated_attributes(query_params.transaction_composition)
+        filters = self._get_filters(query_params)
+        select_clauses = self._build_partial_select_clauses(attributes, filters)
+
+        return CLICKHOUSE_PARTIAL_DATA_QUERY.format(
+            select_clause_str=", ".join(select_clauses),
+            start_date=start_date,
+            end_date=end_date,
+            having_clause_str=self._build_partial_having_clause(attributes, filters)
+        )
+
+    def build_daily_partial_data_query(self, start_date: str, end_date: str) -> str:
+        """
+        Builds a query of mergeable per-repository and per-day aggregates.
+
+        The query returns every configured attribute and filter counter, so
+        its result can answer any request over the days it covers.
+
+        Args:
+            start_date (str): Start of the range (format: 'YYYY-MM-DD').
+            end_date (str): End of the range, not included (format: 'YYYY-MM-DD').
+
+        Returns:
+            str: ClickHouse query returning one row per repository and day.
+        """
+        select_clauses = self._build_partial_select_clauses(
+            self._get_aggregated_attributes(list(self.data_configuration["columnName"])),
+            self._get_filter_aggregates())
+
+        return CLICKHOUSE_DAILY_PARTIAL_DATA_QUERY.format(
+            select_clause_str=", ".join(select_clauses),
+            start_date=start_date,
+            end_date=end_date
+        )
+
+    def get_partial_columns(self, query_params) -> list[str]:
+        """
+        Returns the partial result columns needed to answer a request.
+        """
+        columns = ["repo"]
+        for config_row in self._get_aggregated_attributes(query_params.transaction_composition):
+            columns.append(config_row["columnName"])
+            if not pd.isnull(config_row.get("aggregateDivisor")):
+                columns.append(config_row["columnName"] + self.DIVISOR_SUFFIX)
+
+        columns.extend(filter_name for filter_name, _, _ in self._get_filters(query_params))
+        return columns
+
+    def merge_partial_results(self,
+                              partial_results: list[pd.DataFrame],
+                              query_params) -> pd.DataFrame:
+        """
+        Merges results of partial queries into the repository data.
+
+        Aggregates are summed per repository, ratios are computed from the
+        summed aggregates and divisors, then the threshold filters and the
+        random limit are applied.
+
+        Args:
+            partial_results (list[DataFrame]): Results of build_partial_data_query queries.
+            query_params (GithubDataParams): Parameters for data retrieval.
+
+        Returns:
+            DataFrame: Repository data with the columns of build_data_query.
+        """
+        partial_results = [result for result in partial_results if not result.empty]
+        if not partial_results:
+            return pd.DataFrame()
+
+        totals = pd.concat(partial_results, ignore_index=True).groupby("repo", sort=False).sum()
+
+        for filter_name, _, threshold in self._get_filters(query_params):
+            totals = totals[totals[filter_name] >= threshold]
+
+        data = pd.DataFrame(index=totals.index)
+        for config_row in self._get_aggregated_attributes(query_params.transaction_composition):
+            column_name = config_row["columnName"]
+            divisor_name = column_name + self.DIVISOR_SUFFIX
+            if divisor_name not in totals.columns:
+                data[column_name] = totals[column_name]
+                continue
+
+            divisor = totals[divisor_name]
+            data[column_name] = (totals[column_name] / divisor.where(divisor != 0)).fillna(0)
+
+        data = data.reset_index()
+        return data.sample(n=min(query_params.limit, len(data))).reset_index(drop=True)
+
+    def _get_aggregated_attributes(self, transaction_composition: list[str]) -> list[pd.Series]:
+        data_conf = self.data_configuration
+        if "aggregate" not in data_conf.columns:
+            return []
+
+        attributes = data_conf[data_conf["columnName"].isin(transaction_composition)
+                               & data_conf["aggregate"].notna()]
+        return [config_row for _, config_row in attributes.iterrows()]
+
+    def _get_partial_aggregates(self,
+                                attributes: list[pd.Series],
+                                filters: list[tuple]) -> list[tuple[str, str]]:
+        partial_aggregates = []
+        for config_row in attributes:
+            column_name = config_row["columnName"]
+            partial_aggregates.append((config_row["aggregate"], column_name))
+
+            if not pd.isnull(config_row.get("aggregateDivisor")):
+                partial_aggregates.append((config_row["aggregateDivisor"],
+                                           column_name + self.DIVISOR_SUFFIX))
+
+        for filter_name, aggregate, *_ in filters:
+            partial_aggregates.append((aggregate.strip(), filter_name))
+        return partial_aggregates
+
+    def _build_partial_select_clauses(self,
+                                      attributes: list[pd.Series],
+                                      filters: list[tuple]) -> list[str]:
+        select_clauses = [REPO_SELECT_CLAUSE]
+        for aggregate, column_name in self._get_partial_aggregates(attributes, filters):
+            select_clauses.append(AGGREGATE_SELECT_CLAUSE.format(aggregate=aggregate,
+                                                                 column_name=column_name))
+        return select_clauses
+
+    def _build_partial_having_clause(self,
+                                     attributes: list[pd.Series],
+                                     filters: list[tuple]) -> str:
+        # A repository passing a filter has a non-zero counter in some partial result,
+        # without filters repositories with only zero aggregates are part of the result
+        if not filters:
+            return ''
+
+        aggregates = dict.fromkeys(aggregate for aggregate, _
+                                   in self._get_partial_aggregates(attributes, filters))
+        filters_str = " OR ".join(NON_ZERO_QUERY_FILTER.format(aggregate=aggregate)
+                                  for aggregate in aggregates)
+        return HAVING_CLAUSE.format(filters_str=filters_str)
+
+    def _build_select_clause(self, config_row: pd.Series) -> str:
+        divisor = config_row.get("aggregateDivisor")
+        if pd.isnull(divisor):
+            return AGGREGATE_SELECT_CLAUSE.format(aggregate=config_row["aggregate"],
+                                                  column_name=config_row["columnName"])
+
+        return RATIO_SELECT_CLAUSE.format(aggregate=config_row["aggregate"],
+                                          divisor=divisor,
+                                          column_name=config_row["columnName"])
+
+    def _get_filter_aggregates(self) -> list[tuple[str, str]]:
+        return [('new_repos_filter', NEW_REPOS_QUERY_FILTER),
+                ('min_watches_filter', MIN_WATCHES_QUERY_FILTER),
+                ('min_members_filter', MIN_MEMBERS_QUERY_FILTER)]
+
+    def _get_filters(self, query_params) -> list[tuple[str, str, int]]:
+        # A filtered repository must have at least one event of the filter type
+        thresholds = {}
+        if query_params.is_new_repos:
+            thresholds['new_repos_filter'] = 1
+
+        if query_params.min_watch_event_count > 0:
+            thresholds['min_watches_filter'] = max(query_params.min_watch_event_count, 1)
+
+        if query_params.min_members_count > 0:
+            thresholds['min_members_filter'] = max(query_params.min_members_count - 1, 1)
+
+        return [(filter_name, aggregate, thresholds[filter_name])
+                for filter_name, aggregate in self._get_filter_aggregates()
+                if filter_name in thresholds]
+
+    def _build_having_clause(self, query_params) -> str:
+        filters = self._get_filters(query_params)
+        if not filters:
+            return ''
+
+        filters_str = " AND ".join(QUERY_FILTER.format(aggregate=aggregate.strip(),
+                                                       threshold=threshold)
+                                   for _, aggregate, threshold in filters)
+        return HAVING_CLAUSE.format(filters_str=filters_str)
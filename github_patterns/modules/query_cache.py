@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import hashlib
+import pandas as pd
+
+
+class QueryResultCache():
+    """
+    On-disk cache of ClickHouse query results.
+
+    Every result is stored as a Parquet file named after a hash of the
+    normalized request parameters and the generated SQL. The file modification
+    time is the time the result was saved and is used for the TTL, the access
+    time is updated on every hit and is used for the least recently used
+    eviction when the cache grows beyond its size limit.
+
+    Attributes:
+        FILE_EXTENSION (str): Extension of the cached result files.
+        DEFAULT_TTL (int): Default time to live of a cached result in seconds.
+        DEFAULT_MAX_SIZE (int): Default maximum total size of the cache in bytes.
+        hits (int): Number of requests answered from the cache.
+        misses (int): Number of requests not found in the cache.
+    """
+    FILE_EXTENSION = '.parquet'
+    DEFAULT_TTL = 24 * 60 * 60
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+    def __init__(self,
+                 cache_dir: str,
+                 ttl: int = DEFAULT_TTL,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, params: dict, query: str) -> str:
+        """
+        Builds a cache key from request parameters and the SQL query.
+
+        Args:
+            params (dict): Request parameters. List values are compared as sets.
+            query (str): Generated SQL query.
+
+        Returns:
+            str: Hex digest identifying the request.
+        """
+        normalized_params = {name: sorted(value) if isinstance(value, (list, set, tuple)) else value
+                             for name, value in params.items()}
+        normalized_query = " ".join(query.split())
+        key_source = json.dumps({'params': normalized_params, 'query': normalized_query},
+                                sort_keys=True,
+                                default=str)
+        return hashlib.sha256(key_source.encode()).hexdigest()
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Returns a cached result or None if it is missing or expired.
+        """
+        path = self._get_path(key)
+        try:
+            saved_time = os.path.getmtime(path)
+            if time.time() - saved_time > self.ttl:
+                os.remove(path)
+                raise FileNotFoundError(path)
+
+            data = pd.read_parquet(path)
+            os.utime(path, (time.time(), saved_time))
+        except (FileNotFoundError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: pd.DataFrame):
+        """
+        Saves a result and evicts least recently used results over the size limit.
+        """
+        path = self._get_path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        data.to_parquet(temp_path, index=False)
+        os.replace(temp_path, path)
+        self._evict(keep_path=path)
+
+    def clear(self):
+        for path in self._get_cached_paths():
+            os.remove(path)
+
+    def get_stats(self) -> dict:
+        """
+        Returns hit/miss counters and the current cache volume.
+        """
+        paths = self._get_cached_paths()
+        requests_count = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / requests_count if requests_count else 0.0,
+            'entries': len(paths),
+            'size': sum(os.path.getsize(path) for path in paths),
+        }
+
+    def _evict(self, keep_path: str):
+        entries = []
+        for path in self._get_cached_paths():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if path == keep_path:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def _get_cached_paths(self) -> list[str]:
+        return [os.path.join(self.cache_dir, file_name)
+                for file_name in os.listdir(self.cache_dir)
+                if file_name.endswith(self.FILE_EXTENSION)]
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.FILE_EXTENSION)
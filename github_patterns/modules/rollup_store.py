@@ -0,0 +1,81 @@
+import os
+import hashlib
+from datetime import datetime, timedelta
+import pandas as pd
+
+
+class DailyRollupStore():
+    """
+    Local store of daily per-repository event aggregates.
+
+    Every day is kept in its own Parquet file with one row per repository
+    that had events on that day. A day file is written once the day can no
+    longer change, so later requests read it locally and only query
+    ClickHouse for the days that are not stored yet.
+
+    The files are kept in a subdirectory named after a hash of the rollup
+    query, so changing the configured aggregates starts a new rollup instead
+    of mixing incompatible files.
+
+    Attributes:
+        FILE_EXTENSION (str): Extension of the day files.
+        DATE_FORMAT (str): Date format of the day file names.
+    """
+    FILE_EXTENSION = '.parquet'
+    DATE_FORMAT = '%Y-%m-%d'
+
+    def __init__(self, rollup_dir: str, rollup_query: str):
+        schema_key = hashlib.sha256(" ".join(rollup_query.split()).encode()).hexdigest()[:16]
+        self.rollup_dir = os.path.join(rollup_dir, schema_key)
+        os.makedirs(self.rollup_dir, exist_ok=True)
+
+    def get_days(self, start_date: str, end_date: str) -> list[str]:
+        """
+        Returns the days of a date range, the end date is not included.
+        """
+        start_day = datetime.strptime(start_date, self.DATE_FORMAT)
+        end_day = datetime.strptime(end_date, self.DATE_FORMAT)
+        return [(start_day + timedelta(days=offset)).strftime(self.DATE_FORMAT)
+                for offset in range((end_day - start_day).days)]
+
+    def get_missing_days(self, days: list[str]) -> list[str]:
+        return [day for day in days if not os.path.exists(self._get_path(day))]
+
+    def load(self, days: list[str], columns: list[str]) -> pd.DataFrame:
+        """
+        Reads the stored aggregates of the given days.
+
+        Args:
+            days (list[str]): Stored days (format: 'YYYY-MM-DD').
+            columns (list[str]): Columns to read.
+
+        Returns:
+            DataFrame: Aggregates of all days, one row per repository and day.
+        """
+        day_data = [pd.read_parquet(self._get_path(day), columns=columns) for day in days]
+        day_data = [data for data in day_data if not data.empty]
+        if not day_data:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(day_data, ignore_index=True)
+
+    def save(self, data: pd.DataFrame, days: list[str]):
+        """
+        Stores the aggregates of the given days.
+
+        Days without rows in the data are stored as empty files, so they are
+        not requested again.
+
+        Args:
+            data (DataFrame): Daily aggregates with a "day" column.
+            days (list[str]): Days to store (format: 'YYYY-MM-DD').
+        """
+        day_groups = dict(tuple(data.groupby("day"))) if not data.empty else {}
+        for day in days:
+            day_data = day_groups.get(day, data.iloc[0:0]).drop(columns="day", errors="ignore")
+            path = self._get_path(day)
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            day_data.to_parquet(temp_path, index=False)
+            os.replace(temp_path, path)
+
+    def _get_path(self, day: str) -> str:
+        return os.path.join(self.rollup_dir, day + self.FILE_EXTENSION)
@@ -1,20 +1,31 @@
 import pandas as pd
 import tempfile
 import shutil
-from datetime import datetime
-import aiohttp
+from datetime import datetime, timedelta
 import asyncio
 import environ
-from bs4 import BeautifulSoup
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from .queries import *
+from contextlib import aclosing
+from .clickhouse_client import ClickHouseClient
+from .query_builder import ClickHouseQueryBuilder
+from .query_cache import QueryResultCache
+from .rollup_store import DailyRollupStore
+from .github_api_fetcher import GithubApiFetcher
+from .github_graphql_fetcher import GithubGraphqlFetcher
+from .github_metadata_cache import GithubMetadataCache
 from .exceptions import *
 
+# Selenium is only needed for the playground scraping fallback
+try:
+    from bs4 import BeautifulSoup
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium import webdriver
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+except ImportError:
+    webdriver = None
+
 
 class GithubDataParams:
     """
@@ -55,23 +66,123 @@ class ServiceConnector():
     """
     Connects to services (ClickHouse and GitHub API) to retrieve data for repositories.
 
+    The ClickHouse data is requested through the HTTP interface configured by
+    the CLICKHOUSE_URL, CLICKHOUSE_USER, CLICKHOUSE_PASSWORD and
+    CLICKHOUSE_TIMEOUT environment variables. Setting CLICKHOUSE_BACKEND to
+    'selenium' switches to scraping the playground web page instead, and
+    CLICKHOUSE_SELENIUM_FALLBACK enables the scraper when the HTTP request fails.
+    
+    A positive CLICKHOUSE_STREAM_CHUNK_ROWS reads the response of a single
+    HTTP query in chunks of that many rows, which bounds the memory of
+    parsing it. The data query ends with ORDER BY RAND() LIMIT, so ClickHouse
+    sends the first row only after the whole sort and streaming does not
+    bring rows earlier. The result is validated before any GitHub API
+    request. Streaming is disabled by default.
+    
+    ClickHouse results are cached on disk in CLICKHOUSE_CACHE_DIR for
+    CLICKHOUSE_CACHE_TTL seconds, up to CLICKHOUSE_CACHE_MAX_SIZE bytes.
+    An empty CLICKHOUSE_CACHE_DIR disables the cache.
+    
+    Date ranges longer than CLICKHOUSE_SHARD_MIN_DAYS are split into
+    CLICKHOUSE_SHARD_PERIOD ('month' or 'week') shards which are queried
+    concurrently, at most CLICKHOUSE_SHARD_CONCURRENCY at a time, and merged
+    into exact per-repository totals. An empty CLICKHOUSE_SHARD_PERIOD
+    disables sharding.
+    
+    When CLICKHOUSE_ROLLUP_DIR is set, daily per-repository aggregates are
+    kept there and only the days that are not stored yet are queried, in
+    ranges of at most CLICKHOUSE_ROLLUP_QUERY_DAYS days. Days newer than
+    CLICKHOUSE_ROLLUP_SETTLE_DAYS are always queried and never stored.
+    
+    GitHub API requests go to GITHUB_API_URL with at most
+    GITHUB_API_CONCURRENCY requests in flight and GITHUB_API_MAX_RETRIES
+    retries. The counters of the last fetch are kept in github_api_report.
+    Repository metadata is cached in the GITHUB_CACHE_PATH SQLite file for
+    GITHUB_CACHE_TTL seconds, "not found" answers for GITHUB_CACHE_NOT_FOUND_TTL
+    seconds, and stale entries are revalidated with their ETags. An empty
+    GITHUB_CACHE_PATH disables the cache. Setting GITHUB_API_BACKEND to
+    'graphql' requests the metadata through the GraphQL API in batches of
+    up to 100 repositories instead of one REST request per repository.
+
     Attributes:
-        CLICKHOUSE_REQUEST_URL (str): ClickHouse query URL.
-        GITHUB_API_REQUEST_URL (str): GitHub API base URL.
+        CLICKHOUSE_REQUEST_URL (str): ClickHouse playground web page URL.
+        CLICKHOUSE_BACKENDS (list): Available ClickHouse backends.
+        CLICKHOUSE_SHARD_PERIODS (list): Available date shard periods.
+        GITHUB_API_BACKENDS (list): Available GitHub API backends.
+        MIN_ROWS_COUNT (int): Minimum number of repositories in a sample.
+        DEFAULT_CACHE_DIR (str): Default directory of the ClickHouse results cache.
+        DEFAULT_GITHUB_CACHE_PATH (str): Default path of the GitHub metadata cache.
+        query_result_caches (dict): Result caches shared by all connectors of the process.
 
     Methods:
         get_data_from_services(data_params: GithubDataParams) -> pd.DataFrame:
             Retrieves data from ClickHouse and GitHub API based on specified parameters.
+        get_progress() -> dict:
+            Returns the phase and the counters of the current retrieval.
     """
     CLICKHOUSE_REQUEST_URL = 'https://play.clickhouse.com/play?user=play'
-    GITHUB_API_REQUEST_URL = 'https://api.github.com/repos/{repo_name}'
+    CLICKHOUSE_BACKENDS = ['http', 'selenium']
+    CLICKHOUSE_SHARD_PERIODS = ['month', 'week']
+    GITHUB_API_BACKENDS = ['rest', 'graphql']
+    MIN_ROWS_COUNT = 200
+    DEFAULT_CACHE_DIR = '.cache/clickhouse'
+    DEFAULT_GITHUB_CACHE_PATH = '.cache/github_metadata.sqlite3'
+    query_result_caches = {}
     
     def __init__(self):
         env = environ.Env()
         environ.Env.read_env()
         github_api_token = env('GITHUB_KEY', default='')
         self.headers = {'Authorization': f'token {github_api_token}'}
+        self.github_api_backend = env('GITHUB_API_BACKEND', default='rest')
+        if self.github_api_backend not in self.GITHUB_API_BACKENDS:
+            raise ValueError(f"Unknown GitHub API backend: {self.github_api_backend}")
+        self.github_api_url = env('GITHUB_API_URL', default=GithubApiFetcher.DEFAULT_API_URL)
+        self.github_api_concurrency = env.int('GITHUB_API_CONCURRENCY', 
+                                              default=GithubApiFetcher.DEFAULT_MAX_CONCURRENCY)
+        self.github_api_max_retries = env.int('GITHUB_API_MAX_RETRIES', 
+                                              default=GithubApiFetcher.DEFAULT_MAX_RETRIES)
+        self.github_api_report = None
+        self.phase = None
+        self.rows_fetched = 0
+        github_cache_path = env('GITHUB_CACHE_PATH', default=self.DEFAULT_GITHUB_CACHE_PATH)
+        self.github_metadata_cache = (GithubMetadataCache(
+            github_cache_path,
+            ttl=env.int('GITHUB_CACHE_TTL', default=GithubMetadataCache.DEFAULT_TTL),
+            not_found_ttl=env.int('GITHUB_CACHE_NOT_FOUND_TTL', 
+                                  default=GithubMetadataCache.DEFAULT_NOT_FOUND_TTL)
+        ) if github_cache_path else None)
         self.data_configuration = pd.read_json(r"dtype_conf.json")
+        self.query_builder = ClickHouseQueryBuilder(self.data_configuration)
+        
+        self.clickhouse_backend = env('CLICKHOUSE_BACKEND', default='http')
+        if self.clickhouse_backend not in self.CLICKHOUSE_BACKENDS:
+            raise ValueError(f"Unknown ClickHouse backend: {self.clickhouse_backend}")
+        self.clickhouse_selenium_fallback = env.bool('CLICKHOUSE_SELENIUM_FALLBACK', 
+                                                     default=False)
+        self.clickhouse_client = ClickHouseClient(
+            url=env('CLICKHOUSE_URL', default=ClickHouseClient.DEFAULT_URL),
+            user=env('CLICKHOUSE_USER', default=ClickHouseClient.DEFAULT_USER),
+            password=env('CLICKHOUSE_PASSWORD', default=''),
+            timeout=env.int('CLICKHOUSE_TIMEOUT', default=ClickHouseClient.DEFAULT_TIMEOUT)
+        )
+        self.clickhouse_stream_chunk_rows = env.int('CLICKHOUSE_STREAM_CHUNK_ROWS', default=0)
+        self.clickhouse_shard_period = env('CLICKHOUSE_SHARD_PERIOD', default='month')
+        if self.clickhouse_shard_period and self.clickhouse_shard_period not in self.CLICKHOUSE_SHARD_PERIODS:
+            raise ValueError(f"Unknown ClickHouse shard period: {self.clickhouse_shard_period}")
+        self.clickhouse_shard_min_days = env.int('CLICKHOUSE_SHARD_MIN_DAYS', default=93)
+        self.clickhouse_shard_concurrency = env.int('CLICKHOUSE_SHARD_CONCURRENCY', default=4)
+        self.clickhouse_rollup_query_days = env.int('CLICKHOUSE_ROLLUP_QUERY_DAYS', default=7)
+        self.clickhouse_rollup_settle_days = env.int('CLICKHOUSE_ROLLUP_SETTLE_DAYS', default=2)
+        rollup_dir = env('CLICKHOUSE_ROLLUP_DIR', default='')
+        self.rollup_store = (DailyRollupStore(rollup_dir, 
+                                              self.query_builder.build_daily_partial_data_query('', ''))
+                             if rollup_dir else None)
+        self.query_result_cache = self.__get_query_result_cache(
+            cache_dir=env('CLICKHOUSE_CACHE_DIR', default=self.DEFAULT_CACHE_DIR),
+            ttl=env.int('CLICKHOUSE_CACHE_TTL', default=QueryResultCache.DEFAULT_TTL),
+            max_size=env.int('CLICKHOUSE_CACHE_MAX_SIZE', default=QueryResultCache.DEFAULT_MAX_SIZE)
+        )
             
     async def get_data_from_services(self, 
                                      data_params: GithubDataParams) -> pd.DataFrame:
@@ -91,22 +202,47 @@ class ServiceConnector():
         """
         self.__validate_date_range(data_params.start_date, data_params.end_date)
         
+        self.phase = 'clickhouse'
+        self.rows_fetched = 0
         query = self.__get_query_by_params(data_params)
-
-        clickhouse_data = self.__get_clickhouse_data(query)
         
         api_columns = self.__get_github_api_columns(data_params.transaction_composition)
-        
-        github_api_data = await self.__get_github_api_data(
-                                                    clickhouse_data["repo"], 
-                                                    api_columns)
-        
-        repo_data = clickhouse_data.join(github_api_data.set_index("repo"), 
-                                        on="repo")
+
+        async with self.__create_github_api_fetcher() as fetcher:
+            self.github_api_report = fetcher.report
+            
+            clickhouse_data = await self.__get_cached_clickhouse_data(data_params, query)
+            self.rows_fetched = len(clickhouse_data)
+            self.phase = 'github_api'
+            repo_data = await self.__join_github_api_data(clickhouse_data, 
+                                                          api_columns, 
+                                                          fetcher)
 
         formatted_data = self.__format_data_types(repo_data)
+        self.phase = 'done'
         return formatted_data
     
+    def get_progress(self) -> dict:
+        """
+        Returns the phase ('clickhouse', 'github_api' or 'done'), the number of
+        repositories received from ClickHouse and the number of GitHub API
+        requests of the current retrieval.
+        """
+        return {
+            'phase': self.phase,
+            'rows_fetched': self.rows_fetched,
+            'api_calls': self.github_api_report.requests if self.github_api_report else 0,
+        }
+    
+    async def __join_github_api_data(self, 
+                                     clickhouse_data: pd.DataFrame, 
+                                     api_columns: list, 
+                                     fetcher: GithubApiFetcher) -> pd.DataFrame:
+        github_api_data = await self.__get_github_api_data(clickhouse_data["repo"], 
+                                                           api_columns, 
+                                                           fetcher)
+        return clickhouse_data.join(github_api_data.set_index("repo"), on="repo")
+    
     def __get_github_api_columns(self, transaction_composition: list) -> list:
         source_condition = self.data_configuration["source"] == "githubApi"
         api_columns = list(self.data_configuration[source_condition]["columnName"])
@@ -115,66 +251,7 @@ class ServiceConnector():
         return api_columns
 
     def __get_query_by_params(self, query_params: GithubDataParams) -> str:
-        
-        def build_select_clause(query_params):
-            select_clause = ["outerQuery.repo_name as repo"]
-            join_clauses = []
-
-            for attribute in query_params.transaction_composition:
-                config_row = self.data_configuration.loc[self.data_configuration['columnName'] == attribute]                
-                join_query_name = config_row.iloc[0]['joinQuery']
-                if pd.isnull(join_query_name):
-                    continue
-                
-                join_query = JOIN_CLAUSES[join_query_name]
-                
-                if not join_query in join_clauses:
-                    join_clauses.append(join_query)
-                    
-                if not attribute in SELECT_CLAUSES:
-                    continue
-                
-                select_clause.append(SELECT_CLAUSES[attribute])
-
-            select_clause_str = ", ".join(select_clause)
-            join_clauses_str = " ".join(join_clauses).format(
-                start_date=query_params.start_date, 
-                end_date=query_params.end_date
-            )
-            return select_clause_str, join_clauses_str
-
-        def build_filters(query_params):
-            new_repos_filter = NEW_REPOS_QUERY_FILTER if query_params.is_new_repos else ''
-            
-            min_watches_filter = (MIN_WATCHES_QUERY_FILTER.format(
-                start_date=query_params.start_date, 
-                end_date=query_params.end_date,
-                watch_event_count=query_params.min_watch_event_count
-            ) if query_params.min_watch_event_count > 0 else '')
-                
-            min_members_filter = (MIN_MEMBERS_QUERY_FILTER.format(
-                start_date=query_params.start_date, 
-                end_date=query_params.end_date,
-                new_members_count=query_params.min_members_count - 1
-            ) if query_params.min_members_count > 0 else '')
-            
-            return new_repos_filter, min_watches_filter, min_members_filter
-        
-        
-        select_clause_str, join_clauses_str = build_select_clause(query_params)
-        new_repos_filter, min_watches_filter, min_members_filter = build_filters(query_params)
-
-        query = CLICKHOUSE_DATA_QUERY.format(
-            select_clause_str=select_clause_str,
-            start_date=query_params.start_date,
-            end_date=query_params.end_date,
-            new_repos_filter=new_repos_filter,
-            min_watches_filter=min_watches_filter,
-            min_members_filter=min_members_filter,
-            join_clauses_str=join_clauses_str,
-            limit=query_params.limit
-        )
-        return query
+        return self.query_builder.build_data_query(query_params)
     
     def __format_data_types(self, data: pd.DataFrame) -> pd.DataFrame:
         formatted_data = data.copy()
@@ -198,39 +275,263 @@ class ServiceConnector():
             
         return formatted_data
         
-    async def _fetch(self, session, url):
-        async with session.get(url, headers=self.headers) as response:
-            return await response.json(), response.status
-    
-    async def __get_github_api_data(self, repo_names, data_columns):
-        tasks = []
-        
+    async def __get_github_api_data(self, repo_names, data_columns, fetcher):
         data = {'repo': []}
         for column in data_columns:
             data[column] = []
-    
-        async with aiohttp.ClientSession() as session:
-            for repo_name in repo_names:
-                url = self.GITHUB_API_REQUEST_URL.format(repo_name=repo_name)
-                tasks.append(self._fetch(session, url))
-
-            responses = await asyncio.gather(*tasks)
+        
+        repo_names = list(repo_names)
+        repositories_metadata = await self.__get_repositories_metadata(repo_names, fetcher)
             
-            for repo_name, (response, status) in zip(repo_names, responses):
-                data['repo'].append(repo_name)
-                
-                if 'license_name' in data_columns:
-                    data['license_name'].append(response.get('license', {}).get('name', None) if response.get('license') else None)
-                    
-                if 'is_deleted_or_private' in data_columns:
-                    data['is_deleted_or_private'].append(True if status == 404 else False)
+        for repo_name in repo_names:
+            data['repo'].append(repo_name)
+            metadata = repositories_metadata.get(repo_name)
+            
+            # Repositories without a definitive response get unknown values
+            if metadata is None:
+                for column in data_columns:
+                    if column != 'repo':
+                        data[column].append(None)
+                continue
+            
+            if 'license_name' in data_columns:
+                data['license_name'].append(metadata['license_name'])
                 
-                if 'language' in data_columns:
-                    data['language'].append(response.get('language', None))
+            if 'is_deleted_or_private' in data_columns:
+                data['is_deleted_or_private'].append(True if metadata['status'] == 404 else False)
+            
+            if 'language' in data_columns:
+                data['language'].append(metadata['language'])
 
         return pd.DataFrame(data)
+    
+    async def __get_repositories_metadata(self, 
+                                          repo_names: list[str], 
+                                          fetcher: GithubApiFetcher) -> dict[str, dict]:
+        metadata_cache = self.github_metadata_cache
+        cached_metadata = metadata_cache.get_many(repo_names) if metadata_cache else {}
+        
+        repositories_metadata = {}
+        repo_requests = []
+        for repo_name in repo_names:
+            metadata = cached_metadata.get(repo_name)
+            if metadata is None:
+                repo_requests.append((repo_name, None))
+            elif metadata_cache.is_fresh(metadata):
+                repositories_metadata[repo_name] = metadata
+            elif metadata['etag']:
+                repo_requests.append((repo_name, {'If-None-Match': metadata['etag']}))
+            else:
+                repo_requests.append((repo_name, None))
+        
+        fetcher.report.cached += len(repositories_metadata)
+        
+        if self.github_api_backend == 'graphql':
+            updated_metadata = await fetcher.fetch_repositories_metadata(
+                [repo_name for repo_name, _ in repo_requests])
+            repositories_metadata.update(updated_metadata)
+            if metadata_cache:
+                metadata_cache.put_many(updated_metadata)
+            return repositories_metadata
+        
+        responses = await asyncio.gather(*[fetcher.fetch_repository(repo_name, headers) 
+                                           for repo_name, headers in repo_requests])
+        
+        updated_metadata = {}
+        revalidated_repo_names = []
+        for repo_name, response, status, etag in responses:
+            if response is None:
+                continue
+            
+            if status == 304:
+                repositories_metadata[repo_name] = cached_metadata[repo_name]
+                revalidated_repo_names.append(repo_name)
+                continue
+            
+            updated_metadata[repo_name] = {
+                'status': status,
+                'language': response.get('language', None),
+                'license_name': response.get('license', {}).get('name', None) if response.get('license') else None,
+                'etag': etag
+            }
+            repositories_metadata[repo_name] = updated_metadata[repo_name]
+        
+        if metadata_cache:
+            metadata_cache.put_many(updated_metadata)
+            metadata_cache.touch_many(revalidated_repo_names)
+            
+        return repositories_metadata
+    
+    def __create_github_api_fetcher(self) -> GithubApiFetcher:
+        fetcher_class = (GithubGraphqlFetcher if self.github_api_backend == 'graphql' 
+                         else GithubApiFetcher)
+        return fetcher_class(self.headers,
+                             api_url=self.github_api_url,
+                             max_concurrency=self.github_api_concurrency,
+                             max_retries=self.github_api_max_retries)
 
-    def __get_clickhouse_data(self, query):
+    def __get_query_result_cache(self, cache_dir: str, ttl: int, max_size: int):
+        if not cache_dir:
+            return None
+        
+        if cache_dir not in self.query_result_caches:
+            self.query_result_caches[cache_dir] = QueryResultCache(cache_dir, ttl, max_size)
+        return self.query_result_caches[cache_dir]
+    
+    async def __get_cached_clickhouse_data(self, 
+                                           data_params: GithubDataParams, 
+                                           query: str) -> pd.DataFrame:
+        if self.query_result_cache is None:
+            return await self.__get_clickhouse_data(data_params, query)
+        
+        cache_key = self.query_result_cache.get_key(vars(data_params), query)
+        clickhouse_data = self.query_result_cache.get(cache_key)
+        if clickhouse_data is None:
+            clickhouse_data = await self.__get_clickhouse_data(data_params, query)
+            self.query_result_cache.put(cache_key, clickhouse_data)
+            
+        return clickhouse_data
+    
+    async def __get_clickhouse_data(self, 
+                                    data_params: GithubDataParams, 
+                                    query: str) -> pd.DataFrame:
+        if self.clickhouse_backend == 'selenium':
+            clickhouse_data = self.__get_clickhouse_data_by_selenium(query)
+        else:
+            try:
+                clickhouse_data = await self.__query_clickhouse(data_params, query)
+            except EmptyTableError:
+                if not self.clickhouse_selenium_fallback or webdriver is None:
+                    raise
+                clickhouse_data = self.__get_clickhouse_data_by_selenium(query)
+        
+        self.__validate_clickhouse_data(clickhouse_data)
+        return clickhouse_data
+    
+    def __validate_clickhouse_data(self, clickhouse_data: pd.DataFrame):
+        if clickhouse_data.empty:
+            raise EmptyTableError("Данные не получены. Попробуйте изменить \
+                параметры запроса, чтобы в выборку попало больше репозиториев")
+        
+        if clickhouse_data.shape[0] < self.MIN_ROWS_COUNT:
+            raise InsufficientRowsError("Получено меньше 200 записей \
+                репозиториев. Попробуйте изменить параметры запроса")
+
+    async def __query_clickhouse(self, 
+                                 data_params: GithubDataParams, 
+                                 query: str) -> pd.DataFrame:
+        if self.rollup_store is not None:
+            return await self.__query_clickhouse_with_rollup(data_params)
+        
+        date_shards = self.__get_date_shards(data_params.start_date, data_params.end_date)
+        if len(date_shards) < 2:
+            if self.clickhouse_stream_chunk_rows > 0:
+                return await self.__query_clickhouse_stream(query)
+            return await self.clickhouse_client.query(query)
+        
+        semaphore = asyncio.Semaphore(self.clickhouse_shard_concurrency)
+        
+        async def query_shard(start_date, end_date):
+            async with semaphore:
+                shard_query = self.query_builder.build_partial_data_query(data_params, 
+                                                                          start_date, 
+                                                                          end_date)
+                return await self.clickhouse_client.query(shard_query)
+        
+        partial_results = await asyncio.gather(*[query_shard(start_date, end_date) 
+                                                 for start_date, end_date in date_shards])
+        return self.query_builder.merge_partial_results(partial_results, data_params)
+    
+    async def __query_clickhouse_stream(self, query: str) -> pd.DataFrame:
+        clickhouse_chunks = []
+        # The response is released as soon as reading stops, not when the generator is collected
+        async with aclosing(self.clickhouse_client.query_stream(
+                query, self.clickhouse_stream_chunk_rows)) as chunks:
+            async for chunk in chunks:
+                clickhouse_chunks.append(chunk)
+                self.rows_fetched += len(chunk)
+        
+        return (pd.concat(clickhouse_chunks, ignore_index=True) 
+                if clickhouse_chunks else pd.DataFrame())
+    
+    async def __query_clickhouse_with_rollup(self, data_params: GithubDataParams) -> pd.DataFrame:
+        days = self.rollup_store.get_days(data_params.start_date, data_params.end_date)
+        missing_days = self.rollup_store.get_missing_days(days)
+        
+        semaphore = asyncio.Semaphore(self.clickhouse_shard_concurrency)
+        
+        async def query_days(start_date, end_date):
+            async with semaphore:
+                daily_query = self.query_builder.build_daily_partial_data_query(start_date, 
+                                                                                end_date)
+                return await self.clickhouse_client.query(daily_query)
+        
+        remote_results = await asyncio.gather(*[query_days(start_date, end_date) 
+                                                for start_date, end_date 
+                                                in self.__get_day_ranges(missing_days)])
+        remote_data = (pd.concat(remote_results, ignore_index=True) 
+                       if remote_results else pd.DataFrame())
+        
+        settled_date = (datetime.now() - timedelta(days=self.clickhouse_rollup_settle_days))
+        settled_days = [day for day in missing_days 
+                        if day < settled_date.strftime('%Y-%m-%d')]
+        self.rollup_store.save(remote_data, settled_days)
+        
+        columns = self.query_builder.get_partial_columns(data_params)
+        stored_days = sorted(set(days) - set(missing_days))
+        local_data = self.rollup_store.load(stored_days, columns)
+        
+        partial_results = [local_data]
+        if not remote_data.empty:
+            partial_results.append(remote_data[columns])
+        return self.query_builder.merge_partial_results(partial_results, data_params)
+    
+    def __get_day_ranges(self, days: list[str]) -> list[tuple[str, str]]:
+        day_ranges = []
+        for day in days:
+            day_start = datetime.strptime(day, '%Y-%m-%d')
+            if (day_ranges and day_ranges[-1][1] == day_start 
+                    and (day_start - day_ranges[-1][0]).days < self.clickhouse_rollup_query_days):
+                day_ranges[-1][1] = day_start + timedelta(days=1)
+            else:
+                day_ranges.append([day_start, day_start + timedelta(days=1)])
+                
+        return [(range_start.strftime('%Y-%m-%d'), range_end.strftime('%Y-%m-%d')) 
+                for range_start, range_end in day_ranges]
+    
+    def __get_date_shards(self, 
+                          start_date_string: str, 
+                          end_date_string: str) -> list[tuple[str, str]]:
+        if not self.clickhouse_shard_period:
+            return []
+        
+        try:
+            start_date = datetime.strptime(start_date_string, '%Y-%m-%d')
+            end_date = datetime.strptime(end_date_string, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return []
+        
+        if (end_date - start_date).days <= self.clickhouse_shard_min_days:
+            return []
+        
+        date_shards = []
+        shard_start = start_date
+        while shard_start < end_date:
+            if self.clickhouse_shard_period == 'week':
+                shard_end = shard_start + timedelta(days=7)
+            else:
+                shard_end = (shard_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            shard_end = min(shard_end, end_date)
+            date_shards.append((shard_start.strftime('%Y-%m-%d'), shard_end.strftime('%Y-%m-%d')))
+            shard_start = shard_end
+            
+        return date_shards
+    
+    def __get_clickhouse_data_by_selenium(self, query):
+        if webdriver is None:
+            raise EmptyTableError("Selenium не установлен, данные ClickHouse \
+                не могут быть получены через веб-страницу")
+        
         class AnyEc:
             def __init__(self, *args):
                 self.ecs = args
@@ -304,13 +605,7 @@ class ServiceConnector():
             data = [col.text.strip() for col in columns]
             table_data.append(data)
             
-        df = pd.DataFrame(table_data, columns=headers)
-        
-        if df.shape[0] < 200:
-            raise InsufficientRowsError("Получено меньше 200 записей \
-                репозиториев. Попробуйте изменить параметры запроса")
-        
-        return df
+        return pd.DataFrame(table_data, columns=headers)
           
     def __validate_date_range(self, start_date_string: str, end_date_string: str) -> bool:
         try:
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import Executor
+from .eclat import Eclat
+
+
+class Coordinator():
+    """
+    Runs the tasks of a partitioned mining.
+
+    A task is a module-level function with picklable arguments, so an
+    implementation can send it to local processes or to other nodes.
+    """
+    def run(self, function, tasks: list[tuple]) -> list:
+        """
+        Runs function on every argument tuple.
+
+        Args:
+            function (callable): Module-level function.
+            tasks (list[tuple]): Arguments of every call.
+
+        Returns:
+            list: Results in the order of the tasks.
+        """
+        raise NotImplementedError
+
+
+class LocalCoordinator(Coordinator):
+    """
+    Runs the tasks on a local executor, or one by one in the calling thread without it.
+    """
+    def __init__(self, executor: Executor | None = None):
+        self.executor = executor
+
+    def run(self, function, tasks: list[tuple]) -> list:
+        if self.executor is None:
+            return [function(*arguments) for arguments in tasks]
+
+        futures = [self.executor.submit(function, *arguments) for arguments in tasks]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+class SonMiner():
+    """
+    Two-phase partitioned frequent itemsets mining (Savasere, Omiecinski and Navathe).
+
+    The rows are split into partitions. In the first phase every partition
+    is mined with Eclat at the same relative minimum support: an itemset
+    frequent in the whole matrix is frequent in at least one partition, so
+    the union of the local results contains every frequent itemset. In the
+    second phase every partition counts the candidates on its rows and the
+    counts are summed, so the supports and the itemsets are exactly those
+    of a single-node run.
+
+    Partitions are sent to the tasks as packed item bitsets of their rows.
+    Small partitions make almost every itemset locally frequent, so there
+    are never more partitions than needed for a local minimum support of
+    MIN_LOCAL_SUPPORT_COUNT rows.
+
+    Attributes:
+        DEFAULT_PARTITIONS_COUNT (int): Default number of row partitions.
+        MIN_LOCAL_SUPPORT_COUNT (int): Minimum number of rows of a locally frequent itemset.
+        COUNT_BATCH_SIZE (int): Candidates intersected at once when counting.
+        partitions_count (int): Number of row partitions.
+        coordinator (Coordinator): Runs the partition tasks.
+        max_len (int): Maximum itemset length, unlimited if None.
+    """
+    DEFAULT_PARTITIONS_COUNT = 4
+    MIN_LOCAL_SUPPORT_COUNT = 20
+    COUNT_BATCH_SIZE = 4096
+
+    def __init__(self,
+                 partitions_count: int = DEFAULT_PARTITIONS_COUNT,
+                 coordinator: Coordinator | None = None,
+                 max_len: int | None = None):
+        self.partitions_count = partitions_count
+        self.coordinator = coordinator if coordinator is not None else LocalCoordinator()
+        self.max_len = max_len
+
+    def find_frequent_itemsets(self,
+                               transactions_matrix: pd.DataFrame,
+                               min_supp: float) -> pd.DataFrame:
+        """
+        Finds the frequent itemsets of a binary transactions matrix.
+
+        Args:
+            transactions_matrix (DataFrame): Binary matrix of transactions.
+            min_supp (float): Minimum support threshold.
+
+        Returns:
+            DataFrame: "support" and "itemsets" columns like mlxtend apriori
+                with use_colnames, itemsets are frozensets of column names.
+        """
+        columns = list(transactions_matrix.columns)
+        rows_count = len(transactions_matrix)
+        if not rows_count or not columns:
+            return pd.DataFrame({'support': pd.Series(dtype=np.float64), 'itemsets': []})
+
+        eclat = Eclat()
+        matrix = transactions_matrix.to_numpy(dtype=bool)
+        partitions = [(eclat.get_bitsets(rows), len(rows))
+                      for rows in np.array_split(matrix, self.get_partitions_count(rows_count, 
+                                                                                   min_supp))]
+
+        local_itemsets = self.coordinator.run(find_partition_itemsets,
+                                              [(bitsets, partition_rows_count, min_supp, self.max_len)
+                                               for bitsets, partition_rows_count in partitions])
+        candidates = sorted(set().union(*local_itemsets), key=lambda items: (len(items), items))
+
+        partition_counts = self.coordinator.run(count_partition_itemsets,
+                                                [(bitsets, candidates) for bitsets, _ in partitions])
+        supports = np.sum(partition_counts, axis=0, dtype=np.int64) / rows_count
+        frequent = [position for position in range(len(candidates)) if supports[position] >= min_supp]
+
+        return pd.DataFrame({
+            'support': np.array([supports[position] for position in frequent], dtype=np.float64),
+            'itemsets': [frozenset(columns[item] for item in candidates[position])
+                         for position in frequent],
+        })
+
+    def get_partitions_count(self, rows_count: int, min_supp: float) -> int:
+        max_partitions_count = int(rows_count * min_supp // self.MIN_LOCAL_SUPPORT_COUNT)
+        return max(1, min(self.partitions_count, max_partitions_count))
+
+
+def find_partition_itemsets(bitsets, rows_count, min_supp, max_len):
+    """
+    First phase task: the locally frequent itemsets of a partition as item tuples.
+    """
+    eclat = Eclat(max_len)
+    # A slightly lower threshold keeps itemsets lost to the rounding of the local supports
+    local_min_supp = min_supp * (1 - 1e-9)
+    frequent_items = np.flatnonzero(eclat.get_supports(bitsets, rows_count) >= local_min_supp)
+
+    itemsets = [(int(item),) for item in frequent_items]
+    if max_len is None or max_len > 1:
+        itemsets += [tuple(int(item) for item in items)
+                     for items, _ in eclat.find_extensions(bitsets, frequent_items,
+                                                           range(len(frequent_items)),
+                                                           rows_count, local_min_supp)]
+    return itemsets
+
+
+def count_partition_itemsets(bitsets, candidates):
+    """
+    Second phase task: the number of rows of a partition containing every candidate.
+    """
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    for length in sorted({len(items) for items in candidates}):
+        positions = [position for position, items in enumerate(candidates) if len(items) == length]
+        for start in range(0, len(positions), SonMiner.COUNT_BATCH_SIZE):
+            batch_positions = positions[start:start + SonMiner.COUNT_BATCH_SIZE]
+            items = np.array([candidates[position] for position in batch_positions], dtype=np.int64)
+            intersections = bitsets[items[:, 0]]
+            for item_position in range(1, length):
+                intersections = intersections & bitsets[items[:, item_position]]
+            counts[batch_positions] = np.bitwise_count(intersections).sum(axis=1, dtype=np.int64)
+    return counts
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+class TransactionMatrixCache():
+    """
+    On-disk cache of binary transaction matrices and their quantile tables.
+
+    Every matrix is stored as a NumPy file of bits packed along the items
+    axis, next to a JSON file with the item vocabulary, the number of rows,
+    the quartile and decile tables and the samples the matrix was built
+    from. Packed files are memory-mapped when read, so only mining is paid
+    for when the same samples are mined again with other thresholds.
+
+    The access time of the matrix file is updated on every hit and is used
+    for the least recently used eviction above the size limit. Deleting a
+    sample drops every matrix built from it.
+
+    Attributes:
+        MATRIX_EXTENSION (str): Extension of the packed matrix files.
+        META_EXTENSION (str): Extension of the metadata files.
+        DEFAULT_MAX_SIZE (int): Default maximum total size of the cache in bytes.
+        hits (int): Number of requests answered from the cache.
+        misses (int): Number of requests not found in the cache.
+    """
+    MATRIX_EXTENSION = '.npy'
+    META_EXTENSION = '.json'
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, sample_ids: list[int], quantile_config: dict, data_configuration: str) -> str:
+        """
+        Builds a cache key of a transaction matrix.
+
+        Args:
+            sample_ids (list[int]): Sample identifiers, the order is ignored.
+            quantile_config (dict): Quantile type by attribute.
+            data_configuration (str): Serialized data configuration of the converter.
+
+        Returns:
+            str: Hex digest identifying the matrix.
+        """
+        key_source = json.dumps({'sample_ids': sorted(set(sample_ids)),
+                                 'quantile_config': quantile_config,
+                                 'data_configuration': data_configuration},
+                                sort_keys=True)
+        return hashlib.sha256(key_source.encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[pd.DataFrame, pd.DataFrame | None, pd.DataFrame | None] | None:
+        """
+        Returns the cached transactions with the quartile and decile tables, or None.
+        """
+        matrix_path, meta_path = self._get_paths(key)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            packed_matrix = np.load(matrix_path, mmap_mode='r')
+            os.utime(matrix_path, (time.time(), os.path.getmtime(matrix_path)))
+        except (FileNotFoundError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        matrix = np.unpackbits(packed_matrix, axis=1, count=len(meta['items'])).view(bool)
+        transactions = pd.DataFrame(matrix, columns=meta['items'])
+
+        self.hits += 1
+        return (transactions,
+                self._table_from_dict(meta['quartile_table']),
+                self._table_from_dict(meta['decile_table']))
+
+    def put(self,
+            key: str,
+            transactions: pd.DataFrame,
+            quartile_table: pd.DataFrame | None,
+            decile_table: pd.DataFrame | None,
+            sample_ids: list[int]):
+        """
+        Saves transactions with their quantile tables and evicts least recently used entries.
+        """
+        matrix_path, meta_path = self._get_paths(key)
+        meta = {
+            'items': [str(item) for item in transactions.columns],
+            'rows': len(transactions),
+            'quartile_table': self._table_to_dict(quartile_table),
+            'decile_table': self._table_to_dict(decile_table),
+            'sample_ids': sorted(set(sample_ids)),
+        }
+        packed_matrix = np.packbits(transactions.to_numpy(dtype=bool), axis=1)
+
+        temp_suffix = f'.{os.getpid()}.tmp'
+        with open(meta_path + temp_suffix, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        with open(matrix_path + temp_suffix, 'wb') as matrix_file:
+            np.save(matrix_file, packed_matrix)
+        # The metadata is replaced first, a matrix is only read with its metadata
+        os.replace(meta_path + temp_suffix, meta_path)
+        os.replace(matrix_path + temp_suffix, matrix_path)
+        self._evict(keep_key=key)
+
+    def invalidate_sample(self, sample_id: int):
+        """
+        Drops the matrices built from a sample.
+        """
+        for key in self._get_cached_keys():
+            _, meta_path = self._get_paths(key)
+            try:
+                with open(meta_path) as meta_file:
+                    sample_ids = json.load(meta_file)['sample_ids']
+            except (FileNotFoundError, OSError, ValueError):
+                continue
+            if sample_id in sample_ids:
+                self._remove(key)
+
+    def get_stats(self) -> dict:
+        """
+        Returns hit/miss counters and the current cache volume.
+        """
+        keys = self._get_cached_keys()
+        requests_count = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / requests_count if requests_count else 0.0,
+            'entries': len(keys),
+            'size': sum(self._get_size(key) for key in keys),
+        }
+
+    def _table_to_dict(self, table: pd.DataFrame | None) -> dict | None:
+        return table.to_dict(orient='split') if table is not None else None
+
+    def _table_from_dict(self, table: dict | None) -> pd.DataFrame | None:
+        if table is None:
+            return None
+        return pd.DataFrame(table['data'], index=table['index'], columns=table['columns'])
+
+    def _evict(self, keep_key: str):
+        entries = []
+        for key in self._get_cached_keys():
+            matrix_path, _ = self._get_paths(key)
+            try:
+                access_time = os.stat(matrix_path).st_atime
+            except FileNotFoundError:
+                continue
+            entries.append((access_time, self._get_size(key), key))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if key == keep_key:
+                continue
+            self._remove(key)
+            total_size -= size
+
+    def _remove(self, key: str):
+        for path in self._get_paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _get_size(self, key: str) -> int:
+        size = 0
+        for path in self._get_paths(key):
+            try:
+                size += os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        return size
+
+    def _get_cached_keys(self) -> list[str]:
+        return [file_name[:-len(self.MATRIX_EXTENSION)]
+                for file_name in os.listdir(self.cache_dir)
+                if file_name.endswith(self.MATRIX_EXTENSION)]
+
+    def _get_paths(self, key: str) -> tuple[str, str]:
+        return (os.path.join(self.cache_dir, key + self.MATRIX_EXTENSION),
+                os.path.join(self.cache_dir, key + self.META_EXTENSION))